@@ -12,12 +12,13 @@ import logging
 
 from django.contrib import admin
 from django.contrib.admin.sites import NotRegistered
-from django.core import serializers
-from django.http import HttpResponse
 from django.utils.translation import ugettext_lazy as _
 
 from cms.models import Page
 
+# PyLucid
+from pylucid.data_export import FORMAT_JSON, FORMAT_NDJSON, streaming_export_response
+
 
 logger = logging.getLogger(__name__)
 
@@ -26,13 +27,28 @@ def export_as_json(modeladmin, request, queryset):
     """
     from:
     http://docs.djangoproject.com/en/dev/ref/contrib/admin/actions/#actions-that-provide-intermediate-pages
+
+    The response is streamed, see: pylucid.data_export
     """
-    response = HttpResponse(content_type="text/javascript")
-    serializers.serialize("json", queryset, stream=response, indent=4)
-    return response
+    return streaming_export_response(queryset, FORMAT_JSON)
+
+
+def export_as_ndjson(modeladmin, request, queryset):
+    return streaming_export_response(queryset, FORMAT_NDJSON)
+
+
+def export_as_ndjson_gz(modeladmin, request, queryset):
+    return streaming_export_response(queryset, FORMAT_NDJSON, compress=True)
+
+
+export_as_json.short_description = _("Export selected %(verbose_name_plural)s as JSON")
+export_as_ndjson.short_description = _("Export selected %(verbose_name_plural)s as NDJSON")
+export_as_ndjson_gz.short_description = _("Export selected %(verbose_name_plural)s as gzipped NDJSON")
 
 # Make export actions available site-wide
 admin.site.add_action(export_as_json, 'export_selected_as_json')
+admin.site.add_action(export_as_ndjson, 'export_selected_as_ndjson')
+admin.site.add_action(export_as_ndjson_gz, 'export_selected_as_ndjson_gz')
 
 
 # from djangocms_text_ckeditor.models import Text
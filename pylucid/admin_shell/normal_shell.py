@@ -52,6 +52,11 @@ MANAGE_COMMANDS = (  # TODO: Create list dynamicly
     "template_info",
     "image_info",
     "replace_broken",
+    "pylucid_media_scan",
+    "pylucid_startup_profile",
+    "pylucid_page_tree",
+    "pylucid_publish",
+    "pylucid_history_prune",
     "collectstatic",
 )
 
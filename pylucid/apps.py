@@ -0,0 +1,93 @@
+# coding: utf-8
+
+"""
+    PyLucid app config
+    ~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.apps import AppConfig, apps
+from django.conf import settings
+
+
+class PyLucidConfig(AppConfig):
+    name = "pylucid"
+    verbose_name = "PyLucid"
+
+    def ready(self):
+        from django.core import checks
+        from pylucid.checks import check_esi_page_cache, check_shared_cache
+        checks.register(check_shared_cache)
+        checks.register(check_esi_page_cache)
+
+        from pylucid.search.signals import connect_signals
+        connect_signals()
+
+        from django.db.models.signals import post_delete
+        from cms.models import Page
+        from cms.signals import page_moved, post_publish, post_unpublish
+        from pylucid.page_resolver import page_changed
+        for signal in (post_publish, post_unpublish, page_moved, post_delete):
+            signal.connect(page_changed, sender=Page, dispatch_uid="pylucid_publish_version")
+
+        if apps.is_installed("djangocms_blog"):
+            # The cached blog lists and feeds, see: pylucid.blog_views
+            from django.db.models.signals import post_save
+            from djangocms_blog.models import BlogCategory, Post
+            for model in (Post, Post._parler_meta.root_model, BlogCategory, BlogCategory._parler_meta.root_model):
+                for signal in (post_save, post_delete):
+                    signal.connect(page_changed, sender=model, dispatch_uid="pylucid_blog_publish_version")
+
+            # The categories, sites and tags of the posts:
+            from django.db.models.signals import m2m_changed
+            from pylucid.blog_views import post_relations_changed, tagged_item_changed
+            dispatch_uid = "pylucid_blog_publish_version"
+            for through in (Post.categories.through, Post.sites.through):
+                m2m_changed.connect(post_relations_changed, sender=through, dispatch_uid=dispatch_uid)
+            for signal in (post_save, post_delete):
+                signal.connect(tagged_item_changed, sender=Post.tags.through, dispatch_uid=dispatch_uid)
+
+            # The blog menu with a constant number of queries:
+            from pylucid.blog_menus import replace_origin_menu
+            replace_origin_menu()
+
+        if apps.is_installed("cmsplugin_filer_image"):
+            # Render the images with the responsive variants:
+            from pylucid.filer_image import replace_origin_plugin
+            replace_origin_plugin()
+
+        if apps.is_installed("taggit_autosuggest"):
+            # Rebuild the tag index of pylucid.tag_suggest on changes:
+            from pylucid.tag_suggest import connect_signals
+            connect_signals()
+
+        from pylucid.placeholder_cache import connect_signals
+        connect_signals()
+
+        if settings.PYLUCID_SQLITE_PRAGMAS:
+            from django.db.backends.signals import connection_created
+            from pylucid.sqlite_tuning import configure_connection
+            connection_created.connect(configure_connection, dispatch_uid="pylucid_sqlite_tuning")
+
+        if "pylucid.db_router.ReplicaRouter" in settings.DATABASE_ROUTERS:
+            # Pin the primary database after writes, see: pylucid.db_router
+            from pylucid.db_router import connect_signals
+            connect_signals()
+
+        if settings.PYLUCID_SITEMAP_UPDATE_ON_PUBLISH:
+            from pylucid.sitemap import update_sitemap
+            post_publish.connect(update_sitemap, sender=Page, dispatch_uid="pylucid_sitemap_publish")
+            post_unpublish.connect(update_sitemap, sender=Page, dispatch_uid="pylucid_sitemap_unpublish")
+            page_moved.connect(update_sitemap, sender=Page, dispatch_uid="pylucid_sitemap_moved")
+
+        if settings.PYLUCID_THUMBNAIL_PREGENERATE:
+            from django.db.models.signals import post_save
+            from pylucid.thumbnails import get_image_model, image_saved
+            post_save.connect(image_saved, sender=get_image_model(), dispatch_uid="pylucid_thumbnails")
+
+        if apps.is_installed("cmsplugin_pygments"):
+            # Import all lexer modules before the first request needs them:
+            from pylucid.pygments_cache import preload_lexers
+            preload_lexers()
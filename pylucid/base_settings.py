@@ -5,21 +5,19 @@
     ~~~~~~~~~~~~~~~~~~~~~
 """
 
-import logging
+import importlib
 import sys
 import warnings
 
+from django.utils.functional import SimpleLazyObject
 from django.utils.translation import ugettext_lazy as _
 
-from debug_toolbar.settings import CONFIG_DEFAULTS as DEBUG_TOOLBAR_CONFIG
-from django_processinfo import app_settings as PROCESSINFO
-
 # https://github.com/jedie/django-tools
 from django_tools.settings_utils import FnMatchIps
-from django_tools.unittest_utils.logging_utils import CutPathnameLogRecordFactory, FilterAndLogWarnings
 
-# https://github.com/jedie/django-cms-tools
-from django_cms_tools.plugin_anchor_menu import constants as plugin_anchor_menu_constants
+# Note: Import only light-weight modules here, because the settings are imported
+# on every manage.py call. Heavy/optional modules are imported lazily.
+# see: pylucid/tests/test_settings_import.py
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
@@ -120,9 +118,26 @@ MIDDLEWARE = (
     'cms.middleware.toolbar.ToolbarMiddleware',
     'cms.middleware.language.LanguageCookieMiddleware',
 
+    # Edge side includes for the per-user fragments, see: pylucid.esi
+    'pylucid.middlewares.EsiMiddleware',
+
+    # "304 Not Modified" for unchanged CMS pages, see: pylucid.page_resolver
+    'pylucid.middlewares.ConditionalPageMiddleware',
+
+    # Cached page lookup and language fallback, see: pylucid.page_resolver
+    'pylucid.middlewares.PageResolverMiddleware',
+
+    # Read-only page views without the ATOMIC_REQUESTS transaction,
+    # must be the last middleware with process_view():
+    'pylucid.middlewares.NonAtomicReadsMiddleware',
+
     'django.middleware.cache.FetchFromCacheMiddleware',
 )
 
+# https://github.com/jedie/django-processinfo
+# Imported on first use. Change settings with e.g.: PROCESSINFO.ADD_INFO = False
+PROCESSINFO = SimpleLazyObject(lambda: importlib.import_module("django_processinfo.app_settings"))
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -158,6 +173,51 @@ TEMPLATES = [
 # Must be set in page instance settings:
 DATABASES = {}
 
+# Views that will be called without the "ATOMIC_REQUESTS" transaction
+# for GET/HEAD requests, see: pylucid.middlewares.NonAtomicReadsMiddleware
+PYLUCID_NON_ATOMIC_VIEWS = (
+    "cms.views.details",
+    "pylucid.blog_views.PostListView",
+    "pylucid.blog_views.PostArchiveView",
+    "pylucid.blog_views.TaggedListView",
+    "pylucid.blog_views.AuthorEntriesView",
+    "pylucid.blog_views.CategoryEntriesView",
+    "djangocms_blog.views.PostListView",
+    "djangocms_blog.views.PostDetailView",
+    "djangocms_blog.views.PostArchiveView",
+    "djangocms_blog.views.TaggedListView",
+    "djangocms_blog.views.AuthorEntriesView",
+    "djangocms_blog.views.CategoryEntriesView",
+)
+
+# Executed on every new SQLite connection (not for in-memory databases),
+# see: pylucid.sqlite_tuning - Set to () to deactivate.
+# Use "CONN_MAX_AGE" in DATABASES to reuse the connections.
+PYLUCID_SQLITE_PRAGMAS = (
+    # Readers and the writer don't block each other:
+    ("journal_mode", "WAL"),
+    # Safe in WAL mode: A power loss may only lose the last transactions
+    ("synchronous", "NORMAL"),
+    ("mmap_size", 256 * 1024 * 1024),  # 256 MB
+    # Milliseconds to wait for a lock, before "database is locked" is raised:
+    ("busy_timeout", 5000),
+)
+
+# Retention of the djangocms_history undo/redo data, used in: pylucid_history_prune
+# Keep the last X operations per page and all operations of the last X days.
+# Set one of them to None to use only the other limit.
+PYLUCID_HISTORY_KEEP_COUNT = 20
+PYLUCID_HISTORY_KEEP_DAYS = 30
+
+# Read replica database aliases, used by "pylucid.db_router.ReplicaRouter"
+# Note: DATABASE_ROUTERS and the "PinPrimaryMiddleware" must be activated, too.
+PYLUCID_DB_REPLICAS = ()
+
+# Read from the primary database after a write of the same client,
+# until the replicas have the changes:
+PYLUCID_DB_PIN_COOKIE = "pylucid_db_pin"
+PYLUCID_DB_PIN_SECONDS = 10
+
 
 # https://docs.djangoproject.com/en/1.11/topics/cache/#database-caching
 if sys.argv[0].endswith("test") or "pytest" in sys.argv or "test" in sys.argv:
@@ -174,6 +234,9 @@ else:
     # The cache tables must be created first, e.g.:
     #   $ manage.py createcachetable
     #
+    # All processes must use the same cache (not the LocMemCache):
+    # The page and blog caches are invalidated via a version in the cache.
+    #
     CACHES = {
         'default': {
             'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
@@ -249,6 +312,35 @@ LANGUAGE_DICT = dict(LANGUAGES) # useful to get translated name by language code
 # http://django-parler.readthedocs.org/en/latest/quickstart.html#configuration
 PARLER_DEFAULT_LANGUAGE_CODE = LANGUAGE_CODE
 
+# How to handle requests for not translated pages, see: pylucid.page_resolver
+#   "content" -> Serve the fallback language content under the requested url
+#   "redirect" -> Redirect to the fallback language url (like "redirect_on_fallback")
+PYLUCID_LANGUAGE_FALLBACK = "content"
+
+# Timeout in seconds of the cached page lookups.
+# Page changes will start a new "publish version", so this only limits the cache size:
+PYLUCID_PAGE_RESOLVER_CACHE_TIMEOUT = 60 * 60 * 24  # 24 hours
+
+# Part of the page ETag: Change it after template/static file changes,
+# so the clients will load the pages again, see: pylucid.middlewares.ConditionalPageMiddleware
+PYLUCID_TEMPLATE_VERSION = ""
+
+# Max. timeout in seconds of the rendered placeholders of {% pylucid_placeholder %}
+# see: pylucid.placeholder_cache
+PYLUCID_PLACEHOLDER_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+# Replace the per-user fragments (toolbar, messages etc.) with <esi:include> tags,
+# if the proxy sends: "Surrogate-Capability: ...=ESI/1.0", see: pylucid.esi
+# The proxy caches the pages: Set CMS_PAGE_CACHE = False, too.
+PYLUCID_ESI = False
+
+# The ESI fragments for {% pylucid_esi "name" %}
+# The django CMS toolbar is always available as "toolbar" via {% pylucid_toolbar %}
+PYLUCID_ESI_FRAGMENTS = {
+    "messages": "pylucid/esi/messages.html",
+    "user_link": "pylucid/esi/user_link.html",
+}
+
 
 TIME_ZONE = 'UTC'
 
@@ -273,8 +365,11 @@ MEDIA_URL = '/media/'
 
 
 
-# don't load jquery from ajax.googleapis.com, just use django's version:
-DEBUG_TOOLBAR_CONFIG["JQUERY_URL"] = STATIC_URL + "admin/js/vendor/jquery/jquery.min.js"
+# The debug toolbar merge this with its defaults (debug_toolbar.settings.CONFIG_DEFAULTS)
+DEBUG_TOOLBAR_CONFIG = {
+    # don't load jquery from ajax.googleapis.com, just use django's version:
+    "JQUERY_URL": STATIC_URL + "admin/js/vendor/jquery/jquery.min.js",
+}
 
 
 # Basic Django CMS settings
@@ -302,8 +397,10 @@ CMS_PLACEHOLDER_CONF = {
         'name': _("Content"),
         'plugins': [
             CKEDITOR,
-            plugin_anchor_menu_constants.ANCHOR_PLUGIN_NAME,
-            plugin_anchor_menu_constants.DROP_DOWN_ANCHOR_MENU_PLUGIN_NAME,
+            # django_cms_tools.plugin_anchor_menu.constants.ANCHOR_PLUGIN_NAME:
+            "AnchorPlugin",
+            # django_cms_tools.plugin_anchor_menu.constants.DROP_DOWN_ANCHOR_MENU_PLUGIN_NAME:
+            "DropDownAnchorMenuPlugin",
         ],
     },
 }
@@ -312,6 +409,13 @@ CMS_PLACEHOLDER_CONF = {
 META_SITE_PROTOCOL = 'http' # Should be changed to "https" in production!
 META_USE_SITES = True
 
+# The blog list views and feeds with response cache and keyset pagination, see: pylucid.blog_views
+BLOG_URLCONF = "pylucid.blog_urls"
+
+# Seconds to cache the rendered blog list pages for anonymous users.
+# The feeds use djangocms_blog's BLOG_FEED_CACHE_TIMEOUT
+PYLUCID_BLOG_CACHE_TIMEOUT = 600
+
 
 # http://django-filer.readthedocs.org/en/latest/installation.html#configuration
 THUMBNAIL_PROCESSORS = (
@@ -321,6 +425,34 @@ THUMBNAIL_PROCESSORS = (
     'easy_thumbnails.processors.filters',
 )
 
+# Don't change CMSPLUGIN_FILER_IMAGE_STYLE_CHOICES/CMSPLUGIN_FILER_IMAGE_DEFAULT_STYLE
+# without a migration: They are the choices and the default of the FilerImage.style field.
+# The images are rendered with srcset and WebP/AVIF variants, see: pylucid.filer_image
+
+# Store the thumbnail dimensions in the database,
+# so {{ thumbnail.width }} doesn't open the image file:
+THUMBNAIL_CACHE_DIMENSIONS = True
+
+# Generate all thumbnails of a filer image directly after upload
+# with a pool of X threads per process, see: pylucid.thumbnails
+# Or generate them with: ./manage.py pylucid_thumbnails
+PYLUCID_THUMBNAIL_PREGENERATE = True
+PYLUCID_THUMBNAIL_WORKERS = 2
+
+# Additional thumbnail options (as used in {% thumbnail %}) of your own templates, e.g.:
+#   PYLUCID_THUMBNAIL_OPTIONS = ({"size": "300x200", "crop": True},)
+PYLUCID_THUMBNAIL_OPTIONS = ()
+
+# Responsive image variants for "srcset", see: pylucid.image_variants
+# Widths in pixel:
+PYLUCID_IMAGE_WIDTHS = (320, 640, 960, 1280, 1920)
+# Additional formats, only used if Pillow can write them.
+# AVIF needs: https://pypi.org/project/pillow-avif-plugin/
+PYLUCID_IMAGE_FORMATS = ("avif", "webp")
+PYLUCID_IMAGE_VARIANTS_CACHE_TIMEOUT = 60 * 60 * 24  # 24 hours
+# Cache timeout if some variants are not generated yet:
+PYLUCID_IMAGE_VARIANTS_PARTIAL_CACHE_TIMEOUT = 60
+
 
 #_____________________________________________________________________________
 # https://github.com/mitar/cmsplugin-markup
@@ -336,14 +468,75 @@ CMS_MARKDOWN_EXTENSIONS = ()
 
 
 #_____________________________________________________________________________
+# https://github.com/chrisglass/cmsplugin-pygments
+# The highlighted html will be cached, see: pylucid.pygments_cache
+
+# Cache timeout in seconds for the highlighted html:
+PYLUCID_PYGMENTS_CACHE_TIMEOUT = 60 * 60 * 24 * 7 # 7 days
 
-# Adds 'cut_path' attribute on log record. So '%(cut_path)s' can be used in log formatter.
-# django_tools.unittest_utils.logging_utils.CutPathnameLogRecordFactory
-logging.setLogRecordFactory(CutPathnameLogRecordFactory(max_length=50))
+# Lexers that will be created on startup.
+# The lexers used in the current content will be listed by:
+#   $ ./manage.py pylucid_pygments_benchmark
+PYLUCID_PYGMENTS_PRELOAD_LEXERS = (
+    "python", "python3", "pycon", "html", "css", "js", "bash", "console", "ini", "text",
+)
+
+
+#_____________________________________________________________________________
+# Warm-up the worker process in wsgi.py before the first request, see: pylucid.warmup
+PYLUCID_WARMUP = False
+
+
+#_____________________________________________________________________________
+# PyLucid full-text search, see: pylucid.search
+
+# Filesystem path of the SQLite FTS5 search index, e.g.:
+#   PYLUCID_SEARCH_INDEX_PATH = str(Path(PROJECT_DIR, "search_index.sqlite3"))
+# None will deactivate the search. (Re-)Build the index with:
+#   $ ./manage.py pylucid_search_reindex
+PYLUCID_SEARCH_INDEX_PATH = None
+
+# Max. number of search results:
+PYLUCID_SEARCH_MAX_RESULTS = 50
+
+
+#_____________________________________________________________________________
+# PyLucid sitemap, see: pylucid.sitemap
+# The files will be written into MEDIA_ROOT with:
+#   $ ./manage.py pylucid_sitemap
+
+# Sub directory in MEDIA_ROOT:
+PYLUCID_SITEMAP_DIRNAME = "sitemap"
+
+# Titles are grouped by their primary key range into one sitemap file.
+# Max. 50.000 urls are allowed per file.
+PYLUCID_SITEMAP_CHUNK_SIZE = 10000
+
+PYLUCID_SITEMAP_PROTOCOL = "https"
+
+# Update the changed sitemap chunks on every publish/unpublish
+# (Otherwise call the management command e.g. via cron)
+PYLUCID_SITEMAP_UPDATE_ON_PUBLISH = False
+
+
+#_____________________________________________________________________________
+# PyLucid media scanner, see: pylucid.media_scan
+#   $ ./manage.py pylucid_media_scan
+
+# JSON file to store the check results. Files with unchanged mtime and size
+# will not be checked again, e.g.:
+#   PYLUCID_MEDIA_SCAN_CACHE_PATH = str(Path(PROJECT_DIR, "media_scan_cache.json"))
+PYLUCID_MEDIA_SCAN_CACHE_PATH = None
+
+# Top level directories in MEDIA_ROOT that will not be scanned:
+PYLUCID_MEDIA_SCAN_EXCLUDE = ("filer_public_thumbnails", "filer_private_thumbnails", PYLUCID_SITEMAP_DIRNAME)
+
+
+#_____________________________________________________________________________
 
-# Filter warnings and pipe them to logging system:
-# django_tools.unittest_utils.logging_utils.FilterAndLogWarnings
-warnings.showwarning = FilterAndLogWarnings()
+# Activates the 'cut_path' log record attribute (used in the formatter below)
+# and pipes warnings to the logging system on django.setup(), see: pylucid.logging_utils
+LOGGING_CONFIG = "pylucid.logging_utils.configure_logging"
 
 warnings.simplefilter("always") # Turns on all warnings
 
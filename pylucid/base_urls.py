@@ -50,11 +50,21 @@ from django.conf.urls import include, static, url
 from django.conf.urls.i18n import i18n_patterns
 from django.contrib import admin
 
+# PyLucid
+from pylucid import esi_views, tag_suggest
+from pylucid.search.views import SearchView
+
 admin.autodiscover()
 
 
 urlpatterns = i18n_patterns(
     url(r'^admin/', include(admin.site.urls)),
+    # The taggit_autosuggest widget urls, served from the PyLucid tag index:
+    url(r'^taggit_autosuggest/list/$', tag_suggest.list_tags, name='taggit_autosuggest-list'),
+    url(r'^taggit_autosuggest/list/(?P<tagmodel>[\._\w]+)/$', tag_suggest.list_tags,
+        name='taggit_autosuggest-list'),
+    url(r'^search/$', SearchView.as_view(), name='pylucid-search'),
+    url(r'^esi/(?P<name>[\w-]+)/$', esi_views.fragment, name='pylucid-esi'),
     url(r'^', include('cms.urls')),
 )
 
@@ -0,0 +1,109 @@
+# coding: utf-8
+
+"""
+    PyLucid benchmark helper
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Collect timings in the pylucid_*_benchmark management commands.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import time
+
+from pylucid.utils import human_duration
+
+
+def format_duration(seconds):
+    """
+    >>> format_duration(0.0000123)
+    '12.3 µs'
+    >>> format_duration(0.0123)
+    '12.3 ms'
+    >>> format_duration(12.3)
+    '12.3 sec'
+    """
+    if seconds < 0.001:
+        return "%.1f µs" % round(seconds * 1000000, 1)
+    return human_duration(seconds)
+
+
+class Timings:
+    """
+    Collect durations and display some statistics.
+
+    >>> timings = Timings("example")
+    >>> for duration in (0.5, 0.1, 0.2, 0.3, 0.4):
+    ...     timings.add(duration)
+    >>> timings.count
+    5
+    >>> timings.median
+    0.3
+    >>> print(timings)
+    example: 5 x, total: 1.5 sec, min: 100.0 ms, median: 300.0 ms, p95: 500.0 ms, max: 500.0 ms
+    """
+    def __init__(self, name):
+        self.name = name
+        self.durations = []
+
+    def add(self, duration):
+        self.durations.append(duration)
+
+    def measure(self, func, *args, **kwargs):
+        """
+        Call func, add the duration and return the result.
+        """
+        start_time = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.add(time.perf_counter() - start_time)
+        return result
+
+    @property
+    def count(self):
+        return len(self.durations)
+
+    @property
+    def total(self):
+        return sum(self.durations)
+
+    def percentile(self, percent):
+        durations = sorted(self.durations)
+        index = int(round((len(durations) - 1) * percent / 100))
+        return durations[index]
+
+    @property
+    def median(self):
+        return self.percentile(50)
+
+    def per_second(self):
+        """
+        Throughput: Number of measured calls per second.
+        """
+        total = self.total
+        if not total:
+            return 0
+        return self.count / total
+
+    def __str__(self):
+        if not self.durations:
+            return "%s: no data" % self.name
+
+        return "%s: %i x, total: %s, min: %s, median: %s, p95: %s, max: %s" % (
+            self.name, self.count,
+            format_duration(self.total),
+            format_duration(min(self.durations)),
+            format_duration(self.median),
+            format_duration(self.percentile(95)),
+            format_duration(max(self.durations)),
+        )
+
+
+def get_page_urls():
+    """
+    The urls of all published django CMS pages, that anonymous users can see.
+    """
+    from cms.models import Title
+
+    titles = Title.objects.public().filter(published=True, page__login_required=False).select_related("page")
+    return [title.page.get_absolute_url(title.language) for title in titles]
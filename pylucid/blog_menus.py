@@ -0,0 +1,118 @@
+# coding: utf-8
+
+"""
+    PyLucid djangocms_blog menu
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The nodes of djangocms_blog.cms_menus.BlogCategoryMenu, but with a
+    constant number of queries: The posts and categories are loaded with
+    their translations (see: pylucid.parler_prefetch) and the categories of
+    the posts are prefetched, see: pylucid.blog_views.optimize_posts()
+
+    The menu has the same class name and replaces the origin menu in the
+    menu pool, see: pylucid.apps.PyLucidConfig.ready()
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.contrib.sites.shortcuts import get_current_site
+from django.utils.translation import get_language_from_request
+
+from djangocms_blog import cms_menus
+from djangocms_blog.cms_appconfig import BlogConfig
+from djangocms_blog.models import BlogCategory, Post
+from djangocms_blog.settings import MENU_TYPE_CATEGORIES, MENU_TYPE_COMPLETE, MENU_TYPE_NONE, MENU_TYPE_POSTS
+from menus.base import NavigationNode
+from menus.menu_pool import menu_pool
+
+# PyLucid
+from pylucid.blog_views import optimize_posts
+from pylucid.parler_prefetch import get_prefetch_languages, with_translation_prefetch
+
+
+def get_node_id(obj):
+    return "%s-%s" % (obj.__class__.__name__, obj.pk)
+
+
+class BlogCategoryMenu(cms_menus.BlogCategoryMenu):
+    @classmethod
+    def get_apphooks(cls):
+        # djangocms_blog.cms_apps.BlogApp is attached to the origin menu class
+        return cms_menus.BlogCategoryMenu.get_apphooks()
+
+    def get_config(self):
+        namespace = self.instance.application_namespace
+        if not self._config.get(namespace, False):
+            self._config[namespace] = BlogConfig.objects.get(namespace=namespace)
+        return self._config[namespace]
+
+    def get_nodes(self, request):
+        """
+        Same nodes as the origin get_nodes()
+        """
+        language = get_language_from_request(request, check_path=True)
+        languages = get_prefetch_languages(language)
+
+        if self.instance.node.site != get_current_site(request):
+            return []
+
+        config = self.get_config()
+        if not getattr(request, "toolbar", False) or not request.toolbar.edit_mode_active:
+            if self.instance == self.instance.get_draft_object():
+                return []
+        else:
+            if self.instance == self.instance.get_public_object():
+                return []
+
+        if config.menu_structure == MENU_TYPE_NONE:
+            return []
+        categories_menu = config.menu_structure in (MENU_TYPE_COMPLETE, MENU_TYPE_CATEGORIES)
+        posts_menu = config.menu_structure in (MENU_TYPE_COMPLETE, MENU_TYPE_POSTS)
+
+        nodes = []
+        used_categories = set()
+        if posts_menu:
+            posts = Post.objects.namespace(self.instance.application_namespace).on_site()
+            posts = optimize_posts(posts.active_translations(language).distinct())
+            posts = posts.prefetch_translations("categories", languages=languages)
+            for post in posts:
+                categories = post.categories.all()
+                used_categories.update(category.pk for category in categories)
+                parent = None
+                if categories_menu:
+                    category = post.categories.first()
+                    if category is None:
+                        continue
+                    parent = get_node_id(category)
+                nodes.append(NavigationNode(
+                    post.get_title(), post.get_absolute_url(language), get_node_id(post), parent
+                ))
+
+        if categories_menu:
+            categories = BlogCategory.objects.namespace(self.instance.application_namespace)
+            categories = categories.active_translations(language)
+            if not config.menu_empty_categories:
+                categories = categories.filter(pk__in=used_categories)
+            categories = categories.distinct().order_by("parent__id", "translations__name")
+            categories = categories.select_related("app_config").prefetch_related("translations")
+            added_categories = set()
+            for category in with_translation_prefetch(categories, languages=languages):
+                if category.pk in added_categories:
+                    continue
+                added_categories.add(category.pk)
+                nodes.append(NavigationNode(
+                    category.name,
+                    category.get_absolute_url(),
+                    get_node_id(category),
+                    "%s-%s" % (BlogCategory.__name__, category.parent_id) if category.parent_id else None,
+                ))
+
+        return nodes
+
+
+def replace_origin_menu():
+    """
+    The CMS finds the menu by the class name, e.g.: in page.navigation_extenders
+    """
+    menu_pool.menus[BlogCategoryMenu.__name__] = BlogCategoryMenu
@@ -0,0 +1,37 @@
+# coding: utf-8
+
+"""
+    PyLucid djangocms_blog urls
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The djangocms_blog urls with the cached list views and feeds
+    from pylucid.blog_views, used via: BLOG_URLCONF = "pylucid.blog_urls"
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.conf.urls import url
+
+from djangocms_blog.feeds import FBInstantArticles
+from djangocms_blog.urls import detail_urls
+
+# PyLucid
+from pylucid.blog_views import (
+    AuthorEntriesView, CategoryEntriesView, LatestEntriesFeed, PostArchiveView, PostListView, TagFeed,
+    TaggedListView
+)
+
+
+app_name = "djangocms_blog"
+urlpatterns = [
+    url(r"^$", PostListView.as_view(), name="posts-latest"),
+    url(r"^feed/$", LatestEntriesFeed(), name="posts-latest-feed"),
+    url(r"^feed/fb/$", FBInstantArticles(), name="posts-latest-feed-fb"),
+    url(r"^(?P<year>\d{4})/$", PostArchiveView.as_view(), name="posts-archive"),
+    url(r"^(?P<year>\d{4})/(?P<month>\d{1,2})/$", PostArchiveView.as_view(), name="posts-archive"),
+    url(r"^author/(?P<username>[\w\.@+-]+)/$", AuthorEntriesView.as_view(), name="posts-author"),
+    url(r"^category/(?P<category>[\w\.@+-]+)/$", CategoryEntriesView.as_view(), name="posts-category"),
+    url(r"^tag/(?P<tag>[-\w]+)/$", TaggedListView.as_view(), name="posts-tagged"),
+    url(r"^tag/(?P<tag>[-\w]+)/feed/$", TagFeed(), name="posts-tagged-feed"),
+] + detail_urls
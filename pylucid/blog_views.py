@@ -0,0 +1,317 @@
+# coding: utf-8
+
+"""
+    PyLucid djangocms_blog views
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The list views and feeds of djangocms_blog with:
+
+     * A response cache for the requests that get the same page for everybody
+       (see: pylucid.placeholder_cache.is_cacheable()). The key contains the
+       url (with the tag, category, etc.), the pagination cursor, the language,
+       the site and the publish version. Saving a blog post or category and
+       changing the categories, sites or tags of a post starts a new publish
+       version, see: pylucid.apps.PyLucidConfig.ready()
+
+     * All posts with their categories and translations in a constant number
+       of queries, see: optimize_posts()
+
+     * Keyset pagination: The list pages link with "?before=<cursor>" and
+       "?after=<cursor>" to the next/previous posts, instead of "?page=<number>".
+       The database doesn't need to skip all posts of the previous pages with
+       OFFSET, so deep archive pages are as fast as the first one.
+
+    Activated with: BLOG_URLCONF = "pylucid.blog_urls"
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import datetime
+import hashlib
+import logging
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db.models import Prefetch, Q
+from django.http import Http404, HttpResponse
+from django.utils import translation
+
+from cms.utils import get_current_site
+from djangocms_blog import feeds, views
+from djangocms_blog.models import BlogCategory, Post
+from djangocms_blog.settings import get_setting
+
+# PyLucid
+from pylucid.page_resolver import get_publish_version, page_changed
+from pylucid.parler_prefetch import with_translation_prefetch
+from pylucid.placeholder_cache import is_cacheable
+
+
+log = logging.getLogger(__name__)
+
+
+BEFORE_PARAM = "before"
+AFTER_PARAM = "after"
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def encode_cursor(date, pk):
+    """
+    >>> encode_cursor(datetime.datetime(2019, 5, 20, 12, 30, 0, 123, tzinfo=datetime.timezone.utc), 42)
+    '1558355400000123-42'
+    """
+    microseconds = (date - EPOCH) // datetime.timedelta(microseconds=1)
+    return "%i-%i" % (microseconds, pk)
+
+
+def decode_cursor(cursor):
+    """
+    Returns (date, pk) or raise ValueError
+
+    >>> decode_cursor('1558355400000123-42')
+    (datetime.datetime(2019, 5, 20, 12, 30, 0, 123, tzinfo=datetime.timezone.utc), 42)
+    >>> decode_cursor('foo')
+    Traceback (most recent call last):
+        ...
+    ValueError: Invalid cursor: 'foo'
+    """
+    try:
+        microseconds, pk = [int(part) for part in cursor.split("-")]
+    except ValueError:
+        raise ValueError("Invalid cursor: %r" % cursor)
+    return EPOCH + datetime.timedelta(microseconds=microseconds), pk
+
+
+def optimize_posts(queryset):
+    """
+    The prefetching of djangocms_blog.views.BaseBlogView.optimize() and:
+     * The categories are ordered: post.categories.first() (e.g.: in
+       Post.get_absolute_url()) takes the prefetched category.
+     * The translations of the current language and the fallbacks are in the
+       local parler cache of the posts and categories.
+    """
+    if getattr(queryset, "_translation_prefetch", None) is not None:
+        # Already optimized, e.g.: CategoryEntriesView.get_queryset() calls optimize() again
+        return queryset
+
+    categories = BlogCategory.objects.select_related("app_config").order_by("pk")
+    queryset = queryset.select_related("app_config").prefetch_related(
+        "translations", Prefetch("categories", queryset=categories), "categories__translations"
+    )
+    return with_translation_prefetch(queryset, "categories")
+
+
+KeysetPage = collections.namedtuple("KeysetPage", "pks newer_cursor older_cursor")
+
+
+def get_keyset_page(queryset, page_size, before=None, after=None):
+    """
+    Returns the post IDs of one page (newest first) and the cursors of the
+    newer/older page (None if there is no newer/older page).
+    before/after: (date, pk) of the first/last post of the previous page.
+    """
+    rows = queryset.values_list("pk", "date_published")
+    if after is not None:
+        date, pk = after
+        rows = rows.filter(Q(date_published__gt=date) | Q(date_published=date, pk__gt=pk))
+        rows = list(rows.order_by("date_published", "pk")[:page_size + 1])
+        has_newer, has_older = len(rows) > page_size, True
+        rows = list(reversed(rows[:page_size]))
+    else:
+        if before is not None:
+            date, pk = before
+            rows = rows.filter(Q(date_published__lt=date) | Q(date_published=date, pk__lt=pk))
+        rows = list(rows.order_by("-date_published", "-pk")[:page_size + 1])
+        has_newer, has_older = before is not None, len(rows) > page_size
+        rows = rows[:page_size]
+
+    if not rows:
+        return KeysetPage([], None, None)
+
+    return KeysetPage(
+        pks=[pk for pk, date in rows],
+        newer_cursor=encode_cursor(rows[0][1], rows[0][0]) if has_newer else None,
+        older_cursor=encode_cursor(rows[-1][1], rows[-1][0]) if has_older else None,
+    )
+
+
+def is_shared_request(request):
+    """
+    The response is the same for everybody: Not for editors and no messages in the page.
+    """
+    if not is_cacheable(request):
+        return False
+    if not getattr(request, "pylucid_esi", False) and len(get_messages(request)):
+        # The messages are rendered into the page
+        return False
+    return True
+
+
+def get_cache_key(request, prefix):
+    """
+    Contains only the cursor parameters of the query string, so e.g.:
+    tracking parameters don't fill the cache.
+    """
+    parts = [
+        get_current_site().pk,
+        translation.get_language(),
+        request.path,
+        request.GET.get(BEFORE_PARAM, ""),
+        request.GET.get(AFTER_PARAM, ""),
+        getattr(request, "pylucid_esi", False),
+        get_publish_version(),
+    ]
+    key = "|".join(str(part) for part in parts)
+    return "pylucid_blog_%s_%s" % (prefix, hashlib.md5(key.encode("utf-8")).hexdigest())
+
+
+def post_relations_changed(sender, action, **kwargs):
+    """
+    m2m_changed handler for the categories and sites of the posts:
+    The admin saves them after the post_save of the post.
+    """
+    if action in ("post_add", "post_remove", "post_clear"):
+        page_changed()
+
+
+def tagged_item_changed(sender, instance, **kwargs):
+    """
+    post_save/post_delete handler for the tagged items: Only the tags of the posts.
+    """
+    if instance.content_type_id == ContentType.objects.get_for_model(Post).pk:
+        page_changed()
+
+
+def get_cached_response(cache_key):
+    value = cache.get(cache_key)
+    if value is None:
+        return None
+    content, headers = value
+    log.debug("Blog cache hit: %r", cache_key)
+    response = HttpResponse(content)
+    # All headers (Content-Type, Vary, Content-Language, etc.) like cms.cache.page:
+    response._headers = headers
+    return response
+
+
+def store_response(cache_key, response, timeout):
+    if response.status_code == 200:
+        cache.set(cache_key, (response.content, response._headers), timeout)
+
+
+class CachedResponseMixin:
+    def get(self, request, *args, **kwargs):
+        if not is_shared_request(request):
+            return super().get(request, *args, **kwargs)
+
+        cache_key = get_cache_key(request, "list")
+        response = get_cached_response(cache_key)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            response.add_post_render_callback(
+                lambda response: store_response(cache_key, response, settings.PYLUCID_BLOG_CACHE_TIMEOUT)
+            )
+        return response
+
+
+class KeysetPaginationMixin:
+    keyset_page = None
+
+    def get_cursor(self, name):
+        cursor = self.request.GET.get(name)
+        if not cursor:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except ValueError as err:
+            raise Http404(err)
+
+    def paginate_queryset(self, queryset, page_size):
+        toolbar = getattr(self.request, "toolbar", None)
+        if toolbar is not None and toolbar.edit_mode_active:
+            # Editors see also the unpublished posts (maybe without a publish date)
+            return super().paginate_queryset(queryset, page_size)
+
+        self.keyset_page = get_keyset_page(
+            queryset, page_size,
+            before=self.get_cursor(BEFORE_PARAM),
+            after=self.get_cursor(AFTER_PARAM),
+        )
+        # Evaluated in the template, with all prefetch_related() of the view:
+        object_list = queryset.filter(pk__in=self.keyset_page.pks).order_by("-date_published", "-pk")
+        return None, None, object_list, False
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.keyset_page is not None:
+            context["keyset_page"] = self.keyset_page
+            context["before_param"] = BEFORE_PARAM
+            context["after_param"] = AFTER_PARAM
+        return context
+
+    def get_template_names(self):
+        template_names = super().get_template_names()
+        if self.config and self.config.template_prefix:
+            # A custom template set, it should support the keyset pagination, too.
+            return template_names
+        if isinstance(template_names, str):
+            # djangocms_blog returns only one template name
+            template_names = [template_names]
+        return ["pylucid/blog/post_list.html"] + list(template_names)
+
+
+class OptimizedPostsMixin:
+    def optimize(self, qs):
+        return optimize_posts(qs)
+
+
+class PostListView(CachedResponseMixin, KeysetPaginationMixin, OptimizedPostsMixin, views.PostListView):
+    pass
+
+
+class PostArchiveView(CachedResponseMixin, KeysetPaginationMixin, OptimizedPostsMixin, views.PostArchiveView):
+    pass
+
+
+class TaggedListView(CachedResponseMixin, KeysetPaginationMixin, OptimizedPostsMixin, views.TaggedListView):
+    pass
+
+
+class AuthorEntriesView(CachedResponseMixin, KeysetPaginationMixin, OptimizedPostsMixin, views.AuthorEntriesView):
+    pass
+
+
+class CategoryEntriesView(
+        CachedResponseMixin, KeysetPaginationMixin, OptimizedPostsMixin, views.CategoryEntriesView):
+    pass
+
+
+class CachedFeedMixin:
+    """
+    The feeds contains only published posts: Always the same for everybody.
+    """
+    def __call__(self, request, *args, **kwargs):
+        cache_key = get_cache_key(request, "feed")
+        response = get_cached_response(cache_key)
+        if response is None:
+            response = super().__call__(request, *args, **kwargs)
+            store_response(cache_key, response, get_setting("FEED_CACHE_TIMEOUT"))
+        return response
+
+
+class OptimizedFeedMixin:
+    def items(self, obj=None):
+        return optimize_posts(super().items(obj))
+
+
+class LatestEntriesFeed(CachedFeedMixin, OptimizedFeedMixin, feeds.LatestEntriesFeed):
+    pass
+
+
+class TagFeed(CachedFeedMixin, OptimizedFeedMixin, feeds.TagFeed):
+    pass
@@ -0,0 +1,55 @@
+# coding: utf-8
+
+"""
+    PyLucid system checks
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Registered in pylucid.apps.PyLucidConfig.ready()
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.conf import settings
+from django.core import checks
+
+from cms.utils.conf import get_cms_setting
+
+
+# Cache backends that are not shared between processes:
+LOCAL_CACHE_BACKENDS = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """
+    The publish version (see: pylucid.page_resolver) and the tag index version
+    (see: pylucid.tag_suggest) are stored in the default cache. With a per
+    process cache, a change in one process doesn't invalidate the others.
+    """
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        checks.Warning(
+            "The default cache %r is not shared between processes:"
+            " Other processes will serve stale pages after changes." % backend,
+            hint="Use a shared cache backend, e.g. the database cache or memcached.",
+            id="pylucid.W001",
+        )
+    ]
+
+
+def check_esi_page_cache(app_configs, **kwargs):
+    """
+    The django CMS page cache would store the page with the ESI tags and deliver it
+    to clients without ESI (and vice versa), see: pylucid.esi
+    """
+    if not settings.PYLUCID_ESI or not get_cms_setting("PAGE_CACHE"):
+        return []
+    return [
+        checks.Error(
+            "PYLUCID_ESI can't be used with the django CMS page cache.",
+            hint="Set CMS_PAGE_CACHE = False: The ESI proxy caches the pages.",
+            id="pylucid.E001",
+        )
+    ]
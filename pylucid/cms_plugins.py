@@ -0,0 +1,43 @@
+# coding: utf-8
+
+"""
+    PyLucid cms plugins
+    ~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.apps import apps
+
+from cms.plugin_pool import plugin_pool
+
+
+if apps.is_installed("cmsplugin_pygments"):
+    from cmsplugin_pygments.cms_plugins import CMSPygmentsPlugin as OriginCMSPygmentsPlugin
+
+    from pylucid.pygments_cache import highlight_code
+
+    class CMSPygmentsPlugin(OriginCMSPygmentsPlugin):
+        """
+        Same as the origin plugin, but use the PyLucid pygments cache.
+        Must have the same class name, because it's the plugin type
+        stored in the database.
+        """
+        def render(self, context, instance, placeholder):
+            html, css = highlight_code(
+                code=instance.code,
+                lexer_name=instance.code_language,
+                style_name=instance.style,
+                linenos=instance.linenumbers,
+            )
+            context.update({
+                'pygments_html': html,
+                'css': css,
+                'object': instance,
+                'placeholder': placeholder,
+            })
+            return context
+
+    plugin_pool.unregister_plugin(OriginCMSPygmentsPlugin)
+    plugin_pool.register_plugin(CMSPygmentsPlugin)
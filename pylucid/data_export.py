@@ -0,0 +1,158 @@
+# coding: utf-8
+
+"""
+    PyLucid data export
+    ~~~~~~~~~~~~~~~~~~~
+
+    Streaming JSON/NDJSON export with constant memory usage.
+
+    The output uses the same structure as the Django "json" serializer,
+    so it can be imported via "loaddata" or "pylucid_import".
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import itertools
+import json
+import logging
+import zlib
+
+from django.core.serializers import python
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+
+
+log = logging.getLogger(__name__)
+
+
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+
+CONTENT_TYPES = {
+    FORMAT_JSON: "application/json",
+    FORMAT_NDJSON: "application/x-ndjson",
+}
+
+
+class PrefetchSerializer(python.Serializer):
+    """
+    The origin serializer use .iterator() for many-to-many fields,
+    which ignores prefetched objects and makes one query per object and field.
+    Foreign keys are serialized via the "<field>_id" attribute, so there are no
+    queries that select_related() could save.
+    """
+    def handle_m2m_field(self, obj, field):
+        if field.remote_field.through._meta.auto_created:
+            self._current[field.name] = [
+                self._value_from_field(related, related._meta.pk) for related in getattr(obj, field.name).all()
+            ]
+
+
+def get_m2m_field_names(model):
+    """
+    Returns the many-to-many fields that the serializer will export.
+
+    >>> from django.contrib.auth.models import User
+    >>> get_m2m_field_names(User)
+    ['groups', 'user_permissions']
+    """
+    return [
+        field.name for field in model._meta.concrete_model._meta.local_many_to_many
+        if field.serialize and field.remote_field.through._meta.auto_created
+    ]
+
+
+def iter_chunks(queryset, chunk_size):
+    """
+    Yields lists of objects. Only one chunk is in memory.
+    The many-to-many relations are prefetched per chunk.
+    """
+    if not queryset.ordered:
+        queryset = queryset.order_by("pk")
+
+    m2m_field_names = get_m2m_field_names(queryset.model)
+    iterator = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            break
+        if m2m_field_names:
+            prefetch_related_objects(chunk, *m2m_field_names)
+        yield chunk
+
+
+def iter_dump_objects(queryset, chunk_size=500):
+    """
+    Yields the serialized objects as dicts.
+    """
+    serializer = PrefetchSerializer()
+    for chunk in iter_chunks(queryset, chunk_size):
+        yield from serializer.serialize(chunk)
+
+
+def iter_json(queryset, chunk_size=500):
+    """
+    The same output as: serializers.serialize("json", queryset, indent=4)
+    """
+    yield "["
+    for no, dump_object in enumerate(iter_dump_objects(queryset, chunk_size)):
+        if no:
+            yield ","
+        yield "\n" + json.dumps(dump_object, cls=DjangoJSONEncoder, indent=4)
+    yield "\n]\n"
+
+
+def iter_ndjson(queryset, chunk_size=500):
+    """
+    One JSON object per line
+    """
+    for dump_object in iter_dump_objects(queryset, chunk_size):
+        yield json.dumps(dump_object, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n"
+
+
+def iter_gzip(lines, min_size=64 * 1024):
+    """
+    Compress the given text lines.
+    Collect at least min_size bytes before a part is yielded.
+
+    >>> import gzip
+    >>> gzip.decompress(b"".join(iter_gzip(["foo\\n", "bar\\n"]))).decode("utf-8")
+    'foo\\nbar\\n'
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)  # with gzip header
+    buffer = []
+    size = 0
+    for line in lines:
+        data = compressor.compress(line.encode("utf-8"))
+        if data:
+            buffer.append(data)
+            size += len(data)
+            if size >= min_size:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+    buffer.append(compressor.flush())
+    yield b"".join(buffer)
+
+
+def streaming_export_response(queryset, export_format=FORMAT_JSON, compress=False, chunk_size=500):
+    opts = queryset.model._meta
+    if export_format == FORMAT_NDJSON:
+        content = iter_ndjson(queryset, chunk_size)
+    else:
+        content = iter_json(queryset, chunk_size)
+
+    filename = "%s.%s.%s" % (opts.app_label, opts.model_name, export_format)
+    if compress:
+        content = iter_gzip(content)
+        content_type = "application/gzip"
+        filename += ".gz"
+    else:
+        content_type = "%s; charset=utf-8" % CONTENT_TYPES[export_format]
+
+    log.debug("Export %s as %r", opts.label, filename)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = 'attachment; filename="%s"' % filename
+    return response
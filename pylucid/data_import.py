@@ -0,0 +1,242 @@
+# coding: utf-8
+
+"""
+    PyLucid data import
+    ~~~~~~~~~~~~~~~~~~~
+
+    Fast import of data exported via pylucid.data_export
+    (or "dumpdata" JSON files).
+
+    The file is parsed and validated object by object and the objects
+    are written with bulk inserts in batches inside one transaction.
+    In contrast to "loaddata" no model signals are sent.
+
+    The primary keys are taken from the file, so they must not exist
+    in the target database.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import gzip
+import json
+import logging
+
+from django.core.management.color import no_style
+from django.core.serializers import python
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from treebeard.mp_tree import MP_Node
+
+
+log = logging.getLogger(__name__)
+
+
+ImportStats = collections.namedtuple("ImportStats", "objects m2m models")
+
+
+def iter_json_array(stream, read_size=64 * 1024):
+    """
+    Yields the objects of a JSON array without loading the complete file.
+
+    >>> import io
+    >>> list(iter_json_array(io.StringIO('[{"a": 1},\\n {"b": [2, 3]} ]'), read_size=3))
+    [{'a': 1}, {'b': [2, 3]}]
+    >>> list(iter_json_array(io.StringIO('[]')))
+    []
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    while True:
+        # Skip whitespace and the array brackets/separators between the objects:
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] in "[,]"):
+            pos += 1
+
+        if pos < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The item is not complete -> read more
+            else:
+                yield item
+                pos = end
+                continue
+
+        if eof:
+            return
+
+        data = stream.read(read_size)
+        if not data:
+            eof = True
+        buffer = buffer[pos:] + data
+        pos = 0
+
+
+def iter_ndjson(stream):
+    """
+    >>> import io
+    >>> list(iter_ndjson(io.StringIO('{"a": 1}\\n\\n{"b": 2}\\n')))
+    [{'a': 1}, {'b': 2}]
+    """
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_dump_file(path):
+    """
+    Yields the dump objects of a JSON or NDJSON file (optionally gzip compressed).
+    """
+    path = str(path)
+    if path.endswith(".gz"):
+        stream = gzip.open(path, "rt", encoding="utf-8")
+    else:
+        stream = open(path, "r", encoding="utf-8")
+
+    with stream:
+        first_char = stream.read(1)
+        while first_char.isspace():
+            first_char = stream.read(1)
+        stream.seek(0)
+
+        if first_char == "[":
+            yield from iter_json_array(stream)
+        else:
+            yield from iter_ndjson(stream)
+
+
+class TreePathRenumber:
+    """
+    treebeard materialized path trees (e.g. the django CMS page tree)
+    can't have the same path twice. If the target tree is not empty,
+    the imported root nodes are placed after the existing root nodes.
+    """
+    def __init__(self, model, using):
+        self.model = model
+        last_root = model._base_manager.using(using).filter(depth=1).order_by("-path").first()
+        self.offset = model._str2int(last_root.path) if last_root else 0
+        if self.offset:
+            log.info("%s: Move imported root nodes by %i", model._meta.label, self.offset)
+
+    def __call__(self, obj):
+        if self.offset:
+            model = self.model
+            root_step = model._str2int(obj.path[:model.steplen]) + self.offset
+            obj.path = model._get_path(None, 1, root_step) + obj.path[model.steplen:]
+
+
+class BulkWriter:
+    def __init__(self, batch_size, using):
+        self.batch_size = batch_size
+        self.using = using
+        self.connection = connections[using]
+        self.models = set()
+        self.object_count = 0
+        self.m2m_count = 0
+        self.tree_renumbers = {}
+
+        self.model = None
+        self.objects = []
+        self.m2m_data = []
+
+    def add(self, deserialized_object):
+        obj = deserialized_object.object
+        model = type(obj)
+        if model != self.model or len(self.objects) >= self.batch_size:
+            self.flush()
+            self.model = model
+
+        if isinstance(obj, MP_Node):
+            if model not in self.tree_renumbers:
+                self.tree_renumbers[model] = TreePathRenumber(model, self.using)
+            self.tree_renumbers[model](obj)
+
+        self.objects.append(obj)
+        if deserialized_object.m2m_data:
+            self.m2m_data.append((obj.pk, deserialized_object.m2m_data))
+
+    def flush(self):
+        if not self.objects:
+            return
+
+        model = self.model
+        # Only the fields of the own table, the parents of multi-table inheritance
+        # models are separate objects in the export:
+        fields = [field for field in model._meta.local_concrete_fields]
+        max_batch_size = max(self.connection.ops.bulk_batch_size(fields, self.objects), 1)
+        for start in range(0, len(self.objects), max_batch_size):
+            # raw=True: Use the values from the file (e.g. don't update auto_now fields)
+            model._base_manager._insert(
+                self.objects[start:start + max_batch_size], fields=fields, raw=True, using=self.using
+            )
+
+        for field_name, related_ids in self._group_m2m_data():
+            field = model._meta.get_field(field_name)
+            through = field.remote_field.through
+            source_attname = through._meta.get_field(field.m2m_field_name()).attname
+            target_attname = through._meta.get_field(field.m2m_reverse_field_name()).attname
+            through_objects = [
+                through(**{source_attname: source_id, target_attname: target_id})
+                for source_id, target_id in related_ids
+            ]
+            through._base_manager.using(self.using).bulk_create(through_objects, batch_size=self.batch_size)
+            self.m2m_count += len(through_objects)
+            self.models.add(through)
+
+        self.object_count += len(self.objects)
+        self.models.add(model)
+        self.objects = []
+        self.m2m_data = []
+
+    def _group_m2m_data(self):
+        related_ids = collections.defaultdict(list)
+        for pk, m2m_data in self.m2m_data:
+            for field_name, target_ids in m2m_data.items():
+                if not target_ids:
+                    continue
+                related_ids[field_name] += [(pk, target_id) for target_id in target_ids]
+        return related_ids.items()
+
+
+def import_dump_objects(dump_objects, batch_size=500, using=DEFAULT_DB_ALIAS, ignorenonexistent=False):
+    """
+    Validate and write the given dump objects into the database.
+    Everything is rolled back on any error.
+    """
+    connection = connections[using]
+    writer = BulkWriter(batch_size, using)
+    with transaction.atomic(using=using):
+        with connection.constraint_checks_disabled():
+            for deserialized_object in python.Deserializer(
+                dump_objects, using=using, ignorenonexistent=ignorenonexistent
+            ):
+                writer.add(deserialized_object)
+            writer.flush()
+
+        table_names = [model._meta.db_table for model in writer.models]
+        connection.check_constraints(table_names=table_names)
+
+        # Needed for e.g. PostgreSQL, because the primary keys are inserted:
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), writer.models)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for line in sequence_sql:
+                    cursor.execute(line)
+
+    return ImportStats(writer.object_count, writer.m2m_count, len(writer.models))
+
+
+def validate_dump_objects(dump_objects, using=DEFAULT_DB_ALIAS, ignorenonexistent=False):
+    """
+    Only deserialize all objects without writing. Returns the number of objects.
+    """
+    count = 0
+    for __ in python.Deserializer(dump_objects, using=using, ignorenonexistent=ignorenonexistent):
+        count += 1
+    return count
@@ -0,0 +1,144 @@
+# coding: utf-8
+
+"""
+    PyLucid database router
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Send read queries to the read replicas in settings.PYLUCID_DB_REPLICAS
+    and all writes to the "default" database.
+
+    After a write, all reads of the current thread are "pinned" to the
+    primary. The PinPrimaryMiddleware resets the pinning on every request
+    and sets a cookie, so the next requests of the same client will read
+    from the primary, too, until the replica has caught up.
+
+    In a request, only the real writes pin the primary: The handler
+    record_write() of post_save, post_delete and m2m_changed. Django asks
+    db_for_write() for every write queryset, e.g. in get_or_create() even
+    if nothing is created. Bulk writes (e.g. QuerySet.update()) send no
+    signals: Read them back in a use_primary() block. Outside of a request
+    (e.g. management commands) every db_for_write() pins the primary.
+
+    Activate with, e.g.:
+
+        DATABASES["replica"] = {... same as "default", but the replica database ...}
+        DATABASE_ROUTERS = ["pylucid.db_router.ReplicaRouter"]
+        PYLUCID_DB_REPLICAS = ("replica",)
+        MIDDLEWARE += ("pylucid.middlewares.PinPrimaryMiddleware",)
+
+    For local tests a copy of the SQLite database file can be used as replica.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import contextlib
+import itertools
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+
+log = logging.getLogger(__name__)
+
+
+_state = threading.local()
+
+
+def is_pinned():
+    return getattr(_state, "pinned", False)
+
+
+def has_written():
+    return getattr(_state, "written", False)
+
+
+def pin_primary():
+    """
+    Use the primary for all reads of the current thread.
+    """
+    _state.pinned = True
+
+
+def in_request():
+    return getattr(_state, "request", False)
+
+
+def reset_state():
+    _state.pinned = False
+    _state.written = False
+    _state.request = False
+
+
+def start_request():
+    """
+    Called by the PinPrimaryMiddleware: Only the real writes pin the primary.
+    """
+    reset_state()
+    _state.request = True
+
+
+def record_write(**kwargs):
+    """
+    Signal handler for post_save, post_delete and m2m_changed.
+    """
+    if kwargs.get("action", "post_").startswith("post_"):
+        pin_primary()
+        _state.written = True
+
+
+def connect_signals():
+    for signal in (post_save, post_delete, m2m_changed):
+        signal.connect(record_write, dispatch_uid="pylucid_db_router")
+
+
+@contextlib.contextmanager
+def use_primary():
+    """
+    Read from the primary in the with block, e.g.: Directly after a write in a other thread.
+    """
+    old_pinned = is_pinned()
+    pin_primary()
+    try:
+        yield
+    finally:
+        _state.pinned = old_pinned
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.replicas = tuple(settings.PYLUCID_DB_REPLICAS)
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+
+    def get_replica(self):
+        with self._lock:
+            return next(self._cycle)
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or is_pinned():
+            return DEFAULT_DB_ALIAS
+        return self.get_replica()
+
+    def db_for_write(self, model, **hints):
+        if not in_request():
+            # Bulk writes and raw SQL send no signals:
+            pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas contains the same data as the primary:
+        databases = {DEFAULT_DB_ALIAS}
+        databases.update(self.replicas)
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in self.replicas:
+            # The replicas get the changes from the primary
+            return False
+        return None
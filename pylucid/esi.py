@@ -0,0 +1,123 @@
+# coding: utf-8
+
+"""
+    PyLucid edge side includes
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    "Hole punching" for a caching reverse proxy (e.g.: Varnish):
+    The page shell is rendered the same for all users and the per-user
+    fragments (django CMS toolbar, messages, login/logout link) are
+    replaced with <esi:include> tags. The proxy fetches them with small
+    sub-requests from pylucid.esi_views and assembles the page.
+
+    Note: No CSRF token fragment: The proxy drops the "Set-Cookie" header of
+    fragments, so a new visitor would get a token without the cookie.
+
+    In templates use:
+        {% load pylucid_esi %}
+        {% pylucid_toolbar %}         instead of {% cms_toolbar %}
+        {% pylucid_esi "messages" %}  for the fragments in settings.PYLUCID_ESI_FRAGMENTS
+
+    Without ESI the fragments are rendered inline, as before. A page with
+    messages of the user is not stored in the django CMS page cache.
+
+    The ESI mode is used if settings.PYLUCID_ESI is set and the proxy
+    announces ESI support with the "Surrogate-Capability" request header.
+    The response will get a "Surrogate-Control" header, if it contains
+    ESI tags. Editors in edit/structure mode always get the normal page.
+
+    The django CMS page cache doesn't know the ESI mode (its cache key is
+    only the path), so it must be deactivated with CMS_PAGE_CACHE = False,
+    see: pylucid.checks
+
+    e.g. for Varnish:
+        sub vcl_recv {
+            set req.http.Surrogate-Capability = "varnish=ESI/1.0";
+        }
+        sub vcl_backend_response {
+            if (beresp.http.Surrogate-Control ~ "ESI/1.0") {
+                unset beresp.http.Surrogate-Control;
+                set beresp.do_esi = true;
+            }
+        }
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import copy
+import logging
+from urllib.parse import urlencode, urlparse
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.http import is_safe_url
+
+
+log = logging.getLogger(__name__)
+
+
+ESI_CAPABILITY = "ESI/1.0"
+
+TOOLBAR_FRAGMENT = "toolbar"
+
+
+def is_esi_request(request):
+    """
+    Called in pylucid.middlewares.EsiMiddleware
+    """
+    if not settings.PYLUCID_ESI or request.method not in ("GET", "HEAD"):
+        return False
+
+    if ESI_CAPABILITY not in request.META.get("HTTP_SURROGATE_CAPABILITY", ""):
+        return False
+
+    toolbar = getattr(request, "toolbar", None)
+    if toolbar is not None and toolbar.edit_mode_active:
+        # The page content itself is different for editors
+        return False
+
+    return True
+
+
+def get_fragment_url(name, request):
+    """
+    The fragments get the path of the page, e.g.: for the toolbar
+    """
+    url = reverse("pylucid-esi", kwargs={"name": name})
+    return "%s?%s" % (url, urlencode({"path": request.get_full_path()}))
+
+
+def render_esi_include(name, request):
+    """
+    Returns the ESI tag and mark the request, so the response gets the "Surrogate-Control" header.
+    """
+    request.pylucid_esi_used = True
+    return '<esi:include src="%s" />' % escape(get_fragment_url(name, request))
+
+
+def disable_page_cache(request):
+    """
+    Don't put the response into the django CMS page cache (same as for editors),
+    e.g.: it contains the messages of the current user, see: cms.cache.page.set_page_cache()
+    """
+    toolbar = getattr(request, "toolbar", None)
+    if toolbar is not None:
+        toolbar._cache_disabled = True
+
+
+def get_origin_request(request):
+    """
+    Returns a copy of the fragment request with the path of the origin page.
+    """
+    path = request.GET.get("path", "")
+    if not path.startswith("/") or not is_safe_url(path, allowed_hosts={request.get_host()}):
+        path = "/"
+
+    origin_url = urlparse(path)
+    origin_request = copy.copy(request)
+    origin_request.path = origin_request.path_info = origin_url.path
+    origin_request.GET = origin_request.GET.copy()
+    origin_request.GET.pop("path", None)
+    return origin_request
@@ -0,0 +1,57 @@
+# coding: utf-8
+
+"""
+    PyLucid edge side include views
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The per-user fragments for the <esi:include> tags, see: pylucid.esi
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.shortcuts import render
+from django.views.decorators.cache import never_cache
+
+from cms.toolbar.toolbar import CMSToolbar
+from cms.utils.page import get_page_from_request
+
+# PyLucid
+from pylucid.esi import TOOLBAR_FRAGMENT, get_origin_request
+
+
+log = logging.getLogger(__name__)
+
+
+def render_toolbar(request):
+    """
+    The django CMS toolbar with its css/js for the origin page.
+    Similar to the "get_toolbar" view of the django CMS user settings admin.
+    """
+    if not request.user.is_staff and not request.session.get("cms_edit", False):
+        return HttpResponse("")
+
+    origin_request = get_origin_request(request)
+    current_page = get_page_from_request(origin_request, use_path=origin_request.path_info, clean_path=True)
+    origin_request.current_page = current_page
+    origin_request.toolbar = CMSToolbar(origin_request, request_path=origin_request.path_info)
+    if current_page is not None:
+        origin_request.toolbar.set_object(current_page)
+    return render(origin_request, "pylucid/esi/toolbar.html")
+
+
+@never_cache
+def fragment(request, name):
+    if name == TOOLBAR_FRAGMENT:
+        return render_toolbar(request)
+
+    try:
+        template_name = settings.PYLUCID_ESI_FRAGMENTS[name]
+    except KeyError:
+        raise Http404("Unknown ESI fragment")
+
+    return render(get_origin_request(request), template_name)
@@ -0,0 +1,42 @@
+# coding: utf-8
+
+"""
+    PyLucid cmsplugin_filer_image plugin
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Same as cmsplugin_filer_image.cms_plugins.FilerImagePlugin, but images
+    without an own style template are rendered with the responsive WebP/AVIF
+    variants, see: cmsplugin_filer_image/plugins/image/responsive.html
+
+    The style choices of the FilerImage model are not changed: Its "style"
+    field gets the choices from settings.CMSPLUGIN_FILER_IMAGE_STYLE_CHOICES,
+    so a override would need a migration of cmsplugin_filer_image.
+
+    The plugin has the same class name and replaces the origin plugin in the
+    plugin pool, see: pylucid.apps.PyLucidConfig.ready()
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.template.loader import select_template
+
+from cms.plugin_pool import plugin_pool
+from cmsplugin_filer_image import cms_plugins
+
+
+class FilerImagePlugin(cms_plugins.FilerImagePlugin):
+    def get_render_template(self, context, instance, placeholder):
+        template_names = ["cmsplugin_filer_image/plugins/image.html"]  # backwards compatibility
+        if instance.style and instance.style != "default":
+            template_names.append(self.TEMPLATE_NAME % instance.style)
+        template_names.append(self.TEMPLATE_NAME % "responsive")
+        return select_template(template_names)
+
+
+def replace_origin_plugin():
+    """
+    The CMS finds the plugin by the class name, e.g.: in CMSPlugin.plugin_type
+    """
+    plugin_pool.unregister_plugin(cms_plugins.FilerImagePlugin)
+    plugin_pool.register_plugin(FilerImagePlugin)
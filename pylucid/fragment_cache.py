@@ -0,0 +1,127 @@
+# coding: utf-8
+
+"""
+    PyLucid fragment cache
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Cache rendered template fragments together with their sekizai
+    contributions (e.g.: {% addtoblock "js" %} of plugins) and replay
+    the sekizai blocks on a cache hit, so no css/js gets lost.
+
+    All contributions made while rendering are recorded, also the ones that
+    are already in the page sekizai blocks: The fragment may be replayed on
+    a page without them.
+
+    In templates use:
+        {% load pylucid_cache %}
+        {% pylucid_cache 600 "sidebar" request.path %}...{% endpylucid_cache %}
+
+    In Python use:
+        content = cached_fragment(context, cache_key, render_func, timeout)
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import contextlib
+import logging
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils import translation
+from django.utils.safestring import mark_safe
+
+from sekizai.data import UniqueSequence
+from sekizai.helpers import get_varname
+
+# PyLucid
+from pylucid.page_resolver import get_publish_version
+
+
+log = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def capture_sekizai(context):
+    """
+    Record all sekizai contributions in the with block into the yielded
+    dict {block name: [data, ...]}. The recorded data is also added to the
+    sekizai blocks of the context.
+    Does nothing if the context is not a sekizai context.
+    """
+    changes = {}
+    varname = get_varname()
+    for holder in reversed(context.dicts):
+        if varname in holder:
+            break
+    else:
+        yield changes
+        return
+
+    container = holder[varname]
+    holder[varname] = collections.defaultdict(UniqueSequence)
+    try:
+        yield changes
+    finally:
+        recorded = holder[varname]
+        holder[varname] = container
+
+    for name, values in recorded.items():
+        changes[name] = list(values)
+    replay_sekizai(context, changes)
+
+
+def replay_sekizai(context, changes):
+    """
+    Add the recorded sekizai contributions into the context.
+    """
+    container = context.get(get_varname())
+    if container is None:
+        if changes:
+            log.warning("Sekizai blocks %s lost: No sekizai context!", ", ".join(changes))
+        return
+
+    for name, values in changes.items():
+        for value in values:
+            container[name].append(value)
+
+
+def render_fragment(context, render_func):
+    """
+    Returns the value for the cache: The content of render_func() and the sekizai contributions.
+    """
+    with capture_sekizai(context) as changes:
+        content = render_func()
+    return {"content": str(content), "sekizai": changes}
+
+
+def get_fragment(context, cache_key):
+    """
+    Returns the content from the cache and replay the sekizai contributions.
+    Returns None if the fragment is not in the cache.
+    """
+    value = cache.get(cache_key)
+    if value is None:
+        return None
+
+    replay_sekizai(context, value["sekizai"])
+    return mark_safe(value["content"])
+
+
+def cached_fragment(context, cache_key, render_func, timeout):
+    content = get_fragment(context, cache_key)
+    if content is None:
+        value = render_fragment(context, render_func)
+        cache.set(cache_key, value, timeout)
+        content = mark_safe(value["content"])
+    return content
+
+
+def get_cache_key(fragment_name, vary_on):
+    """
+    The cache key for {% pylucid_cache %}: Contains the publish version and
+    the current language, so a fragment never outlives a page change.
+    """
+    vary_on = [get_publish_version(), translation.get_language()] + list(vary_on)
+    return make_template_fragment_key("pylucid_%s" % fragment_name, vary_on)
@@ -0,0 +1,125 @@
+# coding: utf-8
+
+"""
+    PyLucid djangocms_history pruning
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    djangocms_history stores every placeholder operation (with the plugin data
+    before and after) without any limit. Delete the old ones, but keep per page
+    the last settings.PYLUCID_HISTORY_KEEP_COUNT operations and all operations
+    of the last settings.PYLUCID_HISTORY_KEEP_DAYS days.
+
+    The operations are grouped per page by their origin url path (and site).
+
+    The delete is done in small batches, every batch in its own transaction,
+    so the tables are never locked for a long time. Run it e.g. from cron:
+        $ ./manage.py pylucid_history_prune --pause 0.5
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import datetime
+import itertools
+import logging
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from djangocms_history.models import PlaceholderAction, PlaceholderOperation
+
+
+log = logging.getLogger(__name__)
+
+
+def get_cutoff(keep_days, now=None):
+    """
+    >>> now = datetime.datetime(2019, 5, 20, 12, 0)
+    >>> get_cutoff(30, now)
+    datetime.datetime(2019, 4, 20, 12, 0)
+    >>> get_cutoff(None, now) is None
+    True
+    """
+    if keep_days is None:
+        return None
+    if now is None:
+        now = timezone.now()
+    return now - datetime.timedelta(days=keep_days)
+
+
+def iter_prune_ids(keep_count=None, keep_days=None):
+    """
+    Yields the IDs of all operations that are outside of the retention policy:
+    Not in the last keep_count operations of the page and older than keep_days.
+    None means: no limit by count/days.
+    """
+    if keep_count is None and keep_days is None:
+        raise ValueError("keep_count or keep_days is needed!")
+
+    cutoff = get_cutoff(keep_days)
+    candidates = PlaceholderOperation.objects.all()
+    if cutoff is not None:
+        candidates = candidates.filter(date_created__lt=cutoff)
+
+    # Fetch all pages first: The operations will be deleted while iterating
+    pages = list(candidates.order_by().values_list("site_id", "origin").distinct())
+    for site_id, origin in pages:
+        operations = PlaceholderOperation.objects.filter(site_id=site_id, origin=origin)
+        to_delete = operations
+        if cutoff is not None:
+            to_delete = to_delete.filter(date_created__lt=cutoff)
+        if keep_count:
+            keep_ids = operations.order_by("-date_created", "-pk").values_list("pk", flat=True)[:keep_count]
+            to_delete = to_delete.exclude(pk__in=list(keep_ids))
+
+        yield from to_delete.order_by("pk").values_list("pk", flat=True)
+
+
+def iter_batches(iterable, batch_size):
+    """
+    >>> list(iter_batches(range(5), batch_size=2))
+    [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def delete_operations(operation_ids):
+    """
+    Delete the operations with all actions in one transaction.
+    Returns the number of deleted (operations, actions)
+    """
+    with transaction.atomic():
+        action_count, __ = PlaceholderAction.objects.filter(operation_id__in=operation_ids).delete()
+        operation_count, __ = PlaceholderOperation.objects.filter(pk__in=operation_ids).delete()
+    return operation_count, action_count
+
+
+def prune_history(keep_count=None, keep_days=None, batch_size=500, pause=0, dry_run=False, progress=None):
+    """
+    Delete the old operations in batches and sleep `pause` seconds between the batches.
+    progress(operations, actions) is called after every batch.
+    Returns the number of deleted (or to delete, on dry run) (operations, actions)
+    """
+    operations = actions = 0
+    for batch_no, operation_ids in enumerate(iter_batches(iter_prune_ids(keep_count, keep_days), batch_size)):
+        if dry_run:
+            operations += len(operation_ids)
+            actions += PlaceholderAction.objects.filter(operation_id__in=operation_ids).count()
+        else:
+            if batch_no and pause:
+                time.sleep(pause)
+            operation_count, action_count = delete_operations(operation_ids)
+            operations += operation_count
+            actions += action_count
+
+        if progress is not None:
+            progress(operations, actions)
+
+    log.info("History pruned: %i operations with %i actions%s", operations, actions, " (dry run)" if dry_run else "")
+    return operations, actions
@@ -0,0 +1,182 @@
+# coding: utf-8
+
+"""
+    PyLucid image variants
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Responsive image variants of filer images: The image is scaled to
+    all settings.PYLUCID_IMAGE_WIDTHS in the origin format and in all
+    settings.PYLUCID_IMAGE_FORMATS (e.g. WebP, AVIF) that the installed
+    Pillow can encode. AVIF needs the "pillow-avif-plugin" package.
+
+    The variants are generated together with the thumbnails, see: pylucid.thumbnails
+    The templates only use existing variants via the {% image_variants %} tag,
+    see: pylucid.templatetags.pylucid_images
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import functools
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from PIL import Image as PILImage
+
+
+log = logging.getLogger(__name__)
+
+
+MIME_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+}
+
+ImageSource = collections.namedtuple("ImageSource", "mime_type srcset")
+ImageVariants = collections.namedtuple("ImageVariants", "sources srcset sizes")
+
+
+@functools.lru_cache()
+def get_available_formats(extensions):
+    """
+    Returns the file extensions of the given formats that Pillow can write.
+
+    >>> get_available_formats(("foobar",))
+    ()
+    """
+    if "avif" in extensions:
+        try:
+            import pillow_avif  # noqa: Registers the AVIF plugin
+        except ImportError:
+            log.info("AVIF variants need the pillow-avif-plugin package")
+
+    PILImage.init()
+    available = []
+    for extension in extensions:
+        pil_format = PILImage.EXTENSION.get(".%s" % extension)
+        if pil_format and pil_format in PILImage.SAVE:
+            available.append(extension)
+        else:
+            log.info("No encoder for image format %r available", extension)
+    return tuple(available)
+
+
+def get_variant_widths(image, max_width=None):
+    """
+    Widths of the variants that are smaller than the image.
+    With max_width: Use at most the double width for high-density displays.
+    """
+    widths = [width for width in settings.PYLUCID_IMAGE_WIDTHS if width < image.width]
+    if max_width:
+        widths = [width for width in widths if width <= max_width * 2]
+    return widths
+
+
+def get_variant_options(width):
+    # Height 0 -> scale proportional to the width:
+    return {"size": (width, 0)}
+
+
+def get_format_thumbnailer(image, extension=None):
+    """
+    Thumbnailer that creates files with the given extension (None -> as configured by easy_thumbnails).
+    easy_thumbnails use the file extension to select the Pillow format.
+    """
+    thumbnailer = image.easy_thumbnails_thumbnailer
+    if extension is not None:
+        thumbnailer.thumbnail_extension = extension
+        thumbnailer.thumbnail_transparency_extension = extension
+        thumbnailer.thumbnail_preserve_extensions = False
+    return thumbnailer
+
+
+def iter_thumbnailers(image):
+    yield None, get_format_thumbnailer(image)
+    for extension in get_available_formats(tuple(settings.PYLUCID_IMAGE_FORMATS)):
+        yield extension, get_format_thumbnailer(image, extension)
+
+
+def generate_variants(image):
+    """
+    Generate all missing variants of the given filer image.
+    Returns the number of generated files.
+    """
+    widths = get_variant_widths(image)
+    generated = 0
+    for extension, thumbnailer in iter_thumbnailers(image):
+        for width in widths:
+            options = get_variant_options(width)
+            if thumbnailer.get_existing_thumbnail(options) is None:
+                thumbnailer.get_thumbnail(options)
+                generated += 1
+    return generated
+
+
+def get_sizes(max_width=None):
+    """
+    >>> get_sizes(640)
+    '(max-width: 640px) 100vw, 640px'
+    >>> get_sizes()
+    '100vw'
+    """
+    if max_width:
+        return "(max-width: %ipx) 100vw, %ipx" % (max_width, max_width)
+    return "100vw"
+
+
+def get_cache_key(image, max_width):
+    key = "%s|%s|%s|%s|%s" % (
+        image.pk, image.file.name, image.modified_at, max_width,
+        (settings.PYLUCID_IMAGE_WIDTHS, settings.PYLUCID_IMAGE_FORMATS)
+    )
+    return "pylucid_image_variants_%s" % hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def collect_image_variants(image, max_width=None):
+    """
+    Returns ImageVariants with only existing variants, nothing will be generated.
+    The second value is False if variants are missing.
+    """
+    widths = get_variant_widths(image, max_width)
+    complete = True
+    sources = []
+    srcset = ""
+    for extension, thumbnailer in iter_thumbnailers(image):
+        candidates = []
+        for width in widths:
+            thumbnail = thumbnailer.get_existing_thumbnail(get_variant_options(width))
+            if thumbnail is None:
+                complete = False
+            else:
+                candidates.append("%s %iw" % (thumbnail.url, width))
+        if not candidates:
+            continue
+        if extension is None:
+            srcset = ", ".join(candidates)
+        else:
+            sources.append(ImageSource(MIME_TYPES.get(extension, "image/%s" % extension), ", ".join(candidates)))
+
+    return ImageVariants(sources, srcset, get_sizes(max_width)), complete
+
+
+def get_image_variants(image, max_width=None):
+    """
+    Returns the cached ImageVariants of the given filer image.
+    Not complete results (the missing variants are not generated yet)
+    are cached shorter, so the new variants are used soon.
+    """
+    cache_key = get_cache_key(image, max_width)
+    image_variants = cache.get(cache_key)
+    if image_variants is None:
+        image_variants, complete = collect_image_variants(image, max_width)
+        if complete:
+            timeout = settings.PYLUCID_IMAGE_VARIANTS_CACHE_TIMEOUT
+        else:
+            log.debug("Image variants of %r are not complete", image.file.name)
+            timeout = settings.PYLUCID_IMAGE_VARIANTS_PARTIAL_CACHE_TIMEOUT
+        cache.set(cache_key, image_variants, timeout)
+    return image_variants
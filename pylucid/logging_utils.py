@@ -0,0 +1,29 @@
+# coding: utf-8
+
+"""
+    PyLucid logging setup
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Used as settings.LOGGING_CONFIG, so the django-tools logging helpers
+    are imported on django.setup() and not on every settings import.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+import logging.config
+import warnings
+
+
+def configure_logging(logging_settings):
+    # https://github.com/jedie/django-tools
+    from django_tools.unittest_utils.logging_utils import CutPathnameLogRecordFactory, FilterAndLogWarnings
+
+    # Adds 'cut_path' attribute on log record. So '%(cut_path)s' can be used in log formatter.
+    logging.setLogRecordFactory(CutPathnameLogRecordFactory(max_length=50))
+
+    # Filter warnings and pipe them to logging system:
+    warnings.showwarning = FilterAndLogWarnings()
+
+    logging.config.dictConfig(logging_settings)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sites.models import Site
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.test import Client, override_settings
+
+# PyLucid
+from pylucid.benchmark import Timings, get_page_urls
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare page requests with and without the ATOMIC_REQUESTS transaction"
+        " (see: NonAtomicReadsMiddleware) under concurrent writes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--visitors", type=int, default=8,
+            help="Number of visitor threads, requesting the published pages (default: 8)")
+        parser.add_argument("--writers", type=int, default=1,
+            help="Number of threads that write small transactions (default: 1)")
+        parser.add_argument("--duration", type=float, default=5,
+            help="Duration of every run in seconds (default: 5)")
+
+    def visitor(self, urls, end_time, timings):
+        client = Client(HTTP_HOST=self.host)
+        try:
+            while time.monotonic() < end_time:
+                for url in urls:
+                    timings.measure(client.get, url)
+        finally:
+            connections.close_all()
+
+    def writer(self, end_time, timings):
+        try:
+            while time.monotonic() < end_time:
+                start_time = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        session = SessionStore()
+                        session["pylucid_benchmark"] = "x" * 1000
+                        session.create()
+                except OperationalError:
+                    # e.g.: "database is locked"
+                    self.write_errors += 1
+                    continue
+                timings.add(time.perf_counter() - start_time)
+                session.delete()
+        finally:
+            connections.close_all()
+
+    def run(self, urls, options):
+        self.write_errors = 0
+        visitor_timings = [Timings("page requests") for __ in range(options["visitors"])]
+        writer_timings = [Timings("writes") for __ in range(options["writers"])]
+        end_time = time.monotonic() + options["duration"]
+        threads = [
+            threading.Thread(target=self.visitor, args=(urls, end_time, timings)) for timings in visitor_timings
+        ] + [
+            threading.Thread(target=self.writer, args=(end_time, timings)) for timings in writer_timings
+        ]
+        start_time = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.monotonic() - start_time
+
+        for name, timings_list in (("page requests", visitor_timings), ("writes", writer_timings)):
+            timings = Timings(name)
+            for thread_timings in timings_list:
+                timings.durations += thread_timings.durations
+            self.stdout.write(str(timings))
+            self.stdout.write("    %.1f per second" % (timings.count / duration))
+        self.stdout.write("Write errors: %i" % self.write_errors)
+
+    def handle(self, *args, **options):
+        if not connections[DEFAULT_DB_ALIAS].settings_dict["ATOMIC_REQUESTS"]:
+            raise CommandError("ATOMIC_REQUESTS is not activated for the default database!")
+
+        urls = get_page_urls()
+        if not urls:
+            raise CommandError("No published pages found!")
+
+        self.host = Site.objects.get_current().domain
+        connections.close_all()
+
+        # Measure the view itself: Without the page cache and the cached page lookup of anonymous users
+        middleware = [
+            name for name in settings.MIDDLEWARE if name != "pylucid.middlewares.PageResolverMiddleware"
+        ]
+        runs = (
+            ("ATOMIC_REQUESTS for all views", ()),
+            ("PYLUCID_NON_ATOMIC_VIEWS without transaction", settings.PYLUCID_NON_ATOMIC_VIEWS),
+        )
+        for title, non_atomic_views in runs:
+            self.stdout.write("\n%s (%i visitors, %i writers, %.1f sec.):" % (
+                title, options["visitors"], options["writers"], options["duration"]
+            ))
+            with override_settings(
+                MIDDLEWARE=middleware, CMS_PAGE_CACHE=False, PYLUCID_NON_ATOMIC_VIEWS=non_atomic_views
+            ):
+                self.run(urls, options)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+import collections
+import contextlib
+import itertools
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sites.models import Site
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client
+
+# PyLucid
+from pylucid.benchmark import Timings, get_page_urls
+from pylucid.db_router import reset_state
+
+
+class QueryCounter:
+    """
+    Count the executed queries per database alias (of all threads)
+    """
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def count(self, aliases):
+        with contextlib.ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(connections[alias].execute_wrapper(self.wrapper(alias)))
+            yield
+
+    def wrapper(self, alias):
+        def execute(execute, sql, params, many, context):
+            with self.lock:
+                self.counts[alias] += 1
+            return execute(sql, params, many, context)
+        return execute
+
+
+class Command(BaseCommand):
+    help = "Benchmark the read replica router with concurrent visitors and editors"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--visitors", type=int, default=8,
+            help="Number of visitor threads, requesting the published pages (default: 8)")
+        parser.add_argument("--editors", type=int, default=1,
+            help="Number of editor threads, writing and reading back sessions (default: 1)")
+        parser.add_argument("--duration", type=float, default=5,
+            help="Duration of the benchmark in seconds (default: 5)")
+
+    def visitor(self, urls, end_time, timings):
+        client = Client(HTTP_HOST=self.host)
+        try:
+            for url in itertools.cycle(urls):
+                if time.monotonic() >= end_time:
+                    break
+                with self.query_counter.count(self.aliases):
+                    timings.measure(client.get, url)
+        finally:
+            connections.close_all()
+
+    def editor(self, end_time, timings):
+        try:
+            while time.monotonic() < end_time:
+                reset_state()
+                with self.query_counter.count(self.aliases):
+                    start_time = time.perf_counter()
+                    session = SessionStore()
+                    session["pylucid_benchmark"] = "x" * 1000
+                    session.create()
+                    # Must be read from the primary, because of the write:
+                    if SessionStore(session_key=session.session_key).load() != session._session:
+                        self.stale_reads += 1
+                    timings.add(time.perf_counter() - start_time)
+                    session.delete()
+        finally:
+            reset_state()
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        if "pylucid.db_router.ReplicaRouter" not in settings.DATABASE_ROUTERS or not settings.PYLUCID_DB_REPLICAS:
+            raise CommandError("The ReplicaRouter and PYLUCID_DB_REPLICAS must be activated!")
+
+        urls = get_page_urls()
+        if not urls:
+            raise CommandError("No published pages found!")
+
+        self.host = Site.objects.get_current().domain
+        self.aliases = (DEFAULT_DB_ALIAS,) + tuple(settings.PYLUCID_DB_REPLICAS)
+        self.query_counter = QueryCounter()
+        self.stale_reads = 0
+        self.stdout.write("%i visitors and %i editors for %.1f sec. on %i pages..." % (
+            options["visitors"], options["editors"], options["duration"], len(urls)
+        ))
+
+        visitor_timings = [Timings("visitor") for __ in range(options["visitors"])]
+        editor_timings = [Timings("editor") for __ in range(options["editors"])]
+        end_time = time.monotonic() + options["duration"]
+        threads = [
+            threading.Thread(target=self.visitor, args=(urls, end_time, timings)) for timings in visitor_timings
+        ] + [
+            threading.Thread(target=self.editor, args=(end_time, timings)) for timings in editor_timings
+        ]
+        start_time = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.monotonic() - start_time
+
+        for name, timings_list in (("page requests", visitor_timings), ("editor writes", editor_timings)):
+            timings = Timings(name)
+            for thread_timings in timings_list:
+                timings.durations += thread_timings.durations
+            self.stdout.write(str(timings))
+            self.stdout.write("    %.1f per second" % (timings.count / duration))
+
+        for alias in self.aliases:
+            self.stdout.write("Queries on %r: %i" % (alias, self.query_counter.counts[alias]))
+        self.stdout.write("Stale reads after a write: %i" % self.stale_reads)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+# PyLucid
+from pylucid.history_prune import prune_history
+from pylucid.sqlite_tuning import compact_database
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    help = "Delete old djangocms_history undo/redo data in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep", type=int, default=settings.PYLUCID_HISTORY_KEEP_COUNT,
+            help="Keep the last X operations per page (default: settings.PYLUCID_HISTORY_KEEP_COUNT=%(default)s)")
+        parser.add_argument("--days", type=int, default=settings.PYLUCID_HISTORY_KEEP_DAYS,
+            help="Keep all operations of the last X days (default: settings.PYLUCID_HISTORY_KEEP_DAYS=%(default)s)")
+        parser.add_argument("--batch-size", type=int, default=500,
+            help="Delete X operations per transaction (default: 500)")
+        parser.add_argument("--pause", type=float, default=0.1,
+            help="Sleep X seconds between the batches (default: 0.1)")
+        parser.add_argument("--dry-run", action="store_true",
+            help="Only count the operations, don't delete anything")
+        parser.add_argument("--no-vacuum", action="store_false", dest="vacuum",
+            help="Don't compact the SQLite database file after deleting")
+
+    def handle(self, *args, **options):
+        if options["keep"] is None and options["days"] is None:
+            raise CommandError("--keep or --days is needed!")
+
+        verbosity = options["verbosity"]
+
+        def progress(operations, actions):
+            if verbosity > 1:
+                self.stdout.write("%i operations with %i actions..." % (operations, actions))
+
+        start_time = time.monotonic()
+        operations, actions = prune_history(
+            keep_count=options["keep"],
+            keep_days=options["days"],
+            batch_size=max(options["batch_size"], 1),
+            pause=options["pause"],
+            dry_run=options["dry_run"],
+            progress=progress,
+        )
+        self.stdout.write("%s %i operations with %i actions in %s" % (
+            "Would delete" if options["dry_run"] else "Deleted",
+            operations, actions, human_duration(time.monotonic() - start_time)
+        ))
+
+        if options["dry_run"] or not options["vacuum"] or not operations:
+            return
+
+        sizes = compact_database(connection)
+        if sizes is not None:
+            size_before, size_after = sizes
+            self.stdout.write("SQLite database compacted: %.1f MB -> %.1f MB" % (
+                size_before / 1024 / 1024, size_after / 1024 / 1024
+            ))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DatabaseError
+
+# PyLucid
+from pylucid.data_import import import_dump_objects, iter_dump_file, validate_dump_objects
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    help = (
+        "Fast import of JSON/NDJSON files created by the PyLucid export admin actions or 'dumpdata'."
+        " No model signals are sent. All files are imported in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+",
+            help="JSON, NDJSON or gzipped (*.gz) files")
+        parser.add_argument("--batch-size", type=int, default=500,
+            help="Number of objects per bulk insert (default: 500)")
+        parser.add_argument("--dry-run", action="store_true",
+            help="Only validate the files, don't write anything")
+        parser.add_argument("--ignorenonexistent", "-i", action="store_true",
+            help="Ignores entries in the serialized data for fields that do not currently exist on the model.")
+
+    def iter_dump_objects(self, paths):
+        for path in paths:
+            self.stdout.write("Read %s..." % path)
+            yield from iter_dump_file(path)
+
+    def handle(self, *args, **options):
+        dump_objects = self.iter_dump_objects(options["paths"])
+        start_time = time.monotonic()
+        try:
+            if options["dry_run"]:
+                count = validate_dump_objects(dump_objects, ignorenonexistent=options["ignorenonexistent"])
+                m2m_count = 0
+                self.stdout.write("%i objects are valid." % count)
+            else:
+                stats = import_dump_objects(
+                    dump_objects,
+                    batch_size=options["batch_size"],
+                    ignorenonexistent=options["ignorenonexistent"],
+                )
+                count = stats.objects
+                m2m_count = stats.m2m
+                self.stdout.write("%i objects and %i m2m relations of %i models imported." % (
+                    stats.objects, stats.m2m, stats.models
+                ))
+        except (OSError, ValueError, DeserializationError, DatabaseError) as err:
+            raise CommandError("Import failed, nothing was written: %s" % err)
+
+        duration = time.monotonic() - start_time
+        self.stdout.write("Duration: %s (%.1f objects/sec)" % (
+            human_duration(duration), (count + m2m_count) / duration if duration else 0
+        ))
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import json
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+# PyLucid
+from pylucid.media_scan import MediaScanner
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    help = "Check all files in MEDIA_ROOT and compare them with the filer database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8,
+            help="Number of threads that verify the images (default: 8)")
+        parser.add_argument("--report",
+            help="Write the JSON report into this file (default: stdout)")
+        parser.add_argument("--no-cache", action="store_false", dest="use_cache",
+            help="Check all files, don't use settings.PYLUCID_MEDIA_SCAN_CACHE_PATH")
+
+    def handle(self, *args, **options):
+        cache_path = settings.PYLUCID_MEDIA_SCAN_CACHE_PATH if options["use_cache"] else None
+        if options["use_cache"] and not cache_path:
+            self.stderr.write("settings.PYLUCID_MEDIA_SCAN_CACHE_PATH is not set: all files will be checked")
+
+        scanner = MediaScanner(cache_path=cache_path, workers=options["workers"])
+        report = scanner.scan()
+
+        if options["report"]:
+            with open(options["report"], "w") as f:
+                json.dump(report, f, indent=4)
+            self.stdout.write("Report written to %r" % options["report"])
+        else:
+            self.stdout.write(json.dumps(report, indent=4))
+
+        stats = report["stats"]
+        self.stderr.write("%(files)i files (%(checked)i checked, %(cached)i cached): " % stats + (
+            "%(broken)i broken, %(missing)i missing, %(orphaned)i orphaned" % stats
+        ) + " in %s" % human_duration(report["duration"]))
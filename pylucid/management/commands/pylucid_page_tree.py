@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from cms.models import Page
+from cms.utils import get_current_site
+
+# PyLucid
+from pylucid.page_tree import copy_subtree, get_subtree_pages, move_subtree, publish_subtree
+from pylucid.utils import human_duration
+
+
+def get_draft_page(value, site_id):
+    """
+    Get the draft page by ID or by the url path, e.g.: "blog/2019"
+    """
+    queryset = Page.objects.filter(publisher_is_draft=True, node__site_id=site_id).select_related("node")
+    if value.isdigit():
+        queryset = queryset.filter(pk=int(value))
+    else:
+        queryset = queryset.filter(title_set__path=value.strip("/")).distinct()
+
+    pages = list(queryset[:2])
+    if len(pages) != 1:
+        raise CommandError("Page %r %s" % (value, "is ambiguous" if pages else "not found"))
+    return pages[0]
+
+
+class Command(BaseCommand):
+    help = "Move, copy or publish a page with all descendants"
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=("move", "copy", "publish"))
+        parser.add_argument("page",
+            help="ID or url path (e.g.: 'blog/2019') of the draft root page of the subtree")
+        parser.add_argument("--target",
+            help="move/copy: ID or url path of the new parent page (default: as root page)")
+        parser.add_argument("--language", action="append", dest="languages",
+            help="publish: Publish this language, can be used multiple times (default: all languages)")
+
+    def handle(self, *args, **options):
+        site_id = get_current_site().pk
+        page = get_draft_page(options["page"], site_id)
+        target = get_draft_page(options["target"], site_id) if options["target"] else None
+
+        action = options["action"]
+        page_count = get_subtree_pages(page).count()
+        self.stdout.write("%s %i pages from %r..." % (action.title(), page_count, page.get_path()))
+
+        start_time = time.monotonic()
+        try:
+            if action == "move":
+                move_subtree(page, target)
+            elif action == "copy":
+                copy_subtree(page, target)
+            else:
+                languages = options["languages"] or [code for code, name in settings.LANGUAGES]
+                page_count = publish_subtree(page, languages)
+        except ValueError as err:
+            raise CommandError(err)
+        duration = time.monotonic() - start_time
+
+        self.stdout.write("%i pages in %s (%.1f pages/sec)" % (
+            page_count, human_duration(duration), page_count / duration if duration else 0
+        ))
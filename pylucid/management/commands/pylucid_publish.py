@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from cms.utils import get_current_site
+
+# PyLucid
+from pylucid.management.commands.pylucid_page_tree import get_draft_page
+from pylucid.page_tree import get_draft_pages, publish_pages, unpublish_pages
+from pylucid.utils import human_duration
+
+
+def per_second(count, duration):
+    return count / duration if duration else 0
+
+
+class Command(BaseCommand):
+    help = "Publish (or unpublish) many pages at once, e.g.: after a content migration"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page",
+            help="Only the subtree of this page: ID or url path (e.g.: 'blog/2019') of the draft page")
+        parser.add_argument("--template",
+            choices=[template_name for template_name, title in settings.CMS_TEMPLATES],
+            help="Only the pages with this template")
+        parser.add_argument("--language", action="append", dest="languages",
+            help="Publish this language, can be used multiple times (default: all languages)")
+        parser.add_argument("--unpublish", action="store_true",
+            help="Unpublish the pages, instead of publishing")
+        parser.add_argument("--progress", type=int, default=100,
+            help="Print the progress every X pages (default: 100)")
+
+    def handle(self, *args, **options):
+        site_id = get_current_site().pk
+        root = get_draft_page(options["page"], site_id) if options["page"] else None
+        pages = list(get_draft_pages(site_id, root=root, template=options["template"]))
+        if not pages:
+            raise CommandError("No pages found!")
+        languages = options["languages"] or [code for code, name in settings.LANGUAGES]
+
+        action = "Unpublish" if options["unpublish"] else "Publish"
+        self.stdout.write("%s %i pages in: %s..." % (action, len(pages), ", ".join(languages)))
+
+        progress_every = max(options["progress"], 1)
+        start_time = time.monotonic()
+
+        def progress(done, total, count, plugins=None):
+            if done % progress_every and done != total:
+                return
+            duration = time.monotonic() - start_time
+            line = "%i/%i pages (%.1f pages/sec)" % (done, total, per_second(done, duration))
+            if plugins is not None:
+                line += ", %i plugins copied (%.1f plugins/sec)" % (plugins, per_second(plugins, duration))
+            self.stdout.write(line)
+
+        if options["unpublish"]:
+            count = unpublish_pages(pages, languages, progress=progress)
+            plugins = None
+        else:
+            count, plugins = publish_pages(pages, languages, progress=progress)
+        duration = time.monotonic() - start_time
+
+        self.stdout.write("%sed %i pages in %s (%.1f pages/sec)" % (
+            action, count, human_duration(duration), per_second(count, duration)
+        ))
+        if plugins is not None:
+            self.stdout.write("%i plugins copied (%.1f plugins/sec)" % (plugins, per_second(plugins, duration)))
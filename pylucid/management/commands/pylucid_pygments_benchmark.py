@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+
+from pygments import highlight, styles
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name, get_lexer_for_filename
+
+# PyLucid
+from pylucid.benchmark import Timings
+from pylucid.pygments_cache import get_used_lexer_names, highlight_code
+
+
+def highlight_uncached(code, lexer_name, style_name, linenos):
+    """
+    Same work as the origin cmsplugin_pygments render() method
+    """
+    style = styles.get_style_by_name(style_name)
+    formatter = HtmlFormatter(linenos=linenos, style=style)
+    html = highlight(code, get_lexer_by_name(lexer_name), formatter)
+    css = formatter.get_style_defs()
+    return html, css
+
+
+class Command(BaseCommand):
+    help = "Benchmark pygments highlighting with and without the PyLucid cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*",
+            help="Source code files to use as corpus (default: all existing cmsplugin_pygments content)")
+        parser.add_argument("--repeat", type=int, default=10,
+            help="How often the corpus should be rendered (default: 10)")
+        parser.add_argument("--style", default="default",
+            help="Pygments style for the source code files (default: 'default')")
+
+    def get_file_corpus(self, paths, style_name):
+        for path in paths:
+            path = Path(path)
+            lexer = get_lexer_for_filename(path.name)
+            yield path.read_text(), lexer.aliases[0], style_name, True
+
+    def get_content_corpus(self):
+        from cmsplugin_pygments.models import PygmentsPlugin
+
+        qs = PygmentsPlugin.objects.all().only("code", "code_language", "style", "linenumbers")
+        for instance in qs.iterator():
+            yield instance.code, instance.code_language, instance.style, instance.linenumbers
+
+    def handle(self, *args, **options):
+        paths = options["paths"]
+        if paths:
+            corpus = list(self.get_file_corpus(paths, options["style"]))
+        else:
+            lexer_names = get_used_lexer_names()
+            self.stdout.write("Lexers used in the content:")
+            self.stdout.write("    PYLUCID_PYGMENTS_PRELOAD_LEXERS = %r" % (tuple(lexer_names),))
+            corpus = list(self.get_content_corpus())
+
+        if not corpus:
+            raise CommandError("No source code snippets found!")
+
+        total_size = sum(len(code) for code, _, _, _ in corpus)
+        self.stdout.write("Corpus: %i snippets with %i characters" % (len(corpus), total_size))
+
+        lexer_timings = Timings("first lexer lookup")
+        for lexer_name in sorted(set(lexer_name for _, lexer_name, _, _ in corpus)):
+            lexer_timings.measure(get_lexer_by_name, lexer_name)
+
+        # Fill the cache:
+        for snippet in corpus:
+            highlight_code(*snippet)
+
+        uncached_timings = Timings("highlight without cache")
+        cached_timings = Timings("highlight with cache")
+        for __ in range(options["repeat"]):
+            for snippet in corpus:
+                uncached_timings.measure(highlight_uncached, *snippet)
+                cached_timings.measure(highlight_code, *snippet)
+
+        self.stdout.write(str(lexer_timings))
+        self.stdout.write(str(uncached_timings))
+        self.stdout.write(str(cached_timings))
+        if cached_timings.total:
+            self.stdout.write("Speedup: %.1fx" % (uncached_timings.total / cached_timings.total))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+# PyLucid
+from pylucid.search.documents import get_blog_post_jobs, get_page_jobs
+from pylucid.search.index import get_search_index
+from pylucid.search.indexer import index_jobs
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    help = "(Re-)Build the PyLucid full-text search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+            help="Number of processes that render the documents (default: number of CPUs)")
+        parser.add_argument("--language",
+            help="Only reindex pages in this language (default: all languages)")
+        parser.add_argument("--batch-size", type=int, default=100,
+            help="Number of documents written in one transaction (default: 100)")
+
+    def handle(self, *args, **options):
+        if not settings.PYLUCID_SEARCH_INDEX_PATH:
+            raise CommandError("settings.PYLUCID_SEARCH_INDEX_PATH is not set!")
+
+        search_index = get_search_index()
+        self.stdout.write("Search index: %s" % search_index.path)
+
+        language = options["language"]
+        jobs = get_page_jobs(language)
+        if not language:
+            search_index.clear()
+            jobs += get_blog_post_jobs()
+
+        self.stdout.write("Render %i jobs with %i workers..." % (len(jobs), options["workers"]))
+        start_time = time.monotonic()
+        count = index_jobs(jobs, workers=options["workers"], batch_size=options["batch_size"])
+        search_index.optimize()
+        duration = time.monotonic() - start_time
+
+        self.stdout.write("%i documents indexed in %s (%.1f documents/sec)" % (
+            count, human_duration(duration), count / duration if duration else 0
+        ))
+        self.stdout.write("Total documents in search index: %i" % search_index.count())
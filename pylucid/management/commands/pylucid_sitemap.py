@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+import time
+
+from django.contrib.sites.models import Site
+from django.core.management import BaseCommand
+
+# PyLucid
+from pylucid.sitemap import generate_sitemap, get_sitemap_path
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    help = "Write the chunked sitemap files into MEDIA_ROOT (only changed chunks)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--site", type=int, action="append", dest="site_ids",
+            help="Only generate the sitemap for this site id (default: all sites)")
+        parser.add_argument("--force", action="store_true",
+            help="Write all chunks, even if they are unchanged")
+
+    def handle(self, *args, **options):
+        sites = Site.objects.order_by("pk")
+        if options["site_ids"]:
+            sites = sites.filter(pk__in=options["site_ids"])
+
+        for site in sites:
+            start_time = time.monotonic()
+            stats = generate_sitemap(site, force=options["force"])
+            duration = time.monotonic() - start_time
+            self.stdout.write("%s: %i urls in %i chunks, %i written, %i removed in %s (%s)" % (
+                site.domain, stats.urls, stats.chunks, stats.written, stats.removed,
+                human_duration(duration), get_sitemap_path(site.pk)
+            ))
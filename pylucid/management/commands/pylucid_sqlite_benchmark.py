@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from cms.models import CMSPlugin, Title
+
+# PyLucid
+from pylucid.sqlite_tuning import DEFAULT_PRAGMAS, copy_database, is_memory_db, run_benchmark, setup_database
+
+
+def get_queries():
+    """
+    Typical read queries of a page request as (sql, params)
+    """
+    querysets = (
+        Title.objects.public().filter(published=True).select_related("page", "page__node")[:50],
+        Title.objects.public().filter(published=True).only("path").order_by("-pk")[:1],
+        CMSPlugin.objects.filter(placeholder__isnull=False).order_by("placeholder", "position")[:100],
+    )
+    queries = []
+    for qs in querysets:
+        sql, params = qs.query.sql_with_params()
+        # Convert the Django "format" placeholders for the sqlite3 module, like SQLiteCursorWrapper:
+        sql = re.sub(r"(?<!%)%s", "?", sql).replace("%%", "%")
+        queries.append((sql, params))
+    return queries
+
+
+class Command(BaseCommand):
+    help = "Compare the SQLite read throughput with the default and the PYLUCID_SQLITE_PRAGMAS settings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+            help="Number of parallel reader processes (default: 1 2 4 8)")
+        parser.add_argument("--writers", type=int, default=1,
+            help="Number of parallel writer processes (default: 1)")
+        parser.add_argument("--duration", type=float, default=3,
+            help="Duration of every run in seconds (default: 3)")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS,
+            help="Database alias (default: %r)" % DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if connection.vendor != "sqlite" or is_memory_db(connection.settings_dict["NAME"]):
+            raise CommandError("Only SQLite file databases can be used!")
+
+        queries = get_queries()
+        profiles = (
+            ("default", DEFAULT_PRAGMAS),
+            ("PYLUCID_SQLITE_PRAGMAS", settings.PYLUCID_SQLITE_PRAGMAS),
+        )
+        with tempfile.TemporaryDirectory(prefix="pylucid_sqlite_benchmark_") as temp_dir:
+            path = str(Path(temp_dir, "benchmark.sqlite3"))
+            self.stdout.write("Copy %r to %r" % (connection.settings_dict["NAME"], path))
+            copy_database(connection, path)
+            # Don't share the database connections with the forked processes:
+            connections.close_all()
+
+            for profile_name, pragmas in profiles:
+                self.stdout.write("\n%s: %s" % (profile_name, pragmas))
+                setup_database(path, pragmas)
+                for workers in options["workers"]:
+                    result = run_benchmark(
+                        path, pragmas, queries, workers, writers=options["writers"], duration=options["duration"]
+                    )
+                    self.stdout.write(
+                        "%3i readers: %8.1f reads/sec (%i errors) - %i writers: %6.1f writes/sec (%i errors)" % (
+                            workers, result.reads / result.duration, result.read_errors,
+                            options["writers"], result.writes / result.duration, result.write_errors,
+                        )
+                    )
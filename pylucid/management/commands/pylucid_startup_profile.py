@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+# PyLucid
+from pylucid.benchmark import format_duration
+from pylucid.startup_profile import Phase, get_self_durations, iter_collapsed_stacks, iter_import_stacks
+
+
+class Command(BaseCommand):
+    help = "Measure time and memory of the startup phases in a new process"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--collapsed",
+            help="Write the phases as collapsed stacks (for flamegraph tools) into this file")
+        parser.add_argument("--imports-collapsed",
+            help="Write the module imports ('python -X importtime') as collapsed stacks into this file")
+
+    def run_profile(self):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE,
+            PYTHONPATH=os.pathsep.join(path for path in sys.path if path),
+        )
+        with tempfile.TemporaryDirectory(prefix="pylucid_startup_profile_") as temp_dir:
+            json_path = str(Path(temp_dir, "phases.json"))
+            process = subprocess.run(
+                [sys.executable, "-X", "importtime", "-m", "pylucid.startup_profile", json_path],
+                env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True
+            )
+            if process.returncode:
+                self.stderr.write(process.stderr)
+                raise CommandError("Startup profile failed!")
+
+            with open(json_path, "r") as f:
+                phases = [Phase(tuple(data["path"]), data["duration"], data["rss"]) for data in json.load(f)]
+        return phases, process.stderr
+
+    def handle(self, *args, **options):
+        phases, importtime_output = self.run_profile()
+
+        self_durations = get_self_durations(phases)
+        self.stdout.write("%10s %10s %10s  %s" % ("total", "self", "max. RSS", "phase"))
+        for phase in sorted(phases, key=lambda phase: phase.duration, reverse=True):
+            self.stdout.write("%10s %10s %10s  %s" % (
+                format_duration(phase.duration),
+                format_duration(self_durations[phase.path]),
+                "+%s" % filesizeformat(phase.rss) if phase.rss else "",
+                " > ".join(phase.path),
+            ))
+
+        for option, lines in (
+            ("collapsed", iter_collapsed_stacks(phases)),
+            ("imports_collapsed", iter_import_stacks(importtime_output)),
+        ):
+            if options[option]:
+                with open(options[option], "w") as f:
+                    f.writelines("%s\n" % line for line in lines)
+                self.stdout.write("Collapsed stacks written to %r" % options[option])
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import random
+import string
+
+from django.core.management import BaseCommand, CommandError
+
+from taggit_autosuggest.views import MAX_SUGGESTIONS
+
+# PyLucid
+from pylucid.benchmark import Timings
+from pylucid.tag_suggest import TagIndex, build_index, get_tag_model
+
+
+def get_synthetic_tags(count, seed=0):
+    """
+    Random tag names with a few often and many rarely used tags.
+    """
+    rnd = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        length = rnd.randint(3, 15)
+        names.add("".join(rnd.choice(string.ascii_lowercase) for __ in range(length)))
+    return [(name, int(rnd.paretovariate(1))) for name in sorted(names)]
+
+
+def get_queries(names, max_count, seed=0):
+    """
+    The prefixes, a user types in the autosuggest input field.
+    """
+    prefixes = sorted(set(name[:length] for name in names for length in range(1, 5) if len(name) >= length))
+    random.Random(seed).shuffle(prefixes)
+    return prefixes[:max_count]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the taggit autosuggest lookup with the PyLucid tag index and the origin database query"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--synthetic", type=int, default=0,
+            help="Use X random tags instead of the existing tags (default: existing tags)")
+        parser.add_argument("--queries", type=int, default=500,
+            help="Maximum number of different prefix queries (default: 500)")
+        parser.add_argument("--repeat", type=int, default=10,
+            help="How often all queries should be looked up (default: 10)")
+
+    def handle(self, *args, **options):
+        tag_model = get_tag_model()
+        build_timings = Timings("build index")
+        if options["synthetic"]:
+            tags = get_synthetic_tags(options["synthetic"])
+            index = build_timings.measure(TagIndex, tags)
+        else:
+            index = build_timings.measure(build_index, tag_model)
+
+        if not len(index):
+            raise CommandError("No tags found!")
+
+        queries = get_queries(index.names, options["queries"])
+        self.stdout.write("%i tags, %i queries" % (len(index), len(queries)))
+
+        index_timings = Timings("prefix index")
+        database_timings = Timings("icontains query")
+        for __ in range(options["repeat"]):
+            for query in queries:
+                index_timings.measure(index.suggest, query)
+                if not options["synthetic"]:
+                    queryset = tag_model.objects.filter(name__icontains=query).values_list("name", flat=True)
+                    database_timings.measure(list, queryset[:MAX_SUGGESTIONS])
+
+        self.stdout.write(str(build_timings))
+        self.stdout.write(str(index_timings))
+        if database_timings.count:
+            self.stdout.write(str(database_timings))
+            self.stdout.write("Speedup: %.1fx" % (database_timings.total / index_timings.total))
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import multiprocessing
+import time
+
+from django.core.management import BaseCommand
+
+# PyLucid
+from pylucid.thumbnails import generate_thumbnails, get_image_model, get_pool
+from pylucid.utils import human_duration
+
+
+class Command(BaseCommand):
+    help = "Generate all missing thumbnails of all filer images"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+            help="Number of worker processes (default: number of CPUs)")
+
+    def handle(self, *args, **options):
+        image_ids = list(get_image_model().objects.order_by("pk").values_list("pk", flat=True))
+        workers = options["workers"]
+        self.stdout.write("Generate thumbnails of %i images with %i workers..." % (len(image_ids), workers))
+
+        start_time = time.monotonic()
+        if workers <= 1:
+            generated = sum(map(generate_thumbnails, image_ids))
+        else:
+            with get_pool(workers) as pool:
+                generated = sum(pool.imap_unordered(generate_thumbnails, image_ids))
+        duration = time.monotonic() - start_time
+
+        self.stdout.write("%i thumbnails generated in %s (%.1f thumbnails/sec)" % (
+            generated, human_duration(duration), generated / duration if duration else 0
+        ))
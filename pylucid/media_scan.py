@@ -0,0 +1,225 @@
+# coding: utf-8
+
+"""
+    PyLucid media scanner
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Check all files in MEDIA_ROOT for integrity and compare them with the
+    filer database entries, like the "image_info" and "replace_broken"
+    commands of django_cms_tools, but:
+
+        * The directory tree is walked with os.scandir()
+        * Images are verified by Pillow in a thread pool
+        * Files with unchanged (mtime, size) are not opened again,
+          the results are stored in settings.PYLUCID_MEDIA_SCAN_CACHE_PATH
+        * A JSON report lists broken, missing and orphaned files
+
+    Scan with:
+        $ ./manage.py pylucid_media_scan --report media_report.json
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from filer.models import File
+from PIL import Image as PILImage
+
+
+log = logging.getLogger(__name__)
+
+
+CACHE_VERSION = 1
+
+STATUS_OK = "ok"
+STATUS_BROKEN = "broken"
+
+FileInfo = collections.namedtuple("FileInfo", "path mtime_ns size")
+CheckResult = collections.namedtuple("CheckResult", "mtime_ns size status error")
+
+
+def get_image_extensions():
+    """
+    All file extensions that Pillow can open.
+
+    >>> ".png" in get_image_extensions()
+    True
+    >>> ".txt" in get_image_extensions()
+    False
+    """
+    PILImage.init()
+    return frozenset(
+        extension for extension, pil_format in PILImage.registered_extensions().items()
+        if pil_format in PILImage.OPEN
+    )
+
+
+def iter_media_files(root, exclude=()):
+    """
+    Yields FileInfo for all files below root.
+    The path is relative to root with "/" separators, just like the filer file names.
+    Hidden files/directories and the given top level directories are skipped.
+    """
+    stack = [("", str(root))]
+    while stack:
+        prefix, directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+
+                path = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if path not in exclude:
+                        stack.append((path + "/", entry.path))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    yield FileInfo(path, stat.st_mtime_ns, stat.st_size)
+
+
+def check_file(root, file_info, image_extensions):
+    """
+    Returns the CheckResult of the given file. Only images will be opened.
+    """
+    status = STATUS_OK
+    error = None
+    if file_info.size == 0:
+        status = STATUS_BROKEN
+        error = "empty file"
+    elif os.path.splitext(file_info.path)[1].lower() in image_extensions:
+        try:
+            with PILImage.open(str(Path(root, file_info.path))) as image:
+                image.verify()
+        except Exception as err:
+            status = STATUS_BROKEN
+            error = "%s: %s" % (type(err).__name__, err)
+    return CheckResult(file_info.mtime_ns, file_info.size, status, error)
+
+
+def load_cache(cache_path, root):
+    """
+    Returns the cached CheckResults as dict, keyed by the relative file path.
+    """
+    if not cache_path:
+        return {}
+    try:
+        with Path(cache_path).open("r") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as err:
+        log.error("Ignore broken media scan cache: %s", err)
+        return {}
+
+    if data.get("version") != CACHE_VERSION or data.get("root") != str(root):
+        log.info("Ignore media scan cache of %r", data.get("root"))
+        return {}
+    return {path: CheckResult(*values) for path, values in data["files"].items()}
+
+
+def save_cache(cache_path, root, results):
+    cache_path = Path(cache_path)
+    temp_path = cache_path.with_name(".%s.tmp" % cache_path.name)
+    data = {"version": CACHE_VERSION, "root": str(root), "files": results}
+    with temp_path.open("w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(str(temp_path), str(cache_path))
+
+
+class MediaScanner:
+    def __init__(self, root=None, cache_path=None, workers=8, exclude=None):
+        self.root = Path(root or settings.MEDIA_ROOT)
+        self.cache_path = cache_path
+        self.workers = workers
+        if exclude is None:
+            exclude = settings.PYLUCID_MEDIA_SCAN_EXCLUDE
+        self.exclude = frozenset(exclude)
+
+    def scan_files(self):
+        """
+        Returns a dict with the CheckResults of all files
+        and the number of files that were checked (not cached).
+        """
+        cached = load_cache(self.cache_path, self.root)
+        image_extensions = get_image_extensions()
+
+        results = {}
+        to_check = []
+        for file_info in iter_media_files(self.root, self.exclude):
+            result = cached.get(file_info.path)
+            if result is not None and (result.mtime_ns, result.size) == (file_info.mtime_ns, file_info.size):
+                results[file_info.path] = result
+            else:
+                to_check.append(file_info)
+
+        log.info("%i files cached, %i files to check", len(results), len(to_check))
+
+        def check(file_info):
+            return file_info.path, check_file(self.root, file_info, image_extensions)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results.update(executor.map(check, to_check))
+
+        if self.cache_path:
+            save_cache(self.cache_path, self.root, results)
+
+        return results, len(to_check)
+
+    def get_filer_files(self):
+        """
+        Returns a dict of {file name: [filer ids]} of all public filer files.
+        Private files are not stored in MEDIA_ROOT.
+        """
+        filer_files = collections.defaultdict(list)
+        qs = File.objects.filter(is_public=True).order_by("pk").values_list("pk", "file")
+        for pk, name in qs.iterator():
+            if name:
+                filer_files[name].append(pk)
+        return filer_files
+
+    def scan(self):
+        """
+        Returns the report as dict.
+        """
+        start_time = time.monotonic()
+        results, checked = self.scan_files()
+        filer_files = self.get_filer_files()
+
+        broken = [
+            {"path": path, "size": result.size, "error": result.error, "filer_ids": filer_files.get(path, [])}
+            for path, result in sorted(results.items())
+            if result.status == STATUS_BROKEN
+        ]
+        missing = [
+            {"path": name, "filer_ids": filer_ids}
+            for name, filer_ids in sorted(filer_files.items())
+            if name not in results
+        ]
+        orphaned = sorted(set(results) - set(filer_files))
+
+        return {
+            "root": str(self.root),
+            "created": timezone.now().isoformat(),
+            "duration": round(time.monotonic() - start_time, 3),
+            "stats": {
+                "files": len(results),
+                "checked": checked,
+                "cached": len(results) - checked,
+                "broken": len(broken),
+                "missing": len(missing),
+                "orphaned": len(orphaned),
+            },
+            "broken": broken,
+            "missing": missing,
+            "orphaned": orphaned,
+        }
@@ -0,0 +1,269 @@
+# coding: utf-8
+
+"""
+    PyLucid middlewares
+    ~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.http import HttpResponseRedirect
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.translation import get_language_from_request
+
+from cms import views as cms_views
+from cms.cache.page import get_page_cache
+from cms.models import Page
+from cms.page_rendering import render_page
+from cms.toolbar.utils import get_toolbar_from_request
+from cms.utils import get_current_site
+from cms.utils.conf import get_cms_setting
+
+# PyLucid
+from pylucid.db_router import has_written, pin_primary, reset_state, start_request
+from pylucid.esi import is_esi_request
+from pylucid.page_resolver import (
+    get_validators, get_volatile_key, has_volatile_placeholders, is_volatile_page, resolve_page, set_volatile_page
+)
+from pylucid.placeholder_cache import is_cacheable
+
+
+log = logging.getLogger(__name__)
+
+
+def get_view_name(view_func):
+    """
+    >>> get_view_name(cms_views.details)
+    'cms.views.details'
+    >>> from djangocms_blog.views import PostListView
+    >>> get_view_name(PostListView.as_view())
+    'djangocms_blog.views.PostListView'
+    """
+    return "%s.%s" % (view_func.__module__, view_func.__qualname__)
+
+
+class ConditionalPageMiddleware:
+    """
+    Answer conditional GET requests ("If-None-Match"/"If-Modified-Since")
+    of django CMS pages with "304 Not Modified" before the page is rendered.
+    The validators are build from the cached page lookup, the publish version,
+    the site, the language and the template version, see: pylucid.page_resolver
+
+    Pages with plugins that are not cacheable (e.g. "cache = False") change
+    without a publish and get no validators. This is recorded while the page
+    is rendered, so the first request after a publish is always rendered.
+
+    Only for the requests that get the same page for everybody,
+    see: pylucid.placeholder_cache.is_cacheable()
+    Must be inserted before the PageResolverMiddleware.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        validators = getattr(request, "pylucid_validators", None)
+        if validators is not None and response.status_code == 200:
+            volatile_key = request.pylucid_volatile_key
+            placeholders = get_toolbar_from_request(request).content_renderer.get_rendered_placeholders()
+            if placeholders:
+                set_volatile_page(volatile_key, has_volatile_placeholders(request, placeholders))
+            # Use the first record, e.g.: The placeholders may be from the cache
+            if is_volatile_page(volatile_key) is False:
+                self.set_headers(response, *validators)
+        return response
+
+    def set_headers(self, response, etag, last_modified):
+        if not response.has_header("ETag"):
+            response["ETag"] = etag
+        if not response.has_header("Last-Modified"):
+            response["Last-Modified"] = http_date(last_modified)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if view_func is not cms_views.details or not is_cacheable(request):
+            return None
+
+        esi = getattr(request, "pylucid_esi", False)
+        if not esi and len(get_messages(request)):
+            # The messages are rendered into the page
+            return None
+
+        slug = view_kwargs.get("slug", "")
+        site = get_current_site()
+        language = get_language_from_request(request, check_path=True)
+        resolution = resolve_page(request, slug, site.pk, language)
+        if resolution is None or resolution.login_required or resolution.redirect_url:
+            return None
+
+        etag, last_modified = request.pylucid_validators = get_validators(resolution, site.pk, esi=esi)
+        request.pylucid_volatile_key = get_volatile_key(resolution, site.pk)
+        if is_volatile_page(request.pylucid_volatile_key) is not False:
+            # Not rendered yet or with not cacheable plugins
+            return None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            log.debug("Not modified: %r", request.path)
+            self.set_headers(response, etag, last_modified)
+        return response
+
+
+class PageResolverMiddleware:
+    """
+    Use the cached page lookup from pylucid.page_resolver for anonymous
+    GET/HEAD requests of django CMS pages: The cached redirects are
+    answered directly. Otherwise the resolved page is set as the current
+    page and cms.views.details() renders it without the page lookup.
+
+    Only pages in a fallback language are rendered here, because
+    cms.views.details() would redirect them, see: settings.PYLUCID_LANGUAGE_FALLBACK
+    Everything else (e.g.: staff users, login required, 404) is handled by cms.views.details()
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def is_resolvable(self, request, view_func):
+        if view_func is not cms_views.details or request.method not in ("GET", "HEAD"):
+            return False
+
+        if request.user.is_authenticated:
+            return False
+
+        toolbar = getattr(request, "toolbar", None)
+        if toolbar is not None and (toolbar.edit_mode_active or toolbar.show_toolbar):
+            return False
+
+        if get_cms_setting("CMS_TOOLBAR_URL__BUILD") in request.GET:
+            return False
+
+        return True
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.is_resolvable(request, view_func):
+            return None
+
+        slug = view_kwargs.get("slug", "")
+        site = get_current_site()
+        language = get_language_from_request(request, check_path=True)
+        resolution = resolve_page(request, slug, site.pk, language)
+        if resolution is None or resolution.login_required:
+            return None
+
+        if resolution.redirect_url:
+            return HttpResponseRedirect(resolution.redirect_url)
+
+        if get_cms_setting("PAGE_CACHE") and get_page_cache(request) is not None:
+            # The origin view will deliver the cached response
+            return None
+
+        page = Page.objects.filter(pk=resolution.page_id).first()
+        if page is None:
+            return None
+
+        # Used by get_page_from_request() in cms.views.details(), same as in the CurrentPageMiddleware:
+        request._current_page_cache = page
+        if resolution.language == language:
+            return None
+
+        # The same as cms.views.details() without the redirect_on_fallback:
+        request.current_page = page
+        if hasattr(request, "toolbar"):
+            request.toolbar.set_object(page)
+
+        log.debug("Serve %r in fallback language %r", request.path, resolution.language)
+        response = render_page(request, page, current_language=language, slug=slug)
+        response["Content-Language"] = resolution.language
+        canonical_url = request.build_absolute_uri(resolution.canonical_path)
+        response["Link"] = '<%s>; rel="canonical"' % canonical_url
+        return response
+
+
+class PinPrimaryMiddleware:
+    """
+    Read from the primary database (instead of a replica) if:
+        * the request is not GET/HEAD/OPTIONS
+        * the user is logged in (e.g. editors should see their changes)
+        * the client has written in the last PYLUCID_DB_PIN_SECONDS (via cookie)
+    see: pylucid.db_router
+    Must be inserted after the AuthenticationMiddleware.
+    """
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start_request()
+        writes = request.method not in self.safe_methods
+        pinned = settings.PYLUCID_DB_PIN_COOKIE in request.COOKIES
+        if writes or pinned or request.user.is_authenticated:
+            pin_primary()
+
+        try:
+            response = self.get_response(request)
+            if has_written():
+                response.set_cookie(
+                    settings.PYLUCID_DB_PIN_COOKIE, "1", max_age=settings.PYLUCID_DB_PIN_SECONDS, httponly=True
+                )
+        finally:
+            reset_state()
+        return response
+
+
+class NonAtomicReadsMiddleware:
+    """
+    Call the views in settings.PYLUCID_NON_ATOMIC_VIEWS for GET/HEAD requests
+    without the request-wide transaction of "ATOMIC_REQUESTS".
+    On SQLite the transaction would hold the read lock for the whole view
+    and block the writers. POST requests and all other views are still atomic.
+
+    Must be the last middleware with a process_view() method, because the
+    view is called directly. Note: The process_exception() of middlewares are
+    not called for exceptions of these views.
+    """
+    safe_methods = ("GET", "HEAD")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_names = frozenset(settings.PYLUCID_NON_ATOMIC_VIEWS)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in self.safe_methods or get_view_name(view_func) not in self.view_names:
+            return None
+
+        # Same as django.core.handlers.base.BaseHandler, but without make_view_atomic():
+        return view_func(request, *view_args, **view_kwargs)
+
+
+class EsiMiddleware:
+    """
+    Activate the "hole punching" for ESI capable proxies, see: pylucid.esi
+    Must be inserted after the django CMS ToolbarMiddleware.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.pylucid_esi = is_esi_request(request)
+        response = self.get_response(request)
+
+        if settings.PYLUCID_ESI:
+            # The Django cache middleware must store the ESI and the normal page separately:
+            patch_vary_headers(response, ("Surrogate-Capability",))
+
+        if getattr(request, "pylucid_esi_used", False):
+            response["Surrogate-Control"] = 'content="ESI/1.0"'
+        return response
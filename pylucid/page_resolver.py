@@ -0,0 +1,243 @@
+# coding: utf-8
+
+"""
+    PyLucid page resolver
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Cache the result of the django CMS page lookup for anonymous requests:
+    (site, path, language) -> (page, served language, canonical path, redirect)
+    Paths without a page are not cached.
+
+    The results are stored per "publish version": The version is a
+    millisecond timestamp that changes after every committed publish,
+    unpublish, move and delete of a page, so old entries are never used
+    again and just expire.
+
+    The publish version is stored in the Django cache: All processes must
+    use the same cache backend (e.g. the database cache or memcached), not
+    the per process LocMemCache, see: pylucid.checks
+
+    If the requested language is not translated, the content of the first
+    fallback language is served directly under the requested url (with
+    "Content-Language" and a canonical "Link" header) instead of the extra
+    round trip of "redirect_on_fallback", see: settings.PYLUCID_LANGUAGE_FALLBACK
+
+    Used in pylucid.middlewares.PageResolverMiddleware
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import contextlib
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from cms.constants import MAX_EXPIRATION_TTL
+from cms.utils.i18n import get_fallback_languages, get_public_languages, is_language_prefix_patterns_used
+from cms.utils.page import get_page_from_request
+
+# PyLucid
+from pylucid.version import __version__
+
+
+log = logging.getLogger(__name__)
+
+
+FALLBACK_CONTENT = "content"
+FALLBACK_REDIRECT = "redirect"
+
+PUBLISH_VERSION_KEY = "pylucid_publish_version"
+
+VOLATILE_KEY_PREFIX = "pylucid_volatile_page_"
+
+Resolution = collections.namedtuple(
+    "Resolution", "page_id language canonical_path redirect_url login_required"
+)
+
+
+def get_publish_version():
+    version = cache.get(PUBLISH_VERSION_KEY)
+    if version is None:
+        version = bump_publish_version()
+    return version
+
+
+def bump_publish_version():
+    version = int(time.time() * 1000)
+    old_version = cache.get(PUBLISH_VERSION_KEY)
+    if old_version is not None and version <= old_version:
+        # Two changes in the same millisecond (or a clock skew)
+        version = old_version + 1
+    cache.set(PUBLISH_VERSION_KEY, version, None)
+    return version
+
+
+_deferred = threading.local()
+
+
+def page_changed(**kwargs):
+    """
+    Signal handler for page changes.
+    Start the new version after the commit: Otherwise a concurrent request
+    could cache the old data under the new version.
+    Connected in pylucid.apps.PyLucidConfig.ready()
+    """
+    if getattr(_deferred, "active", False):
+        _deferred.pending = True
+    else:
+        transaction.on_commit(bump_publish_version)
+
+
+@contextlib.contextmanager
+def deferred_publish_version():
+    """
+    Start only one new publish version at the end of the with block,
+    e.g.: for bulk page operations, see: pylucid.page_tree
+    Yields a function that returns True if a page was changed.
+    """
+    _deferred.active = True
+    _deferred.pending = False
+    try:
+        yield lambda: _deferred.pending
+    finally:
+        _deferred.active = False
+
+
+def get_cache_key(site_id, path, language):
+    key = "%s|%s|%s|%s" % (get_publish_version(), site_id, language, path)
+    return "pylucid_page_resolver_%s" % hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def clean_redirect_url(redirect_url, language):
+    """
+    Same as cms.views._clean_redirect_url()
+    """
+    prefix = "/%s/" % language
+    if redirect_url.startswith("/") and not redirect_url.startswith(prefix) and is_language_prefix_patterns_used():
+        redirect_url = "/%s/%s" % (language, redirect_url.lstrip("/"))
+    return redirect_url
+
+
+def compute_resolution(request, slug, site_id, language):
+    """
+    The same lookup as cms.views.details() for anonymous users.
+    Returns None for all cases that should be handled by the origin view (e.g.: 404)
+    """
+    page = get_page_from_request(request, use_path=slug)
+    if page is None:
+        return None
+
+    public_languages = get_public_languages(site_id=site_id)
+    if language not in public_languages:
+        return None
+
+    published_languages = list(page.get_published_languages())
+    available_languages = [code for code in public_languages if code in published_languages]
+
+    if language in available_languages:
+        served_language = language
+        page_path = page.get_absolute_url(language)
+        page_slug = page.get_path(language) or page.get_slug(language)
+        if slug and slug != page_slug and request.path[:len(page_path)] != page_path:
+            # The current language does not match its slug:
+            redirect_url = page_path
+        else:
+            redirect_url = clean_redirect_url(page.get_redirect(language, fallback=False) or "", language)
+    else:
+        fallback_languages = [
+            code for code in get_fallback_languages(language, site_id=site_id)
+            if code != language and code in available_languages
+        ]
+        if not fallback_languages:
+            return None
+
+        served_language = fallback_languages[0]
+        if settings.PYLUCID_LANGUAGE_FALLBACK == FALLBACK_REDIRECT or page.is_home:
+            redirect_url = page.get_absolute_url(served_language, fallback=False)
+        else:
+            redirect_url = clean_redirect_url(
+                page.get_redirect(served_language, fallback=False) or "", served_language
+            )
+
+    own_urls = (request.build_absolute_uri(request.path), "/%s" % request.path, request.path)
+    if redirect_url in own_urls:
+        # prevent redirect to self
+        redirect_url = ""
+
+    return Resolution(
+        page_id=page.pk,
+        language=served_language,
+        canonical_path=page.get_absolute_url(served_language, fallback=False),
+        redirect_url=redirect_url,
+        login_required=page.login_required,
+    )
+
+
+def resolve_page(request, slug, site_id, language):
+    """
+    Returns the cached Resolution (or None) for the given request.
+    "Not found" is not cached: Any path can be requested.
+    """
+    cache_key = get_cache_key(site_id, request.path, language)
+    resolution = cache.get(cache_key)
+    if resolution is None:
+        resolution = compute_resolution(request, slug, site_id, language)
+        if resolution is not None:
+            cache.set(cache_key, resolution, settings.PYLUCID_PAGE_RESOLVER_CACHE_TIMEOUT)
+        log.debug("Resolved %r (%s): %r", request.path, language, resolution)
+    return resolution
+
+
+def get_validators(resolution, site_id, esi=False):
+    """
+    Returns the (ETag, Last-Modified timestamp) of a resolved page.
+    The publish version is used as modification time, because a page
+    contains the menu with other pages, too.
+    Used in pylucid.middlewares.ConditionalPageMiddleware
+    """
+    publish_version = get_publish_version()
+    key = "%s|%s|%s|%s|%s|%s|%s" % (
+        publish_version, site_id, resolution.page_id, resolution.language,
+        __version__, settings.PYLUCID_TEMPLATE_VERSION, esi,
+    )
+    etag = 'W/"%s"' % hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return etag, publish_version // 1000
+
+
+def has_volatile_placeholders(request, placeholders):
+    """
+    True, if a rendered placeholder contains plugins with "cache = False" or an
+    expiration (e.g. djangocms_blog's latest entries): The page changes without a publish.
+    """
+    timestamp = timezone.now()
+    return any(placeholder.get_cache_expiration(request, timestamp) < MAX_EXPIRATION_TTL for placeholder in placeholders)
+
+
+def get_volatile_key(resolution, site_id):
+    return "%s%s_%s_%s_%s" % (
+        VOLATILE_KEY_PREFIX, get_publish_version(), site_id, resolution.page_id, resolution.language
+    )
+
+
+def is_volatile_page(volatile_key):
+    """
+    Returns True/False, recorded while the page was rendered,
+    or None if it's unknown, e.g.: The page was not rendered since the last publish.
+    """
+    return cache.get(volatile_key)
+
+
+def set_volatile_page(volatile_key, volatile):
+    """
+    The plugins of a public page only change with a publish, so the first record is kept:
+    Later renders may get some placeholders from the cache.
+    """
+    cache.add(volatile_key, volatile, settings.PYLUCID_PAGE_RESOLVER_CACHE_TIMEOUT)
@@ -0,0 +1,561 @@
+# coding: utf-8
+
+"""
+    PyLucid bulk page tree operations
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Move, copy, publish and unpublish whole page subtrees (or other sets
+    of pages) in one transaction with only one cache invalidation
+    (publish version, menu and page cache) at the end.
+
+    The move computes all new treebeard paths and title paths in memory
+    and stores them with a few bulk updates, instead of the node by node
+    updates of the django CMS admin. The page_moved signal is sent for the
+    moved page (search index, sitemap) and the apphooks are reloaded if a
+    moved page has one.
+
+    The copy creates the tree nodes, pages, titles and placeholders of the
+    whole subtree with a few bulk inserts, instead of the page by page copy
+    of the django CMS.
+
+    The copy and the publishing copy the plugins with the batched copy from
+    pylucid.plugin_copy instead of the plugin by plugin copy.
+
+    Use:
+        $ ./manage.py pylucid_page_tree --help
+        $ ./manage.py pylucid_publish --help
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import contextlib
+import copy
+import itertools
+import logging
+import uuid
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.base import ModelState
+
+from cms.cache import invalidate_cms_page_cache
+from cms.constants import PUBLISHER_STATE_DIRTY
+from cms.extensions import extension_pool
+from cms.models import CMSPlugin, Page, Placeholder, Title, TreeNode
+from cms.signals import page_moved, urls_need_reloading
+from cms.utils.i18n import get_fallback_languages
+from cms.utils.page import get_available_slug
+from cms.utils.permissions import get_current_user_name
+from menus.menu_pool import menu_pool
+
+# PyLucid
+from pylucid.page_resolver import bump_publish_version, deferred_publish_version
+from pylucid.plugin_copy import BULK_BATCH_SIZE, copy_page_plugins, copy_plugins, iter_batches
+
+
+log = logging.getLogger(__name__)
+
+
+def invalidate_caches(site_id):
+    bump_publish_version()
+    menu_pool.clear(site_id=site_id, all=True)
+    invalidate_cms_page_cache()
+    log.info("Page caches of site %s invalidated", site_id)
+
+
+@contextlib.contextmanager
+def single_invalidation(site_id):
+    """
+    Don't invalidate the caches on every page change in the with block:
+    Do it once after the transaction was committed.
+    """
+    with deferred_publish_version():
+        yield
+    transaction.on_commit(lambda: invalidate_caches(site_id))
+
+
+def get_next_child_path(parent_node):
+    """
+    Returns the treebeard path for a new last child (or new last root node).
+    """
+    if parent_node is None:
+        last_node = TreeNode.get_last_root_node()
+        if last_node is None:
+            return TreeNode._get_path(None, 1, 1)
+    else:
+        last_node = parent_node.get_last_child()
+        if last_node is None:
+            return TreeNode._get_path(parent_node.path, parent_node.depth + 1, 1)
+    return last_node._inc_path()
+
+
+def rebase_paths(paths, old_base, new_base):
+    """
+    Returns the new (path, depth) of all nodes of a moved subtree.
+
+    >>> rebase_paths(["0001", "00010001", "000100010002"], "0001", "00020003")
+    [('00020003', 2), ('000200030001', 3), ('0002000300010002', 4)]
+    """
+    steplen = TreeNode.steplen
+    result = []
+    for path in paths:
+        assert path.startswith(old_base), path
+        new_path = new_base + path[len(old_base):]
+        result.append((new_path, len(new_path) // steplen))
+    return result
+
+
+def get_base_path(paths_by_language, language, site_id):
+    """
+    The title path of the parent page in the given language (or in a fallback language).
+    """
+    if not paths_by_language:
+        return ""
+    if language in paths_by_language:
+        return paths_by_language[language]
+    for fallback_language in get_fallback_languages(language, site_id=site_id):
+        if fallback_language in paths_by_language:
+            return paths_by_language[fallback_language]
+    return next(iter(paths_by_language.values()))
+
+
+def get_title_paths(page):
+    """
+    Returns {language: path} of the given page.
+    """
+    if page is None:
+        return {}
+    return dict(page.title_set.values_list("language", "path"))
+
+
+def get_published_languages(page):
+    return {language for language in page.get_languages() if page.is_published(language)}
+
+
+def check_move(page, target):
+    if not page.publisher_is_draft or (target is not None and not target.publisher_is_draft):
+        raise ValueError("Only draft pages can be moved!")
+
+    if page.is_home:
+        raise ValueError("The home page can't be moved!")
+
+    if target is None:
+        return
+
+    if target.node.site_id != page.node.site_id:
+        raise ValueError("Pages can only be moved in the same site!")
+
+    if target.node.path.startswith(page.node.path):
+        raise ValueError("A page can't be moved into its own subtree!")
+
+    unpublished = get_published_languages(page) - get_published_languages(target)
+    if unpublished:
+        # The django CMS would set the moved pages to "pending"
+        raise ValueError(
+            "Target page is not published in: %s (Use the django CMS admin for this move)"
+            % ", ".join(sorted(unpublished))
+        )
+
+
+def update_title_paths(nodes, parent_paths, site_id):
+    """
+    Compute the title paths of all (draft and public) pages of the moved nodes.
+    parent_paths: {publisher_is_draft: {language: path}} of the new parent page.
+    The nodes are sorted by path, so the parents are always computed first.
+    """
+    node_order = {node.pk: index for index, node in enumerate(nodes)}
+    titles = (
+        Title.objects
+        .filter(page__node__in=node_order.keys())
+        .select_related("page")
+        .only("pk", "path", "slug", "language", "has_url_overwrite", "page__node", "page__publisher_is_draft")
+    )
+    titles = sorted(titles, key=lambda title: node_order[title.page.node_id])
+
+    # {(node id, publisher_is_draft): {language: path}}
+    new_paths = collections.defaultdict(dict)
+    parent_ids = {node.pk: node.parent_id for node in nodes}
+    root_node_id = nodes[0].pk
+    changed = []
+    for title in titles:
+        is_draft = title.page.publisher_is_draft
+        node_id = title.page.node_id
+        if node_id == root_node_id:
+            paths_by_language = parent_paths.get(is_draft, {})
+        else:
+            paths_by_language = new_paths[(parent_ids[node_id], is_draft)]
+
+        if not title.has_url_overwrite:
+            base = get_base_path(paths_by_language, title.language, site_id)
+            new_path = title.get_path_for_base(base)
+            if new_path != title.path:
+                title.path = new_path
+                changed.append(title)
+        new_paths[(node_id, is_draft)][title.language] = title.path
+
+    Title.objects.bulk_update(changed, ["path"], batch_size=BULK_BATCH_SIZE)
+    return len(changed)
+
+
+def has_apphooks(nodes):
+    return (
+        Page.objects.public().filter(node__in=nodes)
+        .exclude(application_urls=None).exclude(application_urls="").exists()
+    )
+
+
+def reload_apphooks():
+    """
+    The apphooked pages have new URLs: Same as the django CMS after a changed apphook.
+    """
+    urls_need_reloading.send(sender=None)
+    log.info("Apphook reload triggered")
+
+
+def move_subtree(page, target=None):
+    """
+    Move the draft page with all descendants as last child of the
+    target page (or as last root page if target is None).
+    Returns the number of moved nodes.
+    """
+    check_move(page, target)
+    site_id = page.node.site_id
+
+    with transaction.atomic(), single_invalidation(site_id):
+        root_node = TreeNode.objects.select_for_update().get(pk=page.node_id)
+        target_node = None if target is None else TreeNode.objects.get(pk=target.node_id)
+        old_parent_id = root_node.parent_id
+
+        nodes = list(TreeNode.objects.filter(path__startswith=root_node.path).order_by("path"))
+        new_paths = rebase_paths([node.path for node in nodes], root_node.path, get_next_child_path(target_node))
+        for node, (path, depth) in zip(nodes, new_paths):
+            node.path = path
+            node.depth = depth
+        nodes[0].parent_id = None if target_node is None else target_node.pk
+
+        TreeNode.objects.bulk_update(nodes, ["path", "depth", "parent"], batch_size=BULK_BATCH_SIZE)
+
+        if old_parent_id is not None:
+            TreeNode.objects.filter(pk=old_parent_id).update(numchild=F("numchild") - 1)
+        if target_node is not None:
+            TreeNode.objects.filter(pk=target_node.pk).update(numchild=F("numchild") + 1)
+
+        parent_paths = {}
+        if target is not None:
+            parent_paths[True] = get_title_paths(target)
+            parent_paths[False] = get_title_paths(target.publisher_public)
+        title_count = update_title_paths(nodes, parent_paths, site_id)
+
+        # The handlers act after the commit, e.g.: pylucid.search.signals.subtree_moved()
+        page_moved.send(sender=Page, instance=page)
+        if has_apphooks(nodes):
+            transaction.on_commit(reload_apphooks)
+
+    log.info("Moved %i pages (%i title paths changed)", len(nodes), title_count)
+    return len(nodes)
+
+
+def create_copy_nodes(nodes, target_node):
+    """
+    Create the tree nodes of the copied subtree with bulk inserts.
+    The nodes must be sorted by path. Returns {old node id: new node}.
+    """
+    new_paths = rebase_paths([node.path for node in nodes], nodes[0].path, get_next_child_path(target_node))
+    new_nodes = [
+        TreeNode(site_id=node.site_id, path=path, depth=depth, numchild=node.numchild)
+        for node, (path, depth) in zip(nodes, new_paths)
+    ]
+    TreeNode.objects.bulk_create(new_nodes, batch_size=BULK_BATCH_SIZE)
+
+    # Only PostgreSQL returns the IDs from bulk_create():
+    pk_by_path = {}
+    for paths in iter_batches([path for path, depth in new_paths]):
+        pk_by_path.update(TreeNode.objects.filter(path__in=paths).values_list("path", "pk"))
+
+    new_by_old_id = {}
+    for node, new_node in zip(nodes, new_nodes):
+        new_node.pk = pk_by_path[new_node.path]
+        if node is nodes[0]:
+            new_node.parent_id = None if target_node is None else target_node.pk
+        else:
+            new_node.parent_id = new_by_old_id[node.parent_id].pk
+        new_by_old_id[node.pk] = new_node
+
+    with_parent = [new_node for new_node in new_nodes if new_node.parent_id is not None]
+    TreeNode.objects.bulk_update(with_parent, ["parent"], batch_size=BULK_BATCH_SIZE)
+    if target_node is not None:
+        TreeNode.objects.filter(pk=target_node.pk).update(numchild=F("numchild") + 1)
+    return new_by_old_id
+
+
+def create_copy_pages(pages, new_nodes, languages):
+    """
+    Create the draft pages with bulk inserts, like Page.copy() does.
+    languages: {old page id: [language, ...]} of the copied titles.
+    Returns {old page id: new page}.
+    """
+    user_name = get_current_user_name()
+    new_pages = []
+    for page in pages:
+        new_page = copy.copy(page)
+        new_page._state = ModelState()
+        new_page._clear_internal_cache()
+        new_page.pk = None
+        new_page.node = new_nodes[page.node_id]
+        new_page.publisher_public_id = None
+        new_page.is_home = False
+        new_page.reverse_id = None
+        new_page.publication_date = None
+        new_page.publication_end_date = None
+        new_page.languages = ",".join(languages[page.pk])
+        new_page.changed_by = new_page.created_by = user_name
+        new_pages.append(new_page)
+    Page.objects.bulk_create(new_pages, batch_size=BULK_BATCH_SIZE)
+
+    pk_by_node_id = {}
+    for node_ids in iter_batches([new_page.node_id for new_page in new_pages]):
+        pk_by_node_id.update(Page.objects.filter(node__in=node_ids).values_list("node_id", "pk"))
+
+    new_by_old_id = {}
+    for page, new_page in zip(pages, new_pages):
+        new_page.pk = pk_by_node_id[new_page.node_id]
+        new_by_old_id[page.pk] = new_page
+    return new_by_old_id
+
+
+def create_copy_titles(titles_by_page, pages, new_pages, parent_paths, site):
+    """
+    Create the titles of the copied pages with bulk inserts.
+    The pages must be sorted by path, so the parents are always computed first.
+    The title paths are computed from the new parent paths, like Page.copy() does.
+    parent_paths: {language: path} of the target page.
+    """
+    # {source node id: {language: new path}}
+    new_paths = collections.defaultdict(dict)
+    root_page = pages[0]
+    new_titles = []
+    for page in pages:
+        new_page = new_pages[page.pk]
+        if page is root_page:
+            paths_by_language = parent_paths
+        else:
+            paths_by_language = new_paths[page.node.parent_id]
+
+        for title in titles_by_page[page.pk]:
+            title = copy.copy(title)
+            title._state = ModelState()
+            title.pk = None
+            title.page = new_page
+            title.published = False
+            title.publisher_public = None
+            title.publisher_state = PUBLISHER_STATE_DIRTY
+
+            base = paths_by_language.get(title.language, "")
+            if page is root_page:
+                # Only the new root path may exist: Append "-copy-2" to the slug
+                path = "%s/%s" % (base, title.slug) if base else title.slug
+                title.slug = get_available_slug(site, path, title.language)
+            title.path = "%s/%s" % (base, title.slug) if base else title.slug
+            new_paths[page.node_id][title.language] = title.path
+            new_titles.append(title)
+
+    Title.objects.bulk_create(new_titles, batch_size=BULK_BATCH_SIZE)
+    return len(new_titles)
+
+
+def create_copy_placeholders(pages, new_pages):
+    """
+    Create the placeholders of the copied pages with bulk inserts.
+    Returns {source placeholder id: target placeholder}.
+    """
+    through_model = Page.placeholders.through
+    placeholder_pairs = []
+    for page_ids in iter_batches([page.pk for page in pages]):
+        placeholder_links = (
+            through_model.objects
+            .filter(page__in=page_ids)
+            .select_related("placeholder")
+            .order_by("pk")
+        )
+        placeholder_pairs.extend((link.page_id, link.placeholder) for link in placeholder_links)
+
+    # The new placeholders are found with a unique slot, because only
+    # PostgreSQL returns the IDs from bulk_create():
+    slot_prefix = "pylucid-copy-%s-" % uuid.uuid4().hex
+    new_placeholders = [
+        Placeholder(slot="%s%i" % (slot_prefix, index), default_width=placeholder.default_width)
+        for index, (page_id, placeholder) in enumerate(placeholder_pairs)
+    ]
+    Placeholder.objects.bulk_create(new_placeholders, batch_size=BULK_BATCH_SIZE)
+    pk_by_slot = dict(Placeholder.objects.filter(slot__startswith=slot_prefix).values_list("slot", "pk"))
+
+    placeholder_map = {}
+    links = []
+    for new_placeholder, (page_id, placeholder) in zip(new_placeholders, placeholder_pairs):
+        new_placeholder.pk = pk_by_slot[new_placeholder.slot]
+        new_placeholder.slot = placeholder.slot
+        placeholder_map[placeholder.pk] = new_placeholder
+        links.append(through_model(page_id=new_pages[page_id].pk, placeholder_id=new_placeholder.pk))
+
+    Placeholder.objects.bulk_update(new_placeholders, ["slot"], batch_size=BULK_BATCH_SIZE)
+    through_model.objects.bulk_create(links, batch_size=BULK_BATCH_SIZE)
+    return placeholder_map
+
+
+def copy_subtree(page, target=None):
+    """
+    Copy the draft page with all descendants as last child of the
+    target page (or as last root page if target is None).
+
+    The same as the django CMS copy (titles, placeholders, plugins and
+    extensions, but without the page permissions), but the tree nodes,
+    pages, titles and placeholders are created with a few bulk inserts
+    and the plugins with the batched copy of pylucid.plugin_copy.
+    All in one transaction with one cache invalidation.
+    Returns the new root page.
+    """
+    if not page.publisher_is_draft or (target is not None and not target.publisher_is_draft):
+        raise ValueError("Only draft pages can be copied!")
+
+    site = page.node.site
+    with transaction.atomic(), single_invalidation(site.pk):
+        target_node = None if target is None else TreeNode.objects.select_for_update().get(pk=target.node_id)
+        pages = list(get_subtree_pages(page))
+
+        titles_by_page = collections.defaultdict(list)
+        for title in Title.objects.filter(page__in=pages).order_by("pk"):
+            titles_by_page[title.page_id].append(title)
+        languages = {
+            source.pk: [title.language for title in titles_by_page[source.pk]]
+            for source in pages
+        }
+
+        new_nodes = create_copy_nodes([source.node for source in pages], target_node)
+        new_pages = create_copy_pages(pages, new_nodes, languages)
+        title_count = create_copy_titles(titles_by_page, pages, new_pages, get_title_paths(target), site)
+
+        placeholder_map = create_copy_placeholders(pages, new_pages)
+        plugin_count = 0
+        for language in sorted(set(itertools.chain.from_iterable(languages.values()))):
+            plugins = CMSPlugin.objects.filter(placeholder__in=placeholder_map.keys(), language=language)
+            plugin_count += len(copy_plugins(plugins, placeholder_map, language))
+
+        if extension_pool.page_extensions or extension_pool.title_extensions:
+            for source in pages:
+                extension_pool.copy_extensions(source, new_pages[source.pk])
+
+    new_page = new_pages[page.pk]
+    log.info(
+        "Copied %i pages (%i titles, %i plugins) from page %r to %r",
+        len(pages), title_count, plugin_count, page.pk, new_page.pk
+    )
+    return new_page
+
+
+def get_draft_pages(site_id, root=None, template=None):
+    """
+    Returns the draft pages of the site, parents before children.
+    Optional only the subtree of the root page and/or only the pages with
+    the given template (the stored template, pages with "INHERIT" don't match).
+    """
+    queryset = (
+        Page.objects
+        .filter(publisher_is_draft=True, node__site_id=site_id)
+        .select_related("node")
+        .order_by("node__path")
+    )
+    if root is not None:
+        queryset = queryset.filter(node__path__startswith=root.node.path)
+    if template is not None:
+        queryset = queryset.filter(template=template)
+    return queryset
+
+
+def get_subtree_pages(page):
+    """
+    Returns the draft pages of the subtree, parents before children.
+    """
+    return get_draft_pages(page.node.site_id, root=page)
+
+
+def publish_page(draft, language):
+    """
+    Page.publish() with the batched plugin copy.
+    Returns the number of copied plugins or None if the page was not published.
+    """
+    plugin_counts = []
+
+    def copy_contents(target, language):
+        plugin_counts.append(copy_page_plugins(draft, target, language))
+
+    # Used in Page.publish() instead of Page._copy_contents():
+    draft._copy_contents = copy_contents
+    try:
+        published = draft.publish(language)
+    finally:
+        del draft._copy_contents
+
+    if not published:
+        return None
+    return sum(plugin_counts)
+
+
+def publish_pages(pages, languages, progress=None):
+    """
+    Publish the draft pages in the given languages.
+    The pages must be sorted: parents before children.
+    progress(done, total, published, plugins) is called after every page.
+    Returns the number of published (page, language) and the number of copied plugins.
+    """
+    pages = list(pages)
+    published = plugins = 0
+    if not pages:
+        return published, plugins
+
+    with transaction.atomic(), single_invalidation(pages[0].node.site_id):
+        for done, draft in enumerate(pages, start=1):
+            for language in languages:
+                if language in draft.get_languages():
+                    plugin_count = publish_page(draft, language)
+                    if plugin_count is not None:
+                        published += 1
+                        plugins += plugin_count
+            if progress is not None:
+                progress(done, len(pages), published, plugins)
+
+    log.info("Published %i pages with %i plugins", published, plugins)
+    return published, plugins
+
+
+def unpublish_pages(pages, languages, progress=None):
+    """
+    Unpublish the draft pages in the given languages.
+    progress(done, total, unpublished) is called after every page.
+    Returns the number of unpublished (page, language).
+    """
+    pages = list(pages)
+    unpublished = 0
+    if not pages:
+        return unpublished
+
+    with transaction.atomic(), single_invalidation(pages[0].node.site_id):
+        for done, draft in enumerate(pages, start=1):
+            for language in languages:
+                if draft.is_published(language) and draft.unpublish(language):
+                    unpublished += 1
+            if progress is not None:
+                progress(done, len(pages), unpublished)
+
+    log.info("Unpublished %i pages", unpublished)
+    return unpublished
+
+
+def publish_subtree(page, languages):
+    """
+    Publish all draft pages of the subtree in the given languages.
+    Returns the number of published (page, language).
+    """
+    published, plugins = publish_pages(get_subtree_pages(page), languages)
+    return published
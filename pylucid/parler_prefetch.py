@@ -0,0 +1,169 @@
+# coding: utf-8
+
+"""
+    PyLucid parler translation prefetching
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    django-parler looks up every translation per object: first in the
+    Django cache, then in the database and every translation that was found
+    (or found missing, so that the fallback language is used) is written
+    back to the cache. With the database cache backend these are some
+    queries per object and language, even if the translations were loaded
+    via prefetch_related("translations").
+
+    prefetch_translations() loads the translations of the current language
+    and its fallbacks with one query per translation model (or takes them
+    from prefetch_related("translations")) and puts them into the local
+    translation cache of the objects. Missing languages are marked, so
+    parler goes straight to the fallback.
+
+    The same for querysets:
+
+        queryset = with_translation_prefetch(Post.objects.all(), "categories")
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import logging
+
+from django.db.models.query import ModelIterable
+from django.utils.translation import get_language
+
+from parler.cache import MISSING, is_missing
+from parler.utils import get_language_settings
+
+
+log = logging.getLogger(__name__)
+
+
+def get_prefetch_languages(language_code=None, site_id=None):
+    """
+    The language and its fallbacks, in the order parler tries them.
+    e.g.: PARLER_LANGUAGES from CMS_LANGUAGES with en <-> de fallbacks:
+
+    >>> get_prefetch_languages("de")
+    ['de', 'en']
+    """
+    language_code = language_code or get_language()
+    fallbacks = get_language_settings(language_code, site_id)["fallbacks"]
+    return [language_code] + [code for code in fallbacks if code != language_code]
+
+
+def get_related_objects(objects, lookup):
+    """
+    The instances of a (prefetched) relation: ForeignKey, OneToOne or many-to-many.
+    """
+    related = []
+    for obj in objects:
+        value = getattr(obj, lookup)
+        if hasattr(value, "all"):
+            related.extend(value.all())
+        elif value is not None:
+            related.append(value)
+    return related
+
+
+def fill_translation_cache(objects, meta, languages):
+    """
+    Put the translations of one parler translation model into the local cache of the objects.
+    Returns the number of executed queries (0 or 1)
+    """
+    translations = collections.defaultdict(dict)
+
+    for obj in objects:
+        prefetched = obj._get_prefetched_translations(meta=meta)
+        if prefetched is not None:
+            translations[obj.pk] = dict((translation.language_code, translation) for translation in prefetched)
+
+    pending = dict((obj.pk, obj) for obj in objects if obj.pk not in translations)
+    if pending:
+        queryset = meta.model.objects.filter(master_id__in=pending, language_code__in=languages)
+        master_field = meta.model._meta.get_field("master")
+        for translation in queryset:
+            master_field.set_cached_value(translation, pending[translation.master_id])
+            translations[translation.master_id][translation.language_code] = translation
+
+    for obj in objects:
+        local_cache = obj._translations_cache[meta.model]
+        found = translations[obj.pk]
+        for language_code in languages:
+            if is_missing(local_cache.get(language_code, MISSING)):
+                # Keep changed, but not saved translations
+                local_cache[language_code] = found.get(language_code, MISSING)
+
+    return 1 if pending else 0
+
+
+def prefetch_translations(objects, languages=None, related=()):
+    """
+    Load the translations of the parler model instances in the given languages
+    (default: the current language with its fallbacks).
+    related: Relations to parler models, whose instances get the translations, too.
+    Should be prefetched, e.g.: prefetch_related("categories", "categories__translations")
+    Returns the objects.
+    """
+    languages = list(languages or get_prefetch_languages())
+    objects_by_model = collections.defaultdict(list)
+    for obj in objects:
+        if obj is not None and obj.pk is not None and getattr(obj, "_parler_meta", None) is not None:
+            objects_by_model[obj._meta.concrete_model].append(obj)
+
+    queries = 0
+    for model, model_objects in objects_by_model.items():
+        for meta in model._parler_meta:
+            queries += fill_translation_cache(model_objects, meta, languages)
+
+    for lookup in related:
+        prefetch_translations(get_related_objects(objects, lookup), languages)
+
+    log.debug("Translations %r of %i objects prefetched with %i queries", languages, len(objects), queries)
+    return objects
+
+
+class TranslationPrefetchMixin:
+    """
+    QuerySet mixin: prefetch_translations() works like prefetch_related():
+    The translations are loaded after the queryset is evaluated.
+    """
+    _translation_prefetch = None
+
+    def prefetch_translations(self, *related, languages=None):
+        clone = self._chain()
+        clone._translation_prefetch = (related, languages)
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._translation_prefetch = self._translation_prefetch
+        return clone
+
+    def _fetch_all(self):
+        fetch = self._result_cache is None
+        super()._fetch_all()
+        if fetch and self._translation_prefetch is not None and issubclass(self._iterable_class, ModelIterable):
+            related, languages = self._translation_prefetch
+            prefetch_translations(self._result_cache, languages, related)
+
+
+# queryset class -> the same class with the TranslationPrefetchMixin
+_QUERYSET_CLASSES = {}
+
+
+def with_translation_prefetch(queryset, *related, languages=None):
+    """
+    Add prefetch_translations() to a queryset of a third-party manager
+    (e.g.: the djangocms_blog models) and activate it.
+    """
+    queryset_class = queryset.__class__
+    if not issubclass(queryset_class, TranslationPrefetchMixin):
+        try:
+            prefetch_class = _QUERYSET_CLASSES[queryset_class]
+        except KeyError:
+            prefetch_class = _QUERYSET_CLASSES[queryset_class] = type(
+                queryset_class.__name__, (TranslationPrefetchMixin, queryset_class), {}
+            )
+        queryset = queryset._chain()
+        queryset.__class__ = prefetch_class
+    return queryset.prefetch_translations(*related, languages=languages)
@@ -0,0 +1,178 @@
+# coding: utf-8
+
+"""
+    PyLucid placeholder cache
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Cache the rendered page placeholders for anonymous users, use:
+        {% load pylucid_placeholders %}
+        {% pylucid_placeholder content %}
+    instead of {% placeholder content %}
+
+    The cache key contains the page, the placeholder slot, the language,
+    the "publish version" (see: pylucid.page_resolver) and a version
+    per (page, slot). The slot version changes on every plugin change in
+    this placeholder, so only the changed placeholders are rendered again.
+
+    The sekizai blocks (css/js) added by the plugins are stored together
+    with the content and replayed on a cache hit, see: pylucid.fragment_cache
+
+    In contrast to the django CMS placeholder cache, the placeholders and
+    plugins of the page are not loaded from the database on a cache hit.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import hashlib
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from cms.models import CMSPlugin, Placeholder
+from cms.signals import post_placeholder_operation
+from cms.utils.conf import get_cms_setting
+
+# PyLucid
+from pylucid.fragment_cache import get_fragment, render_fragment
+from pylucid.page_resolver import get_publish_version
+
+
+log = logging.getLogger(__name__)
+
+
+def get_version_key(page_id, slot):
+    return "pylucid_placeholder_version_%s_%s" % (page_id, hashlib.sha1(slot.encode("utf-8")).hexdigest())
+
+
+def get_slot_version(page_id, slot):
+    version = cache.get(get_version_key(page_id, slot))
+    if version is None:
+        version = bump_slot_version(page_id, slot)
+    return version
+
+
+def bump_slot_version(page_id, slot):
+    version = int(time.time() * 1000000)
+    cache.set(get_version_key(page_id, slot), version, None)
+    return version
+
+
+def get_cache_key(page_id, slot, language):
+    key = "%s|%s|%s|%s|%s" % (
+        get_publish_version(), page_id, slot, language, get_slot_version(page_id, slot)
+    )
+    return "pylucid_placeholder_%s" % hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(request):
+    """
+    Only anonymous users without the toolbar get the cached placeholders.
+    In ESI mode the page is the same for all users, see: pylucid.esi
+    """
+    if request is None or request.method not in ("GET", "HEAD"):
+        return False
+
+    if getattr(request, "pylucid_esi", False):
+        return True
+
+    if request.user.is_authenticated:
+        return False
+
+    toolbar = getattr(request, "toolbar", None)
+    if toolbar is not None and (toolbar.edit_mode_active or toolbar.show_toolbar):
+        return False
+
+    if get_cms_setting("CMS_TOOLBAR_URL__BUILD") in request.GET:
+        return False
+
+    return True
+
+
+def get_timeout(placeholder, request):
+    """
+    The cache timeout in seconds of a rendered placeholder.
+    Respect the plugins with "cache = False" or a shorter expiration.
+    Placeholders with plugins that vary on request headers are not cached.
+    """
+    timeout = settings.PYLUCID_PLACEHOLDER_CACHE_TIMEOUT
+    if placeholder is None:
+        # Empty placeholder: Only the "or" part of the tag was rendered
+        return timeout
+
+    if placeholder.get_vary_cache_on(request):
+        return 0
+
+    return min(timeout, placeholder.get_cache_expiration(request, timezone.now()))
+
+
+def render_cached(context, page, slot, language, render_func, get_placeholder):
+    """
+    Returns the rendered placeholder from the cache or
+    call render_func() and store the result.
+    """
+    cache_key = get_cache_key(page.pk, slot, language)
+    content = get_fragment(context, cache_key)
+    if content is not None:
+        return content
+
+    value = render_fragment(context, render_func)
+
+    timeout = get_timeout(get_placeholder(), context["request"])
+    if timeout > 0:
+        cache.set(cache_key, value, timeout)
+    else:
+        log.debug("Don't cache placeholder %r of page %r", slot, page.pk)
+    return mark_safe(value["content"])
+
+
+#_____________________________________________________________________________
+# invalidation
+
+def bump_placeholder_versions(placeholder_id):
+    """
+    Start a new version of all (page, slot) that use the given placeholder.
+    """
+    def bump():
+        queryset = Placeholder.objects.filter(pk=placeholder_id, page__isnull=False)
+        for slot, page_id in queryset.values_list("slot", "page"):
+            log.debug("Placeholder %r of page %r changed", slot, page_id)
+            bump_slot_version(page_id, slot)
+
+    # The old content could be cached again before the transaction is committed:
+    transaction.on_commit(bump)
+
+
+def plugin_changed(sender, instance, **kwargs):
+    if instance.placeholder_id:
+        bump_placeholder_versions(instance.placeholder_id)
+
+
+def placeholder_operation(sender, **kwargs):
+    """
+    e.g.: Plugins moved by a queryset update or a cleared placeholder
+    """
+    for value in kwargs.values():
+        if isinstance(value, Placeholder):
+            bump_placeholder_versions(value.pk)
+
+
+def connect_signals():
+    """
+    Connected in pylucid.apps.PyLucidConfig.ready()
+    The signals are connected to every plugin model, because a receiver
+    for all models would disable the fast deletes.
+    """
+    for model in apps.get_models():
+        if issubclass(model, CMSPlugin):
+            for signal in (post_save, post_delete):
+                signal.connect(plugin_changed, sender=model, dispatch_uid="pylucid_placeholder_cache")
+
+    post_placeholder_operation.connect(placeholder_operation, dispatch_uid="pylucid_placeholder_cache")
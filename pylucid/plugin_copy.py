@@ -0,0 +1,256 @@
+# coding: utf-8
+
+"""
+    PyLucid batched plugin copy
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Copy all plugins of a page (e.g.: draft -> public on publishing) with a
+    few batched INSERTs instead of the plugin by plugin copy of the django CMS,
+    that needs some queries for every plugin (treebeard add_root()/add_child()
+    and the save of the base and the plugin model).
+
+    The treebeard paths of the new plugins are computed in memory: Every
+    copied plugin tree gets a new root path, the descendants keep their
+    path below the root.
+
+    The base CMSPlugin rows are created with bulk_create(). bulk_create()
+    refuses multi-table inherited models, so the plugin model rows (e.g.:
+    the Text with the cmsplugin_ptr) are inserted with the same batched
+    INSERT that bulk_create() uses, but only with the local fields.
+    post_save is sent for every new plugin, like a save() would do.
+
+    This works only for plugin models that inherit directly from CMSPlugin.
+    Other plugin models (e.g.: Foo(Bar(CMSPlugin)) that needs a row in the
+    table of Bar, too) are saved one by one with the multi-table save of Django.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import logging
+
+from django.db import router
+from django.db.models.signals import post_save
+
+from cms.models import CMSPlugin
+from cms.utils.plugins import get_bound_plugins
+
+
+log = logging.getLogger(__name__)
+
+
+BULK_BATCH_SIZE = 500
+
+# The base fields that are set on the copy:
+TREE_FIELDS = ("placeholder_id", "parent_id", "language", "path", "depth", "numchild", "creation_date", "changed_date")
+
+
+def iter_batches(items, batch_size=BULK_BATCH_SIZE):
+    """
+    >>> list(iter_batches([1, 2, 3, 4, 5], batch_size=2))
+    [[1, 2], [3, 4], [5]]
+    """
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def get_copy_paths(paths, next_root_step):
+    """
+    Returns the new treebeard paths: Every plugin tree gets a new root path.
+    The plugins must be sorted by path, all plugin trees start at the root.
+
+    >>> get_copy_paths(["0003", "00030001", "00030002", "0005"], next_root_step=10)
+    ['000A', '000A0001', '000A0002', '000B']
+    """
+    steplen = CMSPlugin.steplen
+    root_paths = {}
+    new_paths = []
+    for path in paths:
+        root_path = path[:steplen]
+        if root_path not in root_paths:
+            root_paths[root_path] = CMSPlugin._get_path(None, 1, next_root_step)
+            next_root_step += 1
+        new_paths.append(root_paths[root_path] + path[steplen:])
+    return new_paths
+
+
+def is_bulk_copyable(model):
+    """
+    Only the rows of CMSPlugin and of the plugin model itself can be inserted in bulk.
+    """
+    return model is CMSPlugin or list(model._meta.parents) == [CMSPlugin]
+
+
+def get_next_root_step():
+    last_root = CMSPlugin.get_last_root_node()
+    if last_root is None:
+        return 1
+    return CMSPlugin._str2int(last_root.path) + 1
+
+
+def get_plugins(plugins):
+    """
+    Returns the downcasted plugins, sorted by path.
+    Skip plugins without plugin model instance (and their descendants), like the django CMS.
+    """
+    plugins = sorted(get_bound_plugins(plugins), key=lambda plugin: plugin.path)
+    copied_ids = set()
+    result = []
+    for plugin in plugins:
+        if plugin.parent_id is not None and plugin.parent_id not in copied_ids:
+            log.warning("Skip plugin %r: Parent plugin %r not copied", plugin.pk, plugin.parent_id)
+            continue
+        copied_ids.add(plugin.pk)
+        result.append(plugin)
+    return result
+
+
+def create_base_plugins(plugins, placeholder_map, language):
+    """
+    Create the CMSPlugin rows and returns them in the order of the given plugins.
+    """
+    new_paths = get_copy_paths([plugin.path for plugin in plugins], get_next_root_step())
+    numchild = collections.Counter(plugin.parent_id for plugin in plugins)
+
+    base_plugins = [
+        CMSPlugin(
+            placeholder=placeholder_map[plugin.placeholder_id],
+            position=plugin.position,
+            language=language,
+            plugin_type=plugin.plugin_type,
+            path=path,
+            depth=plugin.depth,
+            numchild=numchild[plugin.pk],
+        )
+        for plugin, path in zip(plugins, new_paths)
+    ]
+    CMSPlugin.objects.bulk_create(base_plugins, batch_size=BULK_BATCH_SIZE)
+
+    # Only PostgreSQL returns the IDs from bulk_create():
+    pk_by_path = {}
+    for paths in iter_batches(new_paths):
+        pk_by_path.update(CMSPlugin.objects.filter(path__in=paths).values_list("path", "pk"))
+
+    new_by_old_pk = {}
+    for plugin, base_plugin in zip(plugins, base_plugins):
+        base_plugin.pk = pk_by_path[base_plugin.path]
+        if plugin.parent_id is not None:
+            base_plugin.parent_id = new_by_old_pk[plugin.parent_id].pk
+        new_by_old_pk[plugin.pk] = base_plugin
+
+    with_parent = [base_plugin for base_plugin in base_plugins if base_plugin.parent_id is not None]
+    CMSPlugin.objects.bulk_update(with_parent, ["parent"], batch_size=BULK_BATCH_SIZE)
+    return base_plugins
+
+
+def build_plugin_instance(plugin, base_plugin):
+    """
+    Returns a copy of the plugin model instance for the new base plugin.
+    """
+    model = plugin.__class__
+    values = {}
+    for field in model._meta.concrete_fields:
+        if field.remote_field is not None and field.remote_field.parent_link:
+            values[field.attname] = base_plugin.pk
+        else:
+            values[field.attname] = getattr(plugin, field.attname)
+    values[CMSPlugin._meta.pk.attname] = base_plugin.pk
+    for attname in TREE_FIELDS:
+        values[attname] = getattr(base_plugin, attname)
+
+    new_plugin = model(**values)
+    new_plugin._state.adding = False
+    new_plugin._state.db = base_plugin._state.db
+    return new_plugin
+
+
+def send_post_save(new_plugins):
+    for new_plugin in new_plugins:
+        post_save.send(
+            sender=new_plugin.__class__, instance=new_plugin, created=True,
+            update_fields=None, raw=False, using=new_plugin._state.db,
+        )
+
+
+def insert_plugin_instances(new_plugins):
+    """
+    Insert the plugin model rows and send post_save.
+    The CMSPlugin rows exist, see: create_base_plugins()
+    """
+    by_model = collections.defaultdict(list)
+    for new_plugin in new_plugins:
+        by_model[new_plugin.__class__].append(new_plugin)
+
+    for model, instances in by_model.items():
+        if not is_bulk_copyable(model):
+            # Django inserts the rows of the intermediate parent models, too
+            # (and updates the existing CMSPlugin row). Sends post_save.
+            for instance in instances:
+                instance.save_base(force_insert=True)
+            continue
+
+        if model is not CMSPlugin:
+            using = router.db_for_write(model)
+            fields = model._meta.local_concrete_fields
+            for batch in iter_batches(instances):
+                model._base_manager._insert(batch, fields=fields, using=using)
+        send_post_save(instances)
+
+
+def copy_plugins(plugins, placeholder_map, language):
+    """
+    Copy the plugins into the new placeholders.
+    placeholder_map: {source placeholder id: target placeholder}
+    Returns the new plugins.
+    """
+    plugins = get_plugins(plugins)
+    if not plugins:
+        return []
+
+    base_plugins = create_base_plugins(plugins, placeholder_map, language)
+
+    new_plugins = []
+    plugin_pairs = []
+    for plugin, base_plugin in zip(plugins, base_plugins):
+        if plugin.__class__ is CMSPlugin:
+            new_plugins.append(base_plugin)
+        else:
+            new_plugin = build_plugin_instance(plugin, base_plugin)
+            new_plugins.append(new_plugin)
+            plugin_pairs.append((new_plugin, plugin))
+    insert_plugin_instances(new_plugins)
+
+    for new_plugin, plugin in plugin_pairs:
+        new_plugin.copy_relations(plugin)
+
+    # post_copy() is used to update references to child plugins
+    # (e.g.: the plugin tags in a Text body), skip it on plugins without children:
+    for new_plugin, plugin in plugin_pairs:
+        if new_plugin.numchild:
+            new_plugin.post_copy(plugin, plugin_pairs)
+
+    log.debug("%i plugins copied", len(new_plugins))
+    return new_plugins
+
+
+def copy_page_plugins(source_page, target_page, language):
+    """
+    The same as Page._copy_contents() from django CMS, but with the batched plugin copy.
+    Returns the number of copied plugins.
+    """
+    cleared_placeholders = target_page._clear_placeholders(language)
+    target_by_slot = {placeholder.slot: placeholder for placeholder in cleared_placeholders}
+
+    placeholder_map = {}
+    for placeholder in source_page.get_placeholders():
+        target_placeholder = target_by_slot.get(placeholder.slot)
+        if target_placeholder is None:
+            target_placeholder = target_page.placeholders.create(
+                slot=placeholder.slot,
+                default_width=placeholder.default_width,
+            )
+        placeholder_map[placeholder.pk] = target_placeholder
+
+    plugins = CMSPlugin.objects.filter(placeholder__in=placeholder_map.keys(), language=language)
+    return len(copy_plugins(plugins, placeholder_map, language))
@@ -0,0 +1,117 @@
+# coding: utf-8
+
+"""
+    PyLucid pygments cache
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Cache the highlighted html of cmsplugin_pygments and
+    keep the used lexer/formatter instances in memory.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+import pygments
+from pygments import highlight, styles
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+
+log = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "pylucid.pygments"
+
+# Lexer instances by name and formatter instances by (style name, line numbers)
+_LEXERS = {}
+_FORMATTERS = {}
+_STYLE_DEFS = {}
+
+
+def get_lexer(lexer_name):
+    """
+    Returns a lexer instance. Each lexer will be only created once.
+    """
+    try:
+        return _LEXERS[lexer_name]
+    except KeyError:
+        lexer = _LEXERS[lexer_name] = get_lexer_by_name(lexer_name)
+        return lexer
+
+
+def get_formatter(style_name, linenos):
+    key = (style_name, linenos)
+    try:
+        return _FORMATTERS[key]
+    except KeyError:
+        style = styles.get_style_by_name(style_name)
+        formatter = _FORMATTERS[key] = HtmlFormatter(linenos=linenos, style=style)
+        return formatter
+
+
+def get_style_defs(style_name, linenos):
+    key = (style_name, linenos)
+    try:
+        return _STYLE_DEFS[key]
+    except KeyError:
+        css = _STYLE_DEFS[key] = get_formatter(style_name, linenos).get_style_defs()
+        return css
+
+
+def get_cache_key(code, lexer_name, style_name, linenos):
+    """
+    The pygments version is part of the key, because a
+    pygments update may change the generated html.
+    """
+    code_hash = hashlib.sha1(code.encode("utf-8")).hexdigest()
+    return "%s.%s.%s.%s.%i.v%s" % (
+        CACHE_KEY_PREFIX, code_hash, lexer_name, style_name, linenos, pygments.__version__
+    )
+
+
+def highlight_code(code, lexer_name, style_name, linenos):
+    """
+    Returns the html and the css for the given source code.
+    The html will be cached, keyed by code hash, lexer, style and line numbers.
+    """
+    cache_key = get_cache_key(code, lexer_name, style_name, linenos)
+    html = cache.get(cache_key)
+    if html is None:
+        html = highlight(code, get_lexer(lexer_name), get_formatter(style_name, linenos))
+        cache.set(cache_key, html, settings.PYLUCID_PYGMENTS_CACHE_TIMEOUT)
+
+    css = get_style_defs(style_name, linenos)
+    return html, css
+
+
+def get_used_lexer_names():
+    """
+    Returns the lexer names used in the existing cmsplugin_pygments content.
+    """
+    from cmsplugin_pygments.models import PygmentsPlugin
+
+    qs = PygmentsPlugin.objects.order_by("code_language").values_list("code_language", flat=True)
+    return list(qs.distinct())
+
+
+def preload_lexers(lexer_names=None):
+    """
+    Create lexer instances, so that the lexer modules are imported
+    before the first page request needs them.
+    """
+    if lexer_names is None:
+        lexer_names = settings.PYLUCID_PYGMENTS_PRELOAD_LEXERS
+
+    for lexer_name in lexer_names:
+        try:
+            get_lexer(lexer_name)
+        except ClassNotFound as err:
+            log.warning("Can't preload pygments lexer %r: %s", lexer_name, err)
+        else:
+            log.debug("Pygments lexer %r preloaded.", lexer_name)
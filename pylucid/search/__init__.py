@@ -0,0 +1,17 @@
+# coding: utf-8
+
+"""
+    PyLucid search
+    ~~~~~~~~~~~~~~
+
+    Full-text search over the published pages and blog posts.
+
+    The rendered text is stored in a SQLite FTS5 index, separate from the
+    page instance database (see: settings.PYLUCID_SEARCH_INDEX_PATH).
+    The index will be updated on publish and can be rebuild with:
+
+        $ ./manage.py pylucid_search_reindex
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
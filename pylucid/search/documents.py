@@ -0,0 +1,170 @@
+# coding: utf-8
+
+"""
+    PyLucid search documents
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Render published pages and blog posts into plain text documents
+    for the search index.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import html
+import re
+
+from django.apps import apps
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sites.models import Site
+from django.test import RequestFactory
+from django.utils.html import strip_tags
+from django.utils.translation import override as force_language
+
+from cms.models import Page, Title
+from cms.plugin_rendering import ContentRenderer
+from sekizai.context import SekizaiContext
+
+
+KIND_PAGE = "page"
+KIND_BLOG_POST = "blogpost"
+
+
+def html2text(value):
+    """
+    >>> html2text("<p>PyLucid &amp;\\n<strong>Django-CMS</strong></p>  <p>1 &lt; 2</p>")
+    'PyLucid & Django-CMS 1 < 2'
+    """
+    value = strip_tags(value)
+    value = html.unescape(value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def get_render_request(path, language, page=None):
+    """
+    A anonymous request used to render the placeholder content.
+    """
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    request.session = {}
+    request.LANGUAGE_CODE = language
+    request.current_page = page
+    return request
+
+
+def render_placeholders(placeholders, language, request, page=None):
+    renderer = ContentRenderer(request)
+    context = SekizaiContext({"request": request})
+    contents = []
+    for placeholder in placeholders:
+        content = renderer.render_placeholder(
+            placeholder, context, language=language, page=page, editable=False
+        )
+        contents.append(content)
+    return " ".join(contents)
+
+
+def get_page_document(page, language):
+    """
+    Returns the document for the given public page or None
+    if the page is not published in this language.
+    """
+    assert not page.publisher_is_draft, "Only public pages should be indexed!"
+    if not page.is_published(language):
+        return None
+
+    title = page.get_title_obj(language, fallback=False)
+    with force_language(language):
+        url = page.get_absolute_url(language, fallback=False)
+        request = get_render_request(url, language, page=page)
+        content = render_placeholders(page.get_placeholders(), language, request, page=page)
+
+    return {
+        "kind": KIND_PAGE,
+        "object_id": page.publisher_public_id,  # The draft page pk is used in the publish signals
+        "language": language,
+        "site_id": page.node.site_id,
+        "url": url,
+        "title": title.title,
+        "content": html2text(" ".join((title.meta_description or "", content))),
+    }
+
+
+def get_blog_post_documents(post, site_ids):
+    """
+    Yields the documents for all languages and the given sites of the blog post.
+    """
+    for language in post.get_available_languages():
+        with force_language(language):
+            post.set_current_language(language)
+            url = post.get_absolute_url(language)
+            request = get_render_request(url, language)
+            content = render_placeholders([post.content], language, request)
+
+        content = html2text(" ".join((post.subtitle, post.abstract, post.post_text, content)))
+        for site_id in site_ids:
+            yield {
+                "kind": KIND_BLOG_POST,
+                "object_id": post.pk,
+                "language": language,
+                "site_id": site_id,
+                "url": url,
+                "title": post.title,
+                "content": content,
+            }
+
+
+def get_public_pages():
+    return Page.objects.public().published().select_related("node")
+
+
+def get_published_blog_posts():
+    from djangocms_blog.models import Post
+
+    return Post.objects.published(current_site=False).prefetch_related("translations", "sites")
+
+
+def get_page_jobs(language=None, root_node=None):
+    """
+    Returns (kind, object_id, language) for all published pages
+    (or only for the pages in the subtree of the given TreeNode).
+    object_id is the public page pk.
+    """
+    qs = Title.objects.public().filter(page__in=get_public_pages())
+    if language:
+        qs = qs.filter(language=language)
+    if root_node is not None:
+        qs = qs.filter(page__node__path__startswith=root_node.path)
+    qs = qs.order_by("page_id", "language").values_list("page_id", "language")
+    return [(KIND_PAGE, page_id, title_language) for page_id, title_language in qs.iterator()]
+
+
+def get_blog_post_jobs():
+    if not apps.is_installed("djangocms_blog"):
+        return []
+    qs = get_published_blog_posts().order_by("pk").values_list("pk", flat=True)
+    return [(KIND_BLOG_POST, post_id, None) for post_id in qs.iterator()]
+
+
+def render_job(job):
+    """
+    Returns a list of documents for a job from get_page_jobs() or get_blog_post_jobs()
+    """
+    kind, object_id, language = job
+    if kind == KIND_PAGE:
+        page = get_public_pages().filter(pk=object_id).first()
+        if page is None:
+            return []
+        document = get_page_document(page, language)
+        return [document] if document else []
+
+    post = get_published_blog_posts().filter(pk=object_id).first()
+    if post is None:
+        return []
+
+    site_ids = [site.pk for site in post.sites.all()]
+    if not site_ids:
+        # No site selected -> The post is visible on all sites:
+        site_ids = list(Site.objects.values_list("pk", flat=True))
+
+    return list(get_blog_post_documents(post, site_ids))
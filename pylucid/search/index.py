@@ -0,0 +1,220 @@
+# coding: utf-8
+
+"""
+    PyLucid search index
+    ~~~~~~~~~~~~~~~~~~~~
+
+    SQLite FTS5 index with BM25 ranking.
+
+    The documents are stored in a normal table and indexed by
+    a FTS5 table that use the documents table as "external content".
+    So a single document can be replaced without a full table scan.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import logging
+import re
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+
+log = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    object_id INTEGER NOT NULL,
+    language TEXT NOT NULL,
+    site_id INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS documents_object ON documents (kind, object_id, language, site_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, content,
+    content='documents', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+"""
+
+# bm25() column weights: A match in the title counts more than in the content:
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+SEARCH_SQL = """
+SELECT d.kind, d.object_id, d.url, d.title,
+    snippet(documents_fts, 1, char(2), char(3), '…', 24),
+    bm25(documents_fts, %(title_weight)f, %(content_weight)f) AS rank
+FROM documents_fts
+JOIN documents AS d ON d.id = documents_fts.rowid
+WHERE documents_fts MATCH ? AND d.language = ? AND d.site_id = ?
+ORDER BY rank
+LIMIT ?
+""" % {
+    "title_weight": TITLE_WEIGHT,
+    "content_weight": CONTENT_WEIGHT,
+}
+
+# Marks the matched words in the snippet:
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+
+class SearchResult(collections.namedtuple("SearchResult", "kind object_id url title snippet rank")):
+    def snippet_html(self):
+        """
+        The snippet text is escaped and the matched words are highlighted.
+
+        >>> SearchResult("page", 1, "/", "", "<b> \x02PyLucid\x03", -1.0).snippet_html()
+        '&lt;b&gt; <strong>PyLucid</strong>'
+        """
+        html = escape(self.snippet)
+        html = html.replace(SNIPPET_START, "<strong>").replace(SNIPPET_END, "</strong>")
+        return mark_safe(html)
+
+
+def build_match_query(text):
+    """
+    Build a FTS5 MATCH expression from the user input.
+    Every word must match and the last word is used as prefix.
+
+    >>> build_match_query('PyLucid "CMS" AND foo*')
+    '"PyLucid" "CMS" "AND" "foo"*'
+    >>> build_match_query("Umlaute äöü")
+    '"Umlaute" "äöü"*'
+    >>> build_match_query(" - ") is None
+    True
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join('"%s"' % word for word in words) + "*"
+
+
+class SearchIndex:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        try:
+            connection.executescript(SCHEMA)
+        except sqlite3.OperationalError as err:
+            connection.close()
+            if "fts5" in str(err):
+                raise ImproperlyConfigured("SQLite without FTS5 support: %s" % err)
+            raise
+        return connection
+
+    @property
+    def connection(self):
+        """
+        sqlite3 connections should not be shared between threads.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def update(self, documents):
+        """
+        Add or replace documents.
+        A document is a dict with: kind, object_id, language, site_id, url, title, content
+        """
+        documents = list(documents)
+        with self.connection as connection:
+            connection.executemany(
+                "DELETE FROM documents WHERE kind = :kind AND object_id = :object_id AND language = :language",
+                documents
+            )
+            connection.executemany(
+                "INSERT INTO documents (kind, object_id, language, site_id, url, title, content)"
+                " VALUES (:kind, :object_id, :language, :site_id, :url, :title, :content)",
+                documents
+            )
+        log.debug("%i documents updated in search index", len(documents))
+
+    def remove(self, kind, object_id, language=None):
+        with self.connection as connection:
+            if language is None:
+                connection.execute(
+                    "DELETE FROM documents WHERE kind = ? AND object_id = ?",
+                    (kind, object_id)
+                )
+            else:
+                connection.execute(
+                    "DELETE FROM documents WHERE kind = ? AND object_id = ? AND language = ?",
+                    (kind, object_id, language)
+                )
+
+    def clear(self):
+        with self.connection as connection:
+            connection.execute("DELETE FROM documents")
+            connection.execute("INSERT INTO documents_fts(documents_fts) VALUES ('delete-all')")
+
+    def optimize(self):
+        """
+        Merge all FTS5 index b-trees. Useful after a reindex.
+        """
+        with self.connection as connection:
+            connection.execute("INSERT INTO documents_fts(documents_fts) VALUES ('optimize')")
+
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def search(self, text, language, site_id, limit=20):
+        """
+        Returns a list of SearchResult instances, best match first.
+        """
+        match_query = build_match_query(text)
+        if match_query is None:
+            return []
+
+        cursor = self.connection.execute(SEARCH_SQL, (match_query, language, site_id, limit))
+        return [SearchResult(*row) for row in cursor]
+
+
+_INDEXES = {}
+
+
+def get_search_index():
+    """
+    Returns the SearchIndex instance for settings.PYLUCID_SEARCH_INDEX_PATH
+    """
+    path = settings.PYLUCID_SEARCH_INDEX_PATH
+    if not path:
+        raise ImproperlyConfigured("settings.PYLUCID_SEARCH_INDEX_PATH is not set!")
+
+    try:
+        return _INDEXES[path]
+    except KeyError:
+        search_index = _INDEXES[path] = SearchIndex(path)
+        return search_index
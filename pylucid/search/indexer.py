@@ -0,0 +1,64 @@
+# coding: utf-8
+
+"""
+    PyLucid search indexer
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Render documents (optional in a worker pool) and write them
+    in batches into the search index.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+import multiprocessing
+
+from django import db
+
+# PyLucid
+from pylucid.search.documents import render_job
+from pylucid.search.index import get_search_index
+
+
+log = logging.getLogger(__name__)
+
+
+def _init_worker():
+    # The forked worker must not use the database connections of the parent process:
+    db.connections.close_all()
+
+
+def _write_documents(search_index, results, batch_size):
+    count = 0
+    batch = []
+    for documents in results:
+        batch += documents
+        if len(batch) >= batch_size:
+            search_index.update(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        search_index.update(batch)
+        count += len(batch)
+    return count
+
+
+def index_jobs(jobs, workers=1, batch_size=100):
+    """
+    Render the documents for the given jobs and update the search index.
+    see: pylucid.search.documents.get_page_jobs() and get_blog_post_jobs()
+
+    Returns the number of indexed documents.
+    """
+    search_index = get_search_index()
+    if workers <= 1:
+        return _write_documents(search_index, map(render_job, jobs), batch_size)
+
+    # Don't share the database connections with the forked processes:
+    db.connections.close_all()
+
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers, initializer=_init_worker) as pool:
+        results = pool.imap_unordered(render_job, jobs, chunksize=10)
+        return _write_documents(search_index, results, batch_size)
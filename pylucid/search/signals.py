@@ -0,0 +1,143 @@
+# coding: utf-8
+
+"""
+    PyLucid search signals
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Update the search index incrementally on publish/unpublish/move.
+    Connected in pylucid.apps.PyLucidConfig.ready()
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from cms.models import Page, TreeNode
+from cms.operations import MOVE_PAGE
+from cms.signals import page_moved, post_obj_operation, post_publish, post_unpublish
+
+# PyLucid
+from pylucid.search.documents import KIND_BLOG_POST, KIND_PAGE, get_page_jobs
+from pylucid.search.index import get_search_index
+from pylucid.search.indexer import index_jobs
+
+
+log = logging.getLogger(__name__)
+
+
+def update_index(jobs):
+    """
+    Update the index after the current transaction was committed.
+    Errors are only logged: The search index should never break the publishing.
+    """
+    def update():
+        try:
+            index_jobs(jobs)
+        except Exception as err:
+            log.exception("Search index update error: %s", err)
+
+    transaction.on_commit(update)
+
+
+def remove_from_index(kind, object_id, language=None):
+    def remove():
+        try:
+            get_search_index().remove(kind, object_id, language)
+        except Exception as err:
+            log.exception("Search index remove error: %s", err)
+
+    transaction.on_commit(remove)
+
+
+def page_published(sender, instance, language, **kwargs):
+    if settings.PYLUCID_SEARCH_INDEX_PATH:
+        update_index([(KIND_PAGE, instance.publisher_public_id, language)])
+
+
+def page_unpublished(sender, instance, language, **kwargs):
+    if settings.PYLUCID_SEARCH_INDEX_PATH:
+        remove_from_index(KIND_PAGE, instance.pk, language)
+
+
+def page_deleted(sender, instance, **kwargs):
+    if settings.PYLUCID_SEARCH_INDEX_PATH and instance.publisher_is_draft:
+        remove_from_index(KIND_PAGE, instance.pk)
+
+
+def reindex_subtree(node_id):
+    """
+    Update the documents (with the url) of all pages in the subtree after the commit.
+    Pages that are not published anymore after a move are removed.
+    """
+    def update():
+        try:
+            root_node = TreeNode.objects.get(pk=node_id)
+            search_index = get_search_index()
+            draft_pages = Page.objects.drafts().filter(node__path__startswith=root_node.path)
+            for page_id in draft_pages.values_list("pk", flat=True):
+                search_index.remove(KIND_PAGE, page_id)
+            index_jobs(get_page_jobs(root_node=root_node))
+        except Exception as err:
+            log.exception("Search index update error: %s", err)
+
+    transaction.on_commit(update)
+
+
+def subtree_moved(sender, instance, **kwargs):
+    """
+    page_moved signal handler
+    """
+    if settings.PYLUCID_SEARCH_INDEX_PATH:
+        reindex_subtree(instance.node_id)
+
+
+def page_operation(sender, operation, obj=None, **kwargs):
+    """
+    The move in the django CMS admin doesn't send page_moved, only this post_obj_operation.
+    """
+    if operation == MOVE_PAGE and obj is not None:
+        subtree_moved(sender, instance=obj)
+
+
+def blog_post_changed(post_id):
+    if settings.PYLUCID_SEARCH_INDEX_PATH:
+        # Remove all languages/sites: The post may be unpublished or a translation removed.
+        remove_from_index(KIND_BLOG_POST, post_id)
+        update_index([(KIND_BLOG_POST, post_id, None)])
+
+
+def blog_post_saved(sender, instance, **kwargs):
+    blog_post_changed(instance.pk)
+
+
+def blog_post_translation_saved(sender, instance, **kwargs):
+    blog_post_changed(instance.master_id)
+
+
+def blog_post_deleted(sender, instance, **kwargs):
+    if settings.PYLUCID_SEARCH_INDEX_PATH:
+        remove_from_index(KIND_BLOG_POST, instance.pk)
+
+
+def connect_signals():
+    post_publish.connect(page_published, sender=Page, dispatch_uid="pylucid_search_publish")
+    post_unpublish.connect(page_unpublished, sender=Page, dispatch_uid="pylucid_search_unpublish")
+    pre_delete.connect(page_deleted, sender=Page, dispatch_uid="pylucid_search_page_delete")
+    page_moved.connect(subtree_moved, sender=Page, dispatch_uid="pylucid_search_page_moved")
+    post_obj_operation.connect(page_operation, dispatch_uid="pylucid_search_page_operation")
+
+    if apps.is_installed("djangocms_blog"):
+        from djangocms_blog.models import Post
+
+        PostTranslation = Post._parler_meta.root_model
+        post_save.connect(blog_post_saved, sender=Post, dispatch_uid="pylucid_search_post")
+        post_save.connect(
+            blog_post_translation_saved, sender=PostTranslation, dispatch_uid="pylucid_search_post_translation"
+        )
+        post_delete.connect(blog_post_deleted, sender=Post, dispatch_uid="pylucid_search_post_delete")
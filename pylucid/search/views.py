@@ -0,0 +1,55 @@
+# coding: utf-8
+
+"""
+    PyLucid search views
+    ~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
+from django.http import Http404
+from django.utils.translation import get_language
+from django.views.generic import TemplateView
+
+# PyLucid
+from pylucid.search.index import get_search_index
+
+
+log = logging.getLogger(__name__)
+
+
+class SearchView(TemplateView):
+    template_name = "pylucid/search/search.html"
+
+    def get_context_data(self, **kwargs):
+        if not settings.PYLUCID_SEARCH_INDEX_PATH:
+            raise Http404("Search is not activated")
+
+        context = super().get_context_data(**kwargs)
+
+        query = self.request.GET.get("q", "").strip()
+        results = []
+        duration = None
+        if query:
+            start_time = time.monotonic()
+            results = get_search_index().search(
+                query,
+                language=get_language(),
+                site_id=get_current_site(self.request).pk,
+                limit=settings.PYLUCID_SEARCH_MAX_RESULTS,
+            )
+            duration = time.monotonic() - start_time
+            log.debug("Search %r: %i results in %.1fms", query, len(results), duration * 1000)
+
+        context.update({
+            "query": query,
+            "results": results,
+            "duration": duration,
+        })
+        return context
@@ -0,0 +1,233 @@
+# coding: utf-8
+
+"""
+    PyLucid sitemap
+    ~~~~~~~~~~~~~~~
+
+    Write a sitemap index and chunked sitemap files into MEDIA_ROOT,
+    so the web server can serve them as static files.
+
+    The published titles are streamed from the database and grouped
+    into chunks by their primary key range. The public Title pk is stable
+    (django-cms updates the public title on publish), so a changed page
+    only changes its own chunk. A fingerprint of every chunk is stored
+    in a manifest file and only changed chunks will be written again.
+
+    Generate the files with:
+        $ ./manage.py pylucid_sitemap
+
+    and announce the index in your robots.txt, e.g.:
+        Sitemap: https://www.example.com/media/sitemap/1/sitemap.xml
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import hashlib
+import itertools
+import json
+import logging
+import os
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import override as force_language
+
+from cms.models import Title
+from cms.utils.i18n import get_public_languages
+
+
+log = logging.getLogger(__name__)
+
+
+MANIFEST_FILENAME = "manifest.json"
+INDEX_FILENAME = "sitemap.xml"
+CHUNK_FILENAME = "sitemap-%i.xml"
+
+SITEMAP_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+SITEMAP_FOOTER = "</urlset>\n"
+
+INDEX_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+INDEX_FOOTER = "</sitemapindex>\n"
+
+
+SitemapStats = collections.namedtuple("SitemapStats", "site_id urls chunks written removed")
+
+
+def get_sitemap_path(site_id):
+    return Path(settings.MEDIA_ROOT, settings.PYLUCID_SITEMAP_DIRNAME, str(site_id))
+
+
+def get_sitemap_url(site, filename):
+    return "%s://%s%s%s/%i/%s" % (
+        settings.PYLUCID_SITEMAP_PROTOCOL, site.domain,
+        settings.MEDIA_URL, settings.PYLUCID_SITEMAP_DIRNAME, site.pk, filename
+    )
+
+
+def get_title_rows(site):
+    """
+    Stream all public titles that should be in the sitemap, ordered by pk.
+    Same filter as cms.sitemaps.CMSSitemap: no redirects and no login required.
+    """
+    now = timezone.now()
+    qs = Title.objects.public().filter(
+        Q(redirect="") | Q(redirect__isnull=True),
+        Q(page__publication_end_date__isnull=True) | Q(page__publication_end_date__gt=now),
+        published=True,
+        language__in=get_public_languages(site_id=site.pk),
+        page__login_required=False,
+        page__node__site=site,
+        page__publication_date__lte=now,
+    )
+    qs = qs.order_by("pk").values_list("pk", "language", "path", "page__is_home", "page__changed_date")
+    return qs.iterator()
+
+
+def get_location(site, language, path, is_home):
+    """
+    Same as cms.models.Page.get_absolute_url() but without any query.
+    """
+    with force_language(language):
+        if is_home:
+            url = reverse("pages-root")
+        else:
+            url = reverse("pages-details-by-slug", kwargs={"slug": path})
+    return "%s://%s%s" % (settings.PYLUCID_SITEMAP_PROTOCOL, site.domain, url)
+
+
+def get_fingerprint(rows):
+    """
+    >>> rows = [(1, "en", "foo", False, "2019-01-01")]
+    >>> get_fingerprint(rows) == get_fingerprint(rows)
+    True
+    >>> get_fingerprint(rows) == get_fingerprint([(1, "en", "bar", False, "2019-01-01")])
+    False
+    """
+    fingerprint = hashlib.sha1()
+    for row in rows:
+        fingerprint.update(repr(row).encode("utf-8"))
+    return fingerprint.hexdigest()
+
+
+def write_atomic(path, lines):
+    """
+    Write into a temp file and replace the old file,
+    so the web server never delivers a half-written file.
+    """
+    temp_path = path.with_name(".%s.tmp" % path.name)
+    with temp_path.open("w", encoding="utf-8") as f:
+        f.writelines(lines)
+    os.replace(str(temp_path), str(path))
+
+
+def iter_chunk_lines(site, rows):
+    yield SITEMAP_HEADER
+    for pk, language, path, is_home, changed_date in rows:
+        yield "<url><loc>%s</loc><lastmod>%s</lastmod></url>\n" % (
+            escape(get_location(site, language, path, is_home)),
+            changed_date.date().isoformat(),
+        )
+    yield SITEMAP_FOOTER
+
+
+def iter_index_lines(site, chunks):
+    yield INDEX_HEADER
+    for chunk_no in sorted(chunks):
+        yield "<sitemap><loc>%s</loc><lastmod>%s</lastmod></sitemap>\n" % (
+            escape(get_sitemap_url(site, CHUNK_FILENAME % chunk_no)),
+            chunks[chunk_no]["lastmod"],
+        )
+    yield INDEX_FOOTER
+
+
+def load_manifest(sitemap_path):
+    try:
+        with Path(sitemap_path, MANIFEST_FILENAME).open("r") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as err:
+        log.error("Ignore broken sitemap manifest: %s", err)
+        return {}
+    # JSON has only string keys:
+    return {int(chunk_no): chunk for chunk_no, chunk in manifest.get("chunks", {}).items()}
+
+
+def generate_sitemap(site, force=False):
+    """
+    Update the sitemap files of the given site.
+    Only chunks with changed titles will be written.
+    """
+    sitemap_path = get_sitemap_path(site.pk)
+    sitemap_path.mkdir(parents=True, exist_ok=True)
+
+    old_chunks = load_manifest(sitemap_path)
+    chunk_size = settings.PYLUCID_SITEMAP_CHUNK_SIZE
+
+    chunks = {}
+    url_count = 0
+    written = 0
+    rows = get_title_rows(site)
+    for chunk_no, chunk_rows in itertools.groupby(rows, key=lambda row: row[0] // chunk_size):
+        # Only one chunk is in memory:
+        chunk_rows = list(chunk_rows)
+        url_count += len(chunk_rows)
+
+        fingerprint = get_fingerprint(chunk_rows)
+        lastmod = max(row[4] for row in chunk_rows).date().isoformat()
+        chunks[chunk_no] = {"fingerprint": fingerprint, "lastmod": lastmod}
+
+        chunk_path = Path(sitemap_path, CHUNK_FILENAME % chunk_no)
+        old_chunk = old_chunks.get(chunk_no)
+        if force or old_chunk is None or old_chunk["fingerprint"] != fingerprint or not chunk_path.is_file():
+            log.debug("Write sitemap chunk %s with %i urls", chunk_path, len(chunk_rows))
+            write_atomic(chunk_path, iter_chunk_lines(site, chunk_rows))
+            written += 1
+
+    removed = 0
+    for chunk_no in set(old_chunks) - set(chunks):
+        chunk_path = Path(sitemap_path, CHUNK_FILENAME % chunk_no)
+        log.debug("Remove sitemap chunk %s", chunk_path)
+        try:
+            chunk_path.unlink()
+        except FileNotFoundError:
+            pass
+        removed += 1
+
+    if force or written or removed or chunks != old_chunks or not Path(sitemap_path, INDEX_FILENAME).is_file():
+        write_atomic(Path(sitemap_path, INDEX_FILENAME), iter_index_lines(site, chunks))
+        manifest = {"chunk_size": chunk_size, "chunks": chunks}
+        write_atomic(Path(sitemap_path, MANIFEST_FILENAME), [json.dumps(manifest, indent=4)])
+
+    stats = SitemapStats(site.pk, url_count, len(chunks), written, removed)
+    log.info("Sitemap for site %r: %s", site.domain, stats)
+    return stats
+
+
+def update_sitemap(sender, instance, **kwargs):
+    """
+    post_publish/post_unpublish/page_moved signal handler.
+    Activated via settings.PYLUCID_SITEMAP_UPDATE_ON_PUBLISH
+    """
+    site = instance.node.site
+
+    def update():
+        try:
+            generate_sitemap(site)
+        except Exception as err:
+            log.exception("Sitemap update error: %s", err)
+
+    transaction.on_commit(update)
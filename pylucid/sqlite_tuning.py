@@ -0,0 +1,213 @@
+# coding: utf-8
+
+"""
+    PyLucid SQLite tuning
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Set the settings.PYLUCID_SQLITE_PRAGMAS on every new SQLite connection,
+    e.g.: WAL journal mode, so readers don't block the writer (and vice versa),
+    a busy timeout instead of direct "database is locked" errors and mmap I/O.
+
+    Use it together with persistent connections ("CONN_MAX_AGE"),
+    otherwise the pragmas are executed on every request.
+
+    Compare the read throughput with:
+        $ ./manage.py pylucid_sqlite_benchmark
+
+    SQLite doesn't shrink the database file after deleting rows,
+    compact_database() rebuilds it with VACUUM (e.g.: after pylucid_history_prune).
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import itertools
+import logging
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import time
+
+from django.conf import settings
+
+
+log = logging.getLogger(__name__)
+
+
+# The SQLite defaults, used as baseline in the benchmark:
+DEFAULT_PRAGMAS = (
+    ("journal_mode", "DELETE"),
+    ("synchronous", "FULL"),
+    ("mmap_size", 0),
+)
+
+
+def is_memory_db(name):
+    """
+    >>> is_memory_db(":memory:")
+    True
+    >>> is_memory_db("file:memorydb_default?mode=memory&cache=shared")
+    True
+    >>> is_memory_db("/path/to/example_project.db")
+    False
+    """
+    name = str(name)
+    return name == ":memory:" or "mode=memory" in name
+
+
+def get_pragma_statements(pragmas):
+    """
+    >>> get_pragma_statements((("journal_mode", "WAL"), ("busy_timeout", 5000)))
+    ['PRAGMA journal_mode = WAL', 'PRAGMA busy_timeout = 5000']
+    """
+    if isinstance(pragmas, dict):
+        pragmas = pragmas.items()
+    return ["PRAGMA %s = %s" % (name, value) for name, value in pragmas]
+
+
+def apply_pragmas(cursor, pragmas):
+    for statement in get_pragma_statements(pragmas):
+        cursor.execute(statement)
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    connection_created signal handler.
+    Connected in pylucid.apps.PyLucidConfig.ready()
+    """
+    if connection.vendor != "sqlite" or is_memory_db(connection.settings_dict["NAME"]):
+        return
+
+    cursor = connection.connection.cursor()
+    try:
+        apply_pragmas(cursor, settings.PYLUCID_SQLITE_PRAGMAS)
+    finally:
+        cursor.close()
+    log.debug("SQLite pragmas set for %r", connection.alias)
+
+
+def compact_database(connection):
+    """
+    Rebuild the SQLite database file, so the free pages are given back.
+    Note: VACUUM needs temporary up to twice the database size on disk
+    and locks the database until it's done.
+    Returns the file size (before, after) or None if it's not a SQLite file database.
+    """
+    path = connection.settings_dict["NAME"]
+    if connection.vendor != "sqlite" or is_memory_db(path):
+        return None
+
+    size_before = os.path.getsize(path)
+    with connection.cursor() as cursor:
+        cursor.execute("VACUUM")
+        # Move the changes from the write-ahead log into the database file:
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size_after = os.path.getsize(path)
+
+    log.info("SQLite database %r compacted: %i -> %i bytes", str(path), size_before, size_after)
+    return size_before, size_after
+
+
+#_____________________________________________________________________________
+# Concurrency benchmark, used in: pylucid_sqlite_benchmark
+
+BenchmarkResult = collections.namedtuple("BenchmarkResult", "reads read_errors writes write_errors duration")
+
+
+def copy_database(connection, target_path):
+    """
+    Copy the database of the given Django connection for the benchmark,
+    so the production database will not be changed.
+    """
+    with connection.cursor() as cursor:
+        # Move all changes from the write-ahead log into the database file:
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    shutil.copyfile(connection.settings_dict["NAME"], str(target_path))
+
+
+def connect(path, pragmas):
+    # Python's sqlite3 uses a busy timeout of 5 sec. by default, just like Django
+    db = sqlite3.connect(str(path), isolation_level=None)
+    apply_pragmas(db, pragmas)
+    return db
+
+
+def setup_database(path, pragmas):
+    """
+    Set the persistent journal mode and create the table for the writers.
+    """
+    db = connect(path, pragmas)
+    db.execute("CREATE TABLE IF NOT EXISTS pylucid_benchmark (id INTEGER PRIMARY KEY, value TEXT)")
+    db.close()
+
+
+def run_reader(path, pragmas, queries, duration):
+    """
+    Execute the given (sql, params) queries in a loop. Returns (reads, errors)
+    """
+    db = connect(path, pragmas)
+    reads = errors = 0
+    end_time = time.monotonic() + duration
+    for sql, params in itertools.cycle(queries):
+        if time.monotonic() >= end_time:
+            break
+        try:
+            db.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as err:
+            log.debug("Read error: %s", err)
+            errors += 1
+        else:
+            reads += 1
+    db.close()
+    return reads, errors
+
+
+def run_writer(path, pragmas, duration):
+    """
+    Insert in small transactions, like a editor saving content. Returns (writes, errors)
+    """
+    db = connect(path, pragmas)
+    writes = errors = 0
+    end_time = time.monotonic() + duration
+    while time.monotonic() < end_time:
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("INSERT INTO pylucid_benchmark (value) VALUES (?)", ("x" * 1000,))
+            db.execute("COMMIT")
+        except sqlite3.OperationalError as err:
+            log.debug("Write error: %s", err)
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            errors += 1
+        else:
+            writes += 1
+    db.close()
+    return writes, errors
+
+
+def run_benchmark(path, pragmas, queries, workers, writers=1, duration=3):
+    """
+    Start the readers and writers in parallel processes and return the BenchmarkResult.
+    """
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers + writers) as pool:
+        start_time = time.monotonic()
+        read_results = [
+            pool.apply_async(run_reader, (path, pragmas, queries, duration)) for __ in range(workers)
+        ]
+        write_results = [
+            pool.apply_async(run_writer, (path, pragmas, duration)) for __ in range(writers)
+        ]
+        reads = [result.get() for result in read_results]
+        writes = [result.get() for result in write_results]
+        total_duration = time.monotonic() - start_time
+
+    return BenchmarkResult(
+        reads=sum(count for count, __ in reads),
+        read_errors=sum(errors for __, errors in reads),
+        writes=sum(count for count, __ in writes),
+        write_errors=sum(errors for __, errors in writes),
+        duration=total_duration,
+    )
@@ -0,0 +1,197 @@
+# coding: utf-8
+
+"""
+    PyLucid startup profiler
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Measure the time and memory of the startup phases of a page instance:
+    settings import, django.setup() with every app in INSTALLED_APPS
+    (app config import, models import and ready()), the CMS plugin and
+    menu pool and the URLconf loading.
+
+    The measurement must run in a fresh process, use:
+        $ ./manage.py pylucid_startup_profile
+
+    The phases can be written as "collapsed stacks", e.g. for:
+        https://github.com/brendangregg/FlameGraph
+        https://www.speedscope.app/
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import collections
+import contextlib
+import json
+import re
+import resource
+import sys
+import time
+from unittest import mock
+
+
+Phase = collections.namedtuple("Phase", "path duration rss")
+
+# ru_maxrss is in bytes on macOS and in kilobytes on Linux:
+RSS_FACTOR = 1 if sys.platform == "darwin" else 1024
+
+
+def get_max_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_FACTOR
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.phases = []
+        self.stack = []
+
+    @contextlib.contextmanager
+    def measure(self, *names):
+        self.stack += names
+        path = tuple(self.stack)
+        start_rss = get_max_rss()
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start_time
+            self.phases.append(Phase(path, duration, get_max_rss() - start_rss))
+            del self.stack[-len(names):]
+
+    @contextlib.contextmanager
+    def patch_app_configs(self):
+        """
+        Measure every app of the app registry population in django.setup()
+        """
+        from django.apps import AppConfig
+
+        origin_create = AppConfig.create.__func__
+        origin_import_models = AppConfig.import_models
+
+        def create(cls, entry):
+            with self.measure("app config", entry):
+                app_config = origin_create(cls, entry)
+
+            origin_ready = app_config.ready
+
+            def ready():
+                with self.measure("ready", app_config.label):
+                    origin_ready()
+
+            app_config.ready = ready
+            return app_config
+
+        def import_models(app_config):
+            with self.measure("models", app_config.label):
+                origin_import_models(app_config)
+
+        with mock.patch.object(AppConfig, "create", classmethod(create)):
+            with mock.patch.object(AppConfig, "import_models", import_models):
+                yield
+
+    def run(self):
+        import django
+        from django.conf import settings
+        from django.urls import get_resolver
+
+        with self.measure("startup"):
+            with self.measure("settings import"):
+                settings.INSTALLED_APPS
+
+            with self.measure("django.setup()"):
+                with self.patch_app_configs():
+                    django.setup()
+
+            with self.measure("cms plugin pool"):
+                from cms.plugin_pool import plugin_pool
+                plugin_pool.get_all_plugins()
+
+            with self.measure("menu pool"):
+                from menus.menu_pool import menu_pool
+                menu_pool.discover_menus()
+
+            with self.measure("URLconf"):
+                resolver = get_resolver()
+                resolver.url_patterns
+                resolver.reverse_dict
+
+        return self.phases
+
+
+def get_self_durations(phases):
+    """
+    The duration of the phases without the durations of the child phases.
+
+    >>> phases = [Phase(("a", "b"), 0.25, 0), Phase(("a",), 1.0, 0)]
+    >>> get_self_durations(phases)
+    {('a', 'b'): 0.25, ('a',): 0.75}
+    """
+    durations = collections.OrderedDict((phase.path, phase.duration) for phase in phases)
+    for phase in phases:
+        parent = phase.path[:-1]
+        if parent in durations:
+            durations[parent] -= phase.duration
+    return dict(durations)
+
+
+def iter_collapsed_stacks(phases):
+    """
+    Yields the phases in the "collapsed stack" format, with microseconds as count.
+
+    >>> phases = [Phase(("a", "b"), 0.25, 0), Phase(("a",), 1.0, 0)]
+    >>> list(iter_collapsed_stacks(phases))
+    ['a;b 250000', 'a 750000']
+    """
+    for path, duration in get_self_durations(phases).items():
+        count = int(round(duration * 1000000))
+        if count > 0:
+            yield "%s %i" % (";".join(name.replace(";", ":") for name in path), count)
+
+
+IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+\d+ \|( *)(\S+)$")
+
+
+def iter_import_stacks(importtime_output):
+    """
+    Convert the output of "python -X importtime" into collapsed stacks.
+    The self time in microseconds is used as count.
+    A module is printed after all modules that it imports.
+
+    >>> output = (
+    ...     "import time: self [us] | cumulative | imported package\\n"
+    ...     "import time:        10 |         10 |   b\\n"
+    ...     "import time:        20 |         30 | a\\n"
+    ... )
+    >>> list(iter_import_stacks(output))
+    ['a;b 10', 'a 20']
+    """
+    entries = []
+    for line in importtime_output.splitlines():
+        match = IMPORT_TIME_RE.match(line)
+        if match:
+            self_us, indent, name = match.groups()
+            entries.append((len(indent) // 2, name, int(self_us)))
+
+    # Walk backwards: The parent is listed after its children.
+    stack = []
+    lines = []
+    for level, name, self_us in reversed(entries):
+        del stack[level:]
+        stack.append(name)
+        if self_us:
+            lines.append("%s %i" % (";".join(stack), self_us))
+    return reversed(lines)
+
+
+def main():
+    """
+    Called in a new process by the pylucid_startup_profile command.
+    The phases are written into the given JSON file, because apps may print to stdout.
+    """
+    phases = StartupProfiler().run()
+    with open(sys.argv[1], "w") as f:
+        json.dump([phase._asdict() for phase in phases], f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# coding: utf-8
+
+"""
+    PyLucid taggit autosuggest
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Replacement for the taggit_autosuggest list view: The origin runs a
+    "name__icontains" query on the tag table for every keystroke. Here all
+    tag names are held per process in a sorted prefix index, the suggestions
+    are the most used tags that start with the query (case-insensitive).
+
+    The top suggestions of the short prefixes (one or two characters, the
+    ones that match many tags) are computed while building the index. Longer
+    prefixes match only a small range of the sorted names.
+
+    The index is rebuilt on the next lookup after a tag or tagged item was
+    changed: The handler tags_changed() starts a new index version in the
+    cache. All processes notice the change only with a cache backend that is
+    shared between them (not the LocMemCache), see: pylucid.checks
+    Connected in pylucid.apps.PyLucidConfig.ready()
+
+    The widget of taggit_autosuggest uses the url name 'taggit_autosuggest-list',
+    see: pylucid_page_instance.urls
+    The widget is only used in the admin, so the view is only for staff
+    users: The tags of unpublished posts should not be public.
+
+        $ ./manage.py pylucid_tag_suggest_benchmark
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import bisect
+import collections
+import heapq
+import json
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.views.decorators.cache import never_cache
+
+from taggit.models import ItemBase
+from taggit_autosuggest.views import MAX_SUGGESTIONS, TAG_MODELS
+from taggit_autosuggest.views import list_tags as origin_list_tags
+
+
+log = logging.getLogger(__name__)
+
+
+INDEX_VERSION_KEY = "pylucid_tag_index_version"
+
+# The top suggestions are precomputed for prefixes up to this length:
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+
+def normalize(name):
+    """
+    >>> normalize(" Straße ")
+    'strasse'
+    """
+    return name.strip().casefold()
+
+
+class TagIndex:
+    """
+    Tag names sorted by their normalized name, with the usage count.
+
+    >>> index = TagIndex([("Python", 5), ("PyLucid", 9), ("django", 7), ("pygments", 5), ("php", 1)])
+    >>> index.suggest("py")
+    ['PyLucid', 'pygments', 'Python']
+    >>> index.suggest("PYT")
+    ['Python']
+    >>> index.suggest("p", limit=2)
+    ['PyLucid', 'pygments']
+    >>> index.suggest("")
+    ['PyLucid', 'django', 'pygments', 'Python', 'php']
+    >>> index.suggest("x")
+    []
+    """
+    def __init__(self, tags, top_count=MAX_SUGGESTIONS):
+        entries = sorted((normalize(name), name, count) for name, count in tags)
+        self.keys = [key for key, name, count in entries]
+        self.names = [name for key, name, count in entries]
+        self.counts = [count for key, name, count in entries]
+        self.top_count = top_count
+
+        # prefix -> names of the most used tags (same name order on equal counts)
+        self.top = {"": self.get_top(range(len(entries)), top_count)}
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            groups = collections.defaultdict(list)
+            for no, key in enumerate(self.keys):
+                if len(key) >= length:
+                    groups[key[:length]].append(no)
+            for prefix, numbers in groups.items():
+                self.top[prefix] = self.get_top(numbers, top_count)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_top(self, numbers, limit):
+        numbers = heapq.nlargest(limit, numbers, key=lambda no: (self.counts[no], -no))
+        return [self.names[no] for no in numbers]
+
+    def get_range(self, prefix):
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo=start)
+        return range(start, end)
+
+    def suggest(self, query, limit=MAX_SUGGESTIONS):
+        """
+        Returns the names of the most used tags that start with the query.
+        """
+        prefix = normalize(query)
+        if limit <= self.top_count and len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            return self.top.get(prefix, [])[:limit]
+        return self.get_top(self.get_range(prefix), limit)
+
+
+def get_usage_counts(tag_model):
+    """
+    Returns {tag pk: count} over all tagged item models of the tag model.
+    """
+    counts = collections.Counter()
+    for relation in tag_model._meta.related_objects:
+        if not issubclass(relation.related_model, ItemBase):
+            continue
+        attname = relation.field.attname
+        queryset = relation.related_model._base_manager.order_by().values_list(attname).annotate(Count("pk"))
+        counts.update(dict(queryset))
+    return counts
+
+
+def build_index(tag_model):
+    start_time = time.monotonic()
+    counts = get_usage_counts(tag_model)
+    tags = tag_model._base_manager.values_list("pk", "name")
+    index = TagIndex((name, counts[pk]) for pk, name in tags.iterator())
+    log.debug("Tag index for %s with %i tags built in %.1f ms", tag_model.__name__, len(index),
+        (time.monotonic() - start_time) * 1000)
+    return index
+
+
+def get_index_version():
+    version = cache.get(INDEX_VERSION_KEY)
+    if version is None:
+        version = bump_index_version()
+    return version
+
+
+def bump_index_version():
+    try:
+        return cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        # Not in cache: Start with a timestamp, so that a built index is never reused.
+        version = int(time.time() * 1000)
+        cache.set(INDEX_VERSION_KEY, version, None)
+        return version
+
+
+# tag model label -> (index version, TagIndex)
+_INDEXES = {}
+_lock = threading.Lock()
+
+
+def get_tag_index(tag_model):
+    """
+    Returns the index of the tag model and rebuild it, if the tags are changed.
+    """
+    label = tag_model._meta.label
+    version = get_index_version()
+    index_version, index = _INDEXES.get(label, (None, None))
+    if index_version != version:
+        with _lock:
+            index_version, index = _INDEXES.get(label, (None, None))
+            if index_version != version:
+                index = build_index(tag_model)
+                _INDEXES[label] = (version, index)
+    return index
+
+
+def tags_changed(**kwargs):
+    """
+    Signal handler for tags and tagged items.
+    Other processes should rebuild the index only with the committed data.
+    """
+    transaction.on_commit(bump_index_version)
+
+
+def get_tag_model(tagmodel=None):
+    if not tagmodel or tagmodel not in TAG_MODELS:
+        tagmodel = "default"
+    return apps.get_model(*TAG_MODELS[tagmodel])
+
+
+def connect_signals():
+    for app_label, model_name in TAG_MODELS.values():
+        tag_model = apps.get_model(app_label, model_name)
+        models = [tag_model] + [
+            relation.related_model for relation in tag_model._meta.related_objects
+            if issubclass(relation.related_model, ItemBase)
+        ]
+        for model in models:
+            for signal in (post_save, post_delete):
+                signal.connect(tags_changed, sender=model, dispatch_uid="pylucid_tag_suggest")
+
+
+# Not in the per-site cache: The suggestions should change with the tags.
+@never_cache
+@staff_member_required
+def list_tags(request, tagmodel=None):
+    """
+    Same JSON response as taggit_autosuggest.views.list_tags():
+    A list of objects with a `name` and a `value` property.
+    """
+    tag_model = get_tag_model(tagmodel)
+    if callable(getattr(tag_model, "request_filter", None)):
+        # The suggestions depend on the request: Use the origin database query.
+        return origin_list_tags(request, tagmodel)
+
+    try:
+        limit = min(int(request.GET.get("limit", MAX_SUGGESTIONS)), MAX_SUGGESTIONS)
+    except ValueError:
+        limit = MAX_SUGGESTIONS
+
+    names = get_tag_index(tag_model).suggest(request.GET.get("q", ""), max(limit, 0))
+    data = [{"name": name, "value": name} for name in names]
+    return HttpResponse(json.dumps(data), content_type="application/json")
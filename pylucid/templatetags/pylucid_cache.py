@@ -0,0 +1,73 @@
+# coding: utf-8
+
+"""
+    PyLucid fragment cache template tag
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Like the Django {% cache %} tag, but the sekizai contributions of the
+    fragment are replayed on a cache hit, see: pylucid.fragment_cache
+
+    e.g.:
+        {% load pylucid_cache %}
+        {% pylucid_cache 600 "footer" %}
+            {% include "pylucid/includes/bootstrap/footer.html" %}
+        {% endpylucid_cache %}
+
+    The key contains the "publish version" and the current language.
+    Add more variables to vary on, e.g.: {% pylucid_cache 600 "menu" request.path %}
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django import template
+from django.template import TemplateSyntaxError, VariableDoesNotExist
+
+# PyLucid
+from pylucid.fragment_cache import cached_fragment, get_cache_key
+
+
+register = template.Library()
+
+
+class PyLucidCacheNode(template.Node):
+    def __init__(self, nodelist, expire_time_var, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.expire_time_var = expire_time_var
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        try:
+            expire_time = self.expire_time_var.resolve(context)
+        except VariableDoesNotExist:
+            raise TemplateSyntaxError('"pylucid_cache" tag got an unknown variable: %r' % self.expire_time_var.var)
+        if expire_time is not None:
+            try:
+                expire_time = int(expire_time)
+            except (ValueError, TypeError):
+                raise TemplateSyntaxError('"pylucid_cache" tag got a non-integer timeout value: %r' % expire_time)
+
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        cache_key = get_cache_key(self.fragment_name, vary_on)
+        return cached_fragment(context, cache_key, lambda: self.nodelist.render(context), expire_time)
+
+
+@register.tag("pylucid_cache")
+def do_pylucid_cache(parser, token):
+    """
+    {% pylucid_cache [expire_time] [fragment_name] [var1] [var2] ... %}
+        .. some expensive processing, also with {% addtoblock %} ..
+    {% endpylucid_cache %}
+    """
+    nodelist = parser.parse(("endpylucid_cache",))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise TemplateSyntaxError("'%r' tag requires at least 2 arguments." % tokens[0])
+    return PyLucidCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2].strip("\"'"),  # fragment_name can't be a variable.
+        [parser.compile_filter(token) for token in tokens[3:]],
+    )
@@ -0,0 +1,73 @@
+# coding: utf-8
+
+"""
+    PyLucid edge side include template tags
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    see: pylucid.esi
+
+    e.g.:
+        {% load pylucid_esi %}
+        {% pylucid_toolbar %}
+        {% pylucid_esi "messages" %}
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django import template
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.template import TemplateSyntaxError
+from django.utils.safestring import mark_safe
+
+from cms.templatetags.cms_tags import CMSToolbar
+
+# PyLucid
+from pylucid.esi import TOOLBAR_FRAGMENT, disable_page_cache, render_esi_include
+
+
+register = template.Library()
+
+
+def is_esi(context):
+    request = context.get("request")
+    return request is not None and getattr(request, "pylucid_esi", False)
+
+
+@register.simple_tag(takes_context=True)
+def pylucid_esi(context, name):
+    """
+    Render a fragment from settings.PYLUCID_ESI_FRAGMENTS inline or as <esi:include>
+    """
+    try:
+        template_name = settings.PYLUCID_ESI_FRAGMENTS[name]
+    except KeyError:
+        raise TemplateSyntaxError("Unknown ESI fragment %r" % name)
+
+    request = context.get("request")
+    if is_esi(context):
+        return mark_safe(render_esi_include(name, request))
+
+    if request is not None and len(get_messages(request)):
+        # The next visitor should not get the messages from the page cache
+        disable_page_cache(request)
+
+    return context.template.engine.get_template(template_name).render(context)
+
+
+class PyLucidToolbar(CMSToolbar):
+    """
+    The same as {% cms_toolbar %}, but the toolbar is a <esi:include> in ESI mode.
+    """
+    name = "pylucid_toolbar"
+
+    def render_tag(self, context, name, nodelist):
+        if not is_esi(context):
+            return super().render_tag(context, name, nodelist)
+
+        esi_include = render_esi_include(TOOLBAR_FRAGMENT, context["request"])
+        return "%s\n%s" % (esi_include, nodelist.render(context))
+
+
+register.tag(PyLucidToolbar)
@@ -0,0 +1,38 @@
+# coding: utf-8
+
+"""
+    PyLucid image template tags
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    e.g.:
+        {% load pylucid_images %}
+        {% image_variants image max_width=640 as variants %}
+        <picture>
+            {% for source in variants.sources %}
+                <source type="{{ source.mime_type }}" srcset="{{ source.srcset }}" sizes="{{ variants.sizes }}">
+            {% endfor %}
+            <img src="..." srcset="{{ variants.srcset }}" sizes="{{ variants.sizes }}">
+        </picture>
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django import template
+
+# PyLucid
+from pylucid.image_variants import get_image_variants
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_variants(image, max_width=None):
+    """
+    Returns the existing responsive variants of a filer image.
+    see: pylucid.image_variants.get_image_variants()
+    """
+    if not image:
+        return None
+    return get_image_variants(image, max_width=max_width)
@@ -0,0 +1,67 @@
+# coding: utf-8
+
+"""
+    PyLucid placeholder template tags
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The same as the django CMS {% placeholder %} tag, but cached
+    for anonymous users, see: pylucid.placeholder_cache
+
+    e.g.:
+        {% load pylucid_placeholders %}
+        {% pylucid_placeholder content %}
+        {% pylucid_placeholder sidebar or %}<p>Default content</p>{% endpylucid_placeholder %}
+
+    Placeholders with "inherit" are never cached.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django import template
+
+from classytags.arguments import Argument, MultiValueArgument
+from cms.templatetags.cms_tags import Placeholder, PlaceholderOptions
+from cms.toolbar.utils import get_toolbar_from_request
+
+# PyLucid
+from pylucid.placeholder_cache import is_cacheable, render_cached
+
+
+register = template.Library()
+
+
+class PyLucidPlaceholder(Placeholder):
+    """
+    Subclass of the django CMS Placeholder, so the placeholders are
+    found by the template scanning (e.g.: for the structure mode)
+    """
+    name = "pylucid_placeholder"
+    options = PlaceholderOptions(
+        Argument("name", resolve=False),
+        MultiValueArgument("extra_bits", required=False, resolve=False),
+        blocks=[
+            ("endpylucid_placeholder", "nodelist"),
+        ],
+    )
+
+    def render_tag(self, context, name, extra_bits, nodelist=None):
+        def render():
+            return super(PyLucidPlaceholder, self).render_tag(context, name, extra_bits, nodelist=nodelist)
+
+        request = context.get("request")
+        if "inherit" in extra_bits or not is_cacheable(request):
+            return render()
+
+        renderer = get_toolbar_from_request(request).get_content_renderer()
+        page = renderer.current_page
+        if page is None:
+            return render()
+
+        def get_placeholder():
+            return renderer._placeholders_by_page_cache.get(page.pk, {}).get(name)
+
+        return render_cached(context, page, name, renderer.request_language, render, get_placeholder)
+
+
+register.tag(PyLucidPlaceholder)
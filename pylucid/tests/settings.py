@@ -24,3 +24,12 @@ CACHES['default']= {
     'LOCATION': 'default-cache',
     'TIMEOUT': 60 * 60 * 24, # 24 hours
 }
+# Only one process in tests:
+SILENCED_SYSTEM_CHECKS = ["pylucid.W001"]
+
+# Tests use a temporary search index, see: pylucid/tests/test_search.py
+PYLUCID_SEARCH_INDEX_PATH = None
+
+# The worker threads would not see the test transactions,
+# the tests connect the handler themselves, see: pylucid/tests/test_thumbnails.py
+PYLUCID_THUMBNAIL_PREGENERATE = False
@@ -0,0 +1,159 @@
+# coding: utf-8
+
+"""
+    PyLucid djangocms_blog views tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import datetime
+import re
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import override_settings
+from django.utils import timezone
+from django.utils.cache import patch_response_headers, patch_vary_headers
+
+from cms.utils.apphook_reload import reload_urlconf
+from djangocms_blog.cms_appconfig import BlogConfig
+from djangocms_blog.cms_apps import BlogApp
+from djangocms_blog.models import BlogCategory, Post
+
+# PyLucid
+from pylucid import blog_views
+from pylucid.tests.test_utils.test_cases import CmsPageTestCase
+
+
+# Without the per-site cache of django.middleware.cache.UpdateCacheMiddleware:
+@override_settings(CACHE_MIDDLEWARE_SECONDS=0)
+class BlogViewsTest(CmsPageTestCase):
+    def setUp(self):
+        super().setUp()
+        # ...but only once per process:
+        BlogApp.setup()
+        reload_urlconf()
+
+        self.config = config = BlogConfig.objects.get(namespace="Blog")
+        config.app_data.config.paginate_by = 2
+        config.save()
+
+        now = timezone.now()
+        self.posts = [
+            Post.objects.language("en").create(
+                app_config=config, title="Post %i" % no, slug="post-%i" % no,
+                publish=True, date_published=now - datetime.timedelta(days=no)
+            )
+            for no in range(5)
+        ]
+
+    def get_titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode("utf-8")
+        titles = re.findall(r"Post \d", content)
+        links = dict(
+            (rel, link.replace("&amp;", "&"))
+            for link, rel in re.findall(r'<a href="(\?[^"]+)" rel="(prev|next)"', content)
+        )
+        return sorted(set(titles)), links
+
+    def test_keyset_pagination(self):
+        titles, links = self.get_titles("/en/blog/")
+        self.assertEqual(titles, ["Post 0", "Post 1"])
+        self.assertEqual(list(links), ["next"])
+
+        titles, links = self.get_titles("/en/blog/" + links["next"])
+        self.assertEqual(titles, ["Post 2", "Post 3"])
+        self.assertEqual(sorted(links), ["next", "prev"])
+        prev_link = links["prev"]
+
+        titles, links = self.get_titles("/en/blog/" + links["next"])
+        self.assertEqual(titles, ["Post 4"])
+        self.assertEqual(list(links), ["prev"])
+
+        titles, links = self.get_titles("/en/blog/" + prev_link)
+        self.assertEqual(titles, ["Post 0", "Post 1"])
+        self.assertEqual(list(links), ["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/en/blog/?before=foo")
+        self.assertEqual(response.status_code, 404)
+
+    @mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func())
+    def test_list_cache(self, on_commit):
+        self.get_titles("/en/blog/")
+        with mock.patch.object(blog_views, "get_keyset_page") as get_keyset_page:
+            titles, links = self.get_titles("/en/blog/?utm_source=test")
+            self.assertFalse(get_keyset_page.called)
+        self.assertEqual(titles, ["Post 0", "Post 1"])
+
+        # A changed post starts a new publish version:
+        post = self.posts[1]
+        post.set_current_language("en")
+        post.title = "Post 9"
+        post.save()
+        titles, links = self.get_titles("/en/blog/")
+        self.assertEqual(titles, ["Post 0", "Post 9"])
+
+    def test_cached_headers(self):
+        response = HttpResponse("<p>Post 0</p>", content_type="text/html; charset=utf-8")
+        response["Content-Language"] = "en"
+        patch_vary_headers(response, ["Accept-Language", "Cookie"])
+        patch_response_headers(response, cache_timeout=60)
+        blog_views.store_response("pylucid_test_blog", response, timeout=60)
+
+        cached_response = blog_views.get_cached_response("pylucid_test_blog")
+        self.assertEqual(cached_response.content, b"<p>Post 0</p>")
+        self.assertEqual(list(cached_response.items()), list(response.items()))
+        self.assertEqual(cached_response["Vary"], "Accept-Language, Cookie")
+        self.assertEqual(cached_response["Content-Language"], "en")
+
+    def test_template_names(self):
+        view = blog_views.PostListView()
+        view.config = self.config
+        view.namespace = self.config.namespace
+        template_names = view.get_template_names()
+        self.assertEqual(template_names, ["pylucid/blog/post_list.html", "djangocms_blog/post_list.html"])
+
+    @mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func())
+    def test_feed_cache(self, on_commit):
+        response = self.client.get("/en/blog/feed/")
+        self.assertContains(response, "Post 4")
+
+        # A update() doesn't send signals: The feed comes from the cache
+        PostTranslation = Post._parler_meta.root_model
+        PostTranslation.objects.filter(master=self.posts[4]).update(title="Post 8")
+        response = self.client.get("/en/blog/feed/")
+        self.assertContains(response, "Post 4")
+
+        self.posts[3].delete()
+        response = self.client.get("/en/blog/feed/")
+        self.assertContains(response, "Post 2")
+        self.assertNotContains(response, "Post 3")
+
+    @mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func())
+    def test_tags_and_categories(self, on_commit):
+        titles, links = self.get_titles("/en/blog/tag/pylucid/")
+        self.assertEqual(titles, [])
+        self.assertNotContains(self.client.get("/en/blog/tag/pylucid/feed/"), "Post 2")
+
+        # The tags and categories are saved after the post, e.g. in the admin:
+        self.posts[2].tags.add("pylucid")
+        titles, links = self.get_titles("/en/blog/tag/pylucid/")
+        self.assertEqual(titles, ["Post 2"])
+        self.assertContains(self.client.get("/en/blog/tag/pylucid/feed/"), "Post 2")
+
+        category = BlogCategory.objects.language("en").create(app_config=self.config, name="News", slug="news")
+        titles, links = self.get_titles("/en/blog/category/news/")
+        self.assertEqual(titles, [])
+
+        self.posts[3].categories.add(category)
+        titles, links = self.get_titles("/en/blog/category/news/")
+        self.assertEqual(titles, ["Post 3"])
+
+        self.posts[2].tags.remove("pylucid")
+        titles, links = self.get_titles("/en/blog/tag/pylucid/")
+        self.assertEqual(titles, [])
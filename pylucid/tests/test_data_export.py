@@ -0,0 +1,66 @@
+# coding: utf-8
+
+"""
+    PyLucid data export tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import gzip
+import json
+
+from django.contrib.auth.models import Group, User
+from django.core import serializers
+from django.test import TestCase
+
+# PyLucid
+from pylucid.data_export import FORMAT_NDJSON, iter_json, streaming_export_response
+
+
+class DataExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        groups = [Group.objects.create(name="group %i" % no) for no in range(3)]
+        for no in range(10):
+            user = User.objects.create(username="user%i" % no)
+            user.groups.set(groups[:no % 4])
+
+    def test_same_as_json_serializer(self):
+        queryset = User.objects.order_by("pk")
+        expected = serializers.serialize("json", queryset, indent=4)
+        content = "".join(iter_json(queryset, chunk_size=3))
+        self.assertEqual(json.loads(content), json.loads(expected))
+
+    def test_constant_queries(self):
+        # 4 chunks: one query to fetch the users, and per chunk two for the m2m prefetching
+        with self.assertNumQueries(1 + 4 * 2):
+            content = "".join(iter_json(User.objects.all(), chunk_size=3))
+        self.assertEqual(len(json.loads(content)), 10)
+
+    def test_ndjson_gzip_response(self):
+        response = streaming_export_response(User.objects.all(), FORMAT_NDJSON, compress=True)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="auth.user.ndjson.gz"')
+
+        lines = gzip.decompress(b"".join(response.streaming_content)).decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 10)
+        dump_object = json.loads(lines[3])
+        self.assertEqual(dump_object["model"], "auth.user")
+        self.assertEqual(dump_object["fields"]["username"], "user3")
+        self.assertEqual(len(dump_object["fields"]["groups"]), 3)
+
+    def test_admin_action(self):
+        superuser = User.objects.create_superuser("admin", "admin@example.org", "password")
+        self.client.force_login(superuser)
+        response = self.client.post("/en/admin/auth/group/", {
+            "action": "export_selected_as_json",
+            "_selected_action": Group.objects.values_list("pk", flat=True),
+        })
+        self.assertEqual(response["Content-Type"], "application/json; charset=utf-8")
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertEqual(sorted(item["fields"]["name"] for item in json.loads(content)), [
+            "group 0", "group 1", "group 2"
+        ])
@@ -0,0 +1,100 @@
+# coding: utf-8
+
+"""
+    PyLucid data import tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from cms import api
+from cms.models import TreeNode
+
+# https://github.com/jedie/django-tools
+from django_tools.unittest_utils.stdout_redirect import StdoutStderrBuffer
+
+# PyLucid
+from pylucid.data_export import iter_dump_objects, iter_gzip, iter_json, iter_ndjson
+from pylucid.data_import import import_dump_objects
+
+
+class DataImportTest(TestCase):
+    def create_users(self):
+        groups = [Group.objects.create(name="group %i" % no) for no in range(3)]
+        for no in range(10):
+            user = User.objects.create(username="user%i" % no)
+            user.groups.set(groups[:no % 4])
+
+    def export_users(self):
+        groups = "".join(iter_json(Group.objects.all()))
+        users = "".join(iter_ndjson(User.objects.all()))
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        return groups, users
+
+    def assert_users(self):
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(User.objects.count(), 10)
+        self.assertEqual(
+            sorted(User.objects.get(username="user3").groups.values_list("name", flat=True)),
+            ["group 0", "group 1", "group 2"]
+        )
+
+    def test_import_dump_objects(self):
+        self.create_users()
+        dump_objects = list(iter_dump_objects(Group.objects.all())) + list(iter_dump_objects(User.objects.all()))
+        User.objects.all().delete()
+        Group.objects.all().delete()
+
+        # One insert per batch:
+        with CaptureQueriesContext(connection) as queries:
+            stats = import_dump_objects(dump_objects, batch_size=3)
+        inserts = [query["sql"] for query in queries if query["sql"].startswith('INSERT INTO "auth_user"')]
+        self.assertEqual(len(inserts), 4)
+        self.assertEqual(stats.objects, 13)
+        self.assertEqual(stats.m2m, 13)
+        self.assert_users()
+
+    def test_command(self):
+        self.create_users()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_path = Path(temp_dir, "groups.json")
+            ndjson_gz_path = Path(temp_dir, "users.ndjson.gz")
+
+            groups, users = self.export_users()
+
+            json_path.write_text(groups)
+            ndjson_gz_path.write_bytes(b"".join(iter_gzip([users])))
+
+            with StdoutStderrBuffer() as buffer:
+                call_command("pylucid_import", str(json_path), str(ndjson_gz_path), "--dry-run")
+            self.assertIn("13 objects are valid.", buffer.get_output())
+            self.assertEqual(User.objects.count(), 0)
+
+            with StdoutStderrBuffer() as buffer:
+                call_command("pylucid_import", str(json_path), str(ndjson_gz_path))
+            self.assertIn("13 objects and 13 m2m relations of 3 models imported.", buffer.get_output())
+
+        self.assert_users()
+
+    def test_tree_path_renumber(self):
+        page = api.create_page(title="Page", template="pylucid/bootstrap/fullwidth.html", language="en")
+        node = page.node
+        dump_object = list(iter_dump_objects(TreeNode.objects.filter(pk=node.pk)))[0]
+        dump_object["pk"] = node.pk + 100
+
+        import_dump_objects([dump_object])
+        imported_node = TreeNode.objects.get(pk=node.pk + 100)
+        self.assertEqual(node.path, "0001")
+        self.assertEqual(imported_node.path, "0002")
+        self.assertEqual(imported_node.depth, 1)
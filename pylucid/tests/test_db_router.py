@@ -0,0 +1,92 @@
+# coding: utf-8
+
+"""
+    PyLucid database router tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sites.models import Site
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from cms.models import Page
+
+# PyLucid
+from pylucid.db_router import (
+    ReplicaRouter, connect_signals, is_pinned, record_write, reset_state, start_request, use_primary
+)
+from pylucid.middlewares import PinPrimaryMiddleware
+
+
+@override_settings(PYLUCID_DB_REPLICAS=("replica",))
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        reset_state()
+        connect_signals()
+        self.router = ReplicaRouter()
+
+    def tearDown(self):
+        for signal in (post_save, post_delete, m2m_changed):
+            signal.disconnect(record_write, dispatch_uid="pylucid_db_router")
+        reset_state()
+        super().tearDown()
+
+    def test_router(self):
+        self.assertEqual(self.router.db_for_read(Page), "replica")
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Page), "default")
+        self.assertEqual(self.router.db_for_read(Page), "replica")
+
+        # Outside of a request, reads after a write use the primary:
+        self.assertEqual(self.router.db_for_write(Page), "default")
+        self.assertEqual(self.router.db_for_read(Page), "default")
+
+        # In a request only the real writes:
+        start_request()
+        self.assertEqual(self.router.db_for_write(Page), "default")
+        self.assertEqual(self.router.db_for_read(Page), "replica")
+        Site.objects.create(domain="example.org", name="example.org")
+        self.assertEqual(self.router.db_for_read(Page), "default")
+
+        self.assertIs(self.router.allow_migrate("replica", "cms"), False)
+        self.assertIs(self.router.allow_migrate("default", "cms"), None)
+
+    def get_response(self, request, write=False):
+        requests = []
+
+        def get_response(request):
+            requests.append(self.router.db_for_read(Page))
+            # A routing call is no write:
+            self.router.db_for_write(Page)
+            if write:
+                Site.objects.create(domain="example.org", name="example.org")
+            return HttpResponse()
+
+        request.user = AnonymousUser()
+        response = PinPrimaryMiddleware(get_response)(request)
+        self.assertFalse(is_pinned())
+        return requests[0], response
+
+    def test_middleware(self):
+        factory = RequestFactory()
+
+        db, response = self.get_response(factory.get("/"))
+        self.assertEqual(db, "replica")
+        self.assertNotIn("pylucid_db_pin", response.cookies)
+
+        db, response = self.get_response(factory.post("/"), write=True)
+        self.assertEqual(db, "default")
+        self.assertEqual(response.cookies["pylucid_db_pin"]["max-age"], 10)
+
+        # The next request of the same client:
+        request = factory.get("/")
+        request.COOKIES["pylucid_db_pin"] = "1"
+        db, response = self.get_response(request)
+        self.assertEqual(db, "default")
+        self.assertNotIn("pylucid_db_pin", response.cookies)
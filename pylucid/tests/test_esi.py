@@ -0,0 +1,106 @@
+# coding: utf-8
+
+"""
+    PyLucid edge side include tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.messages import SUCCESS
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.test import RequestFactory, override_settings
+
+from cms import api
+
+# PyLucid
+from pylucid.checks import check_esi_page_cache
+from pylucid.tests.test_utils.test_cases import CmsPageTestCase
+
+
+ESI_HEADER = {"HTTP_SURROGATE_CAPABILITY": "varnish=ESI/1.0"}
+
+
+@override_settings(PYLUCID_ESI=True, CMS_PAGE_CACHE=False)
+class EsiTest(CmsPageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = api.create_page(
+            title="ESI", template="pylucid/bootstrap/fullwidth.html", language="en", slug="esi"
+        )
+        api.add_plugin(self.page.placeholders.get(slot="content"), "TextPlugin", "en", body="The content")
+        self.page.publish("en")
+
+    def get_page_content(self):
+        content = self.client.get("/en/esi/", **ESI_HEADER).content.decode("utf-8")
+        # Remove the timing information of django-processinfo:
+        return content.split("django-processinfo")[0]
+
+    def test_esi_page(self):
+        response = self.client.get("/en/esi/", **ESI_HEADER)
+        self.assertContains(response, "The content")
+        for name in ("toolbar", "messages", "user_link"):
+            self.assertContains(response, '<esi:include src="/en/esi/%s/?path=%%2Fen%%2Fesi%%2F" />' % name)
+        self.assertNotContains(response, "Log in")
+        self.assertEqual(response["Surrogate-Control"], 'content="ESI/1.0"')
+        self.assertIn("Surrogate-Capability", response["Vary"])
+
+    def test_without_proxy(self):
+        response = self.client.get("/en/esi/")
+        self.assertContains(response, "The content")
+        self.assertContains(response, "Log in")
+        self.assertNotContains(response, "<esi:include")
+        self.assertFalse(response.has_header("Surrogate-Control"))
+
+    def test_shared_page_for_editors(self):
+        anonymous_content = self.get_page_content()
+
+        self.client.force_login(get_user_model().objects.create_superuser("editor", "", "password"))
+        self.assertEqual(self.get_page_content(), anonymous_content)
+
+        response = self.client.get("/en/esi/toolbar/", {"path": "/en/esi/"})
+        self.assertContains(response, "cms-toolbar")
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        # Edit mode: The normal page with the toolbar
+        response = self.client.get("/en/esi/?edit", **ESI_HEADER)
+        self.assertNotContains(response, "<esi:include")
+        self.assertContains(response, "cms-toolbar")
+
+    def test_fragments(self):
+        response = self.client.get("/en/esi/user_link/", {"path": "/en/esi/"})
+        self.assertContains(response, "Log in")
+        self.assertContains(response, "?next=/en/esi/&amp;")
+
+        response = self.client.get("/en/esi/toolbar/", {"path": "/en/esi/"})
+        self.assertEqual(response.content, b"")
+
+        response = self.client.get("/en/esi/unknown/", {"path": "/en/esi/"})
+        self.assertEqual(response.status_code, 404)
+
+        # The proxy would drop the "Set-Cookie" of the CSRF token fragment:
+        response = self.client.get("/en/esi/csrf_token/", {"path": "/en/esi/"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_cache_check(self):
+        self.assertEqual(check_esi_page_cache(None), [])
+        with override_settings(CMS_PAGE_CACHE=True):
+            self.assertEqual([error.id for error in check_esi_page_cache(None)], ["pylucid.E001"])
+        with override_settings(CMS_PAGE_CACHE=True, PYLUCID_ESI=False):
+            self.assertEqual(check_esi_page_cache(None), [])
+
+    @override_settings(PYLUCID_ESI=False, CMS_PAGE_CACHE=True, CACHE_MIDDLEWARE_SECONDS=0)
+    def test_messages_not_in_page_cache(self):
+        # A message for the anonymous visitor A, e.g. from a form view:
+        storage = CookieStorage(RequestFactory().get("/"))
+        visitor_a = self.client_class()
+        visitor_a.cookies[storage.cookie_name] = storage._encode([Message(SUCCESS, "Message for visitor A")])
+        self.assertContains(visitor_a.get("/en/esi/"), "Message for visitor A")
+
+        visitor_b = self.client_class()
+        response = visitor_b.get("/en/esi/")
+        self.assertContains(response, "The content")
+        self.assertNotContains(response, "Message for visitor A")
@@ -0,0 +1,31 @@
+# coding: utf-8
+
+"""
+    PyLucid cmsplugin_filer_image plugin tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.test import SimpleTestCase
+
+from cms.plugin_pool import plugin_pool
+from cmsplugin_filer_image.models import FilerImage
+
+# PyLucid
+from pylucid.filer_image import FilerImagePlugin
+
+
+class FilerImagePluginTest(SimpleTestCase):
+    def get_template_name(self, style):
+        plugin = plugin_pool.get_plugin("FilerImagePlugin")()
+        return plugin.get_render_template({}, FilerImage(style=style), None).template.name
+
+    def test_replaced(self):
+        self.assertIs(plugin_pool.get_plugin("FilerImagePlugin"), FilerImagePlugin)
+
+    def test_responsive_template(self):
+        self.assertEqual(self.get_template_name(""), "cmsplugin_filer_image/plugins/image/responsive.html")
+        self.assertEqual(self.get_template_name("default"), "cmsplugin_filer_image/plugins/image/responsive.html")
+        self.assertEqual(self.get_template_name("unknown"), "cmsplugin_filer_image/plugins/image/responsive.html")
@@ -0,0 +1,59 @@
+# coding: utf-8
+
+"""
+    PyLucid fragment cache tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.core.cache import cache
+from django.template import Template
+from django.test import SimpleTestCase
+
+from sekizai.context import SekizaiContext
+
+# PyLucid
+from pylucid.page_resolver import bump_publish_version
+
+
+TEMPLATE = Template(
+    '{% load sekizai_tags pylucid_cache %}'
+    '{% if in_page %}{% addtoblock "js" %}<script src="/page.js"></script>{% endaddtoblock %}{% endif %}'
+    '{% pylucid_cache 60 "test" %}'
+        '{% addtoblock "js" %}<script src="/page.js"></script>{% endaddtoblock %}'
+        '{% addtoblock "css" %}<link href="/fragment.css">{% endaddtoblock %}'
+        '<p>{{ value }}</p>'
+    '{% endpylucid_cache %}'
+    '|{% render_block "css" %}|{% render_block "js" %}'
+)
+
+
+class FragmentCacheTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def render(self, **context):
+        return TEMPLATE.render(SekizaiContext(context))
+
+    def test_replay(self):
+        # The script is already in the page: It must be recorded for the fragment, too.
+        self.assertEqual(
+            self.render(value="first", in_page=True),
+            '<p>first</p>|<link href="/fragment.css">\n|<script src="/page.js"></script>\n'
+        )
+        self.assertEqual(
+            self.render(value="second", in_page=False),
+            '<p>first</p>|<link href="/fragment.css">\n|<script src="/page.js"></script>\n'
+        )
+
+    def test_publish_version(self):
+        self.assertIn("<p>first</p>", self.render(value="first"))
+        bump_publish_version()
+        self.assertIn("<p>second</p>", self.render(value="second"))
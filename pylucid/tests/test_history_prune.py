@@ -0,0 +1,75 @@
+# coding: utf-8
+
+"""
+    PyLucid djangocms_history pruning tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from cms.models import Placeholder
+from djangocms_history.models import PlaceholderAction, PlaceholderOperation
+
+# PyLucid
+from pylucid.history_prune import prune_history
+
+
+class HistoryPruneTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create(username="editor")
+        self.placeholder = Placeholder.objects.create(slot="content")
+
+        # Page "a": three old and two new operations, page "b": one old operation
+        self.old_a = [self.create_operation("/en/a/", days_ago=60 + no) for no in range(3)]
+        self.new_a = [self.create_operation("/en/a/", days_ago=no) for no in range(2)]
+        self.old_b = self.create_operation("/en/b/", days_ago=90)
+
+    def create_operation(self, origin, days_ago):
+        operation = PlaceholderOperation.objects.create(
+            operation_type="add-plugin", token="token", origin=origin, language="en",
+            user=self.user, user_session_key="session", site=Site.objects.get_current(),
+        )
+        operation.create_action("add", "en", self.placeholder)
+        date_created = timezone.now() - datetime.timedelta(days=days_ago)
+        PlaceholderOperation.objects.filter(pk=operation.pk).update(date_created=date_created)
+        return operation
+
+    def assert_operations(self, operations):
+        self.assertEqual(
+            sorted(PlaceholderOperation.objects.values_list("pk", flat=True)),
+            sorted(operation.pk for operation in operations)
+        )
+
+    def test_keep_count_and_days(self):
+        self.assertEqual(prune_history(keep_count=2, keep_days=30, batch_size=2), (3, 3))
+        self.assert_operations(self.new_a + [self.old_b])
+        self.assertEqual(PlaceholderAction.objects.count(), 3)
+
+    def test_keep_days(self):
+        self.assertEqual(prune_history(keep_days=30), (4, 4))
+        self.assert_operations(self.new_a)
+
+    def test_keep_count(self):
+        self.assertEqual(prune_history(keep_count=1), (4, 4))
+        self.assert_operations([self.new_a[0], self.old_b])
+
+    def test_dry_run(self):
+        self.assertEqual(prune_history(keep_count=2, keep_days=30, dry_run=True), (3, 3))
+        self.assertEqual(PlaceholderOperation.objects.count(), 6)
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command("pylucid_history_prune", "--keep", "2", "--days", "30", "--pause", "0", stdout=stdout)
+        self.assertIn("Deleted 3 operations with 3 actions in", stdout.getvalue())
+        self.assert_operations(self.new_a + [self.old_b])
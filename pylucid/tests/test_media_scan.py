@@ -0,0 +1,80 @@
+# coding: utf-8
+
+"""
+    PyLucid media scanner tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import io
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from filer.models import Image
+from PIL import Image as PILImage
+
+# PyLucid
+from pylucid.media_scan import MediaScanner, check_file
+from pylucid.tests.test_utils.test_cases import TempDirTestCase
+
+
+class MediaScanTest(TempDirTestCase):
+    def get_temp_settings(self, temp_path):
+        return {"MEDIA_ROOT": str(Path(temp_path, "media"))}
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = Path(self.temp_path, "media")
+        self.media_root.mkdir()
+        self.cache_path = Path(self.temp_path, "cache.json")
+
+    def create_image(self, filename):
+        data = io.BytesIO()
+        PILImage.new("RGB", (20, 10), color="red").save(data, format="PNG")
+        upload = SimpleUploadedFile(filename, data.getvalue(), content_type="image/png")
+        return Image.objects.create(original_filename=filename, file=upload)
+
+    def scan(self):
+        return MediaScanner(cache_path=str(self.cache_path), workers=2).scan()
+
+    def test_scan(self):
+        good = self.create_image("good.png")
+        broken = self.create_image("broken.png")
+        missing = self.create_image("missing.png")
+
+        broken_path = Path(self.media_root, broken.file.name)
+        broken_path.write_bytes(broken_path.read_bytes()[:30])
+        Path(self.media_root, missing.file.name).unlink()
+        Path(self.media_root, "orphan.txt").write_text("foo")
+        Path(self.media_root, "filer_public_thumbnails").mkdir()
+        Path(self.media_root, "filer_public_thumbnails", "excluded.png").write_text("not a image")
+
+        report = self.scan()
+        self.assertEqual(report["stats"], {
+            "files": 3, "checked": 3, "cached": 0, "broken": 1, "missing": 1, "orphaned": 1,
+        })
+        self.assertEqual(report["broken"][0]["path"], broken.file.name)
+        self.assertEqual(report["broken"][0]["filer_ids"], [broken.pk])
+        self.assertEqual(report["missing"], [{"path": missing.file.name, "filer_ids": [missing.pk]}])
+        self.assertEqual(report["orphaned"], ["orphan.txt"])
+        self.assertNotIn(good.file.name, repr(report["broken"] + report["missing"]))
+
+        # Unchanged files are not opened again:
+        with mock.patch("pylucid.media_scan.check_file", wraps=check_file) as check_mock:
+            report = self.scan()
+        self.assertEqual(check_mock.call_count, 0)
+        self.assertEqual(report["stats"]["cached"], 3)
+        self.assertEqual(report["stats"]["broken"], 1)
+
+        # A changed file will be checked:
+        Path(self.media_root, "orphan.txt").write_text("")
+        report = self.scan()
+        self.assertEqual(report["stats"]["checked"], 1)
+        self.assertEqual(report["stats"]["broken"], 2)
+        self.assertEqual(report["broken"][1], {
+            "path": "orphan.txt", "size": 0, "error": "empty file", "filer_ids": [],
+        })
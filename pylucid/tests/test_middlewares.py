@@ -0,0 +1,112 @@
+# coding: utf-8
+
+"""
+    PyLucid middlewares tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.base import BaseHandler
+from django.test import override_settings
+
+from cms import api
+from djangocms_blog.cms_appconfig import BlogConfig
+
+# PyLucid
+from pylucid.tests.test_utils.test_cases import CmsPageTestCase
+
+
+# Test the view itself, without the page cache:
+@override_settings(CMS_PAGE_CACHE=False)
+class NonAtomicReadsMiddlewareTest(CmsPageTestCase):
+    def setUp(self):
+        super().setUp()
+        page = api.create_page(
+            title="Test page", template="pylucid/bootstrap/fullwidth.html", language="en", slug="test-page"
+        )
+        page.publish("en")
+
+    def request(self, method):
+        make_view_atomic = BaseHandler.make_view_atomic
+        with mock.patch.object(
+            BaseHandler, "make_view_atomic", autospec=True, side_effect=make_view_atomic
+        ) as make_view_atomic_mock:
+            with mock.patch("pylucid.middlewares.resolve_page", return_value=None):
+                response = getattr(self.client, method)("/en/test-page/")
+        return response, make_view_atomic_mock.call_count
+
+    def test_get(self):
+        response, atomic_count = self.request("get")
+        self.assertContains(response, "Test page")
+        self.assertEqual(atomic_count, 0)
+
+    def test_post(self):
+        response, atomic_count = self.request("post")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(atomic_count, 1)
+
+    @override_settings(PYLUCID_NON_ATOMIC_VIEWS=())
+    def test_deactivated(self):
+        response, atomic_count = self.request("get")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(atomic_count, 1)
+
+
+@override_settings(CMS_PAGE_CACHE=False)
+class ConditionalPageMiddlewareTest(CmsPageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = api.create_page(
+            title="Test page", template="pylucid/bootstrap/fullwidth.html", language="en", slug="test-page"
+        )
+        self.page.publish("en")
+
+    def test_not_modified(self):
+        response = self.client.get("/en/test-page/")
+        self.assertContains(response, "Test page")
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        with mock.patch("pylucid.middlewares.render_page") as render_mock:
+            response = self.client.get("/en/test-page/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+
+            response = self.client.get("/en/test-page/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+            self.assertEqual(response.status_code, 304)
+        render_mock.assert_not_called()
+
+    @mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func())
+    def test_changed(self, on_commit):
+        etag = self.client.get("/en/test-page/")["ETag"]
+
+        self.page.publish("en")
+        response = self.client.get("/en/test-page/", HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Test page")
+        self.assertNotEqual(response["ETag"], etag)
+
+        with override_settings(PYLUCID_TEMPLATE_VERSION="2"):
+            self.assertNotEqual(self.client.get("/en/test-page/")["ETag"], response["ETag"])
+
+    def test_not_for_users(self):
+        self.client.force_login(get_user_model().objects.create_user(username="user"))
+        response = self.client.get("/en/test-page/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_not_cacheable_plugins(self):
+        config = BlogConfig.objects.create(namespace="Latest")
+        placeholder = self.page.placeholders.get(slot="content")
+        api.add_plugin(placeholder, "BlogLatestEntriesPlugin", "en", app_config=config, latest_posts=5)
+        self.page.publish("en")
+
+        for __ in range(2):
+            response = self.client.get("/en/test-page/", HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+            self.assertContains(response, "Test page")
+            self.assertFalse(response.has_header("ETag"))
+            self.assertFalse(response.has_header("Last-Modified"))
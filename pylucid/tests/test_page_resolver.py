@@ -0,0 +1,144 @@
+# coding: utf-8
+
+"""
+    PyLucid page resolver tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import SimpleTestCase, override_settings
+
+from cms import api
+from cms.models import Title
+
+# PyLucid
+from pylucid.checks import check_shared_cache
+from pylucid.page_resolver import get_publish_version, page_changed
+from pylucid.tests.test_utils.test_cases import CmsPageTestCase
+
+
+class PageResolverTest(CmsPageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = api.create_page(
+            title="Only English", template="pylucid/bootstrap/fullwidth.html", language="en", slug="only-english"
+        )
+        api.add_plugin(self.page.placeholders.get(slot="content"), "TextPlugin", "en", body="The english content")
+        self.page.publish("en")
+
+    def test_translated(self):
+        response = self.client.get("/en/only-english/")
+        self.assertContains(response, "The english content")
+        self.assertEqual(response["Content-Language"], "en")
+        self.assertFalse(response.has_header("Link"))
+
+    def test_fallback_content(self):
+        response = self.client.get("/de/only-english/")
+        self.assertContains(response, "The english content")
+        self.assertEqual(response["Content-Language"], "en")
+        self.assertEqual(response["Link"], '<http://testserver/en/only-english/>; rel="canonical"')
+
+    @override_settings(PYLUCID_LANGUAGE_FALLBACK="redirect")
+    def test_fallback_redirect(self):
+        response = self.client.get("/de/only-english/")
+        self.assertRedirects(response, "/en/only-english/", fetch_redirect_response=False)
+
+        # The redirect target is cached:
+        with mock.patch("pylucid.page_resolver.compute_resolution") as compute_mock:
+            response = self.client.get("/de/only-english/")
+        compute_mock.assert_not_called()
+        self.assertRedirects(response, "/en/only-english/", fetch_redirect_response=False)
+
+    @override_settings(
+        ALLOWED_HOSTS=["first.example.com", "second.example.com"], CACHE_MIDDLEWARE_SECONDS=0, CMS_PAGE_CACHE=False
+    )
+    def test_canonical_url_per_host(self):
+        self.client.get("/de/only-english/", HTTP_HOST="first.example.com")
+        response = self.client.get("/de/only-english/", HTTP_HOST="second.example.com")
+        self.assertEqual(response["Link"], '<http://second.example.com/en/only-english/>; rel="canonical"')
+
+    @mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func())
+    def test_publish_version(self, on_commit):
+        self.client.get("/de/only-english/")
+        old_version = get_publish_version()
+
+        api.create_title("de", "Nur Deutsch", self.page, slug="nur-deutsch")
+        api.add_plugin(self.page.placeholders.get(slot="content"), "TextPlugin", "de", body="Der deutsche Inhalt")
+        self.page.publish("de")
+        self.assertGreater(get_publish_version(), old_version)
+
+        response = self.client.get("/de/nur-deutsch/")
+        self.assertContains(response, "Der deutsche Inhalt")
+        self.assertEqual(response["Content-Language"], "de")
+        self.assertFalse(response.has_header("Link"))
+
+    def test_publish_version_after_commit(self):
+        old_version = get_publish_version()
+        with mock.patch.object(transaction, "on_commit") as on_commit:
+            page_changed()
+            self.assertEqual(get_publish_version(), old_version)
+
+            callback, = on_commit.call_args[0]
+            callback()
+        self.assertGreater(get_publish_version(), old_version)
+
+    def test_not_found(self):
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            response = self.client.get("/en/does-not-exist/")
+        self.assertEqual(response.status_code, 404)
+        cache_keys = [call[0][0] for call in cache_set.call_args_list]
+        self.assertFalse([key for key in cache_keys if key.startswith("pylucid_page_resolver_")], cache_keys)
+
+    def get_with_and_without_resolver(self, path):
+        response = self.client.get(path)
+        with mock.patch("pylucid.middlewares.resolve_page", return_value=None):
+            origin_response = self.client.get(path)
+        return response, origin_response
+
+    def assert_same_redirect(self, path, url):
+        for response in self.get_with_and_without_resolver(path):
+            self.assertRedirects(response, url, fetch_redirect_response=False)
+
+    @override_settings(CMS_PAGE_CACHE=False)
+    def test_same_as_details(self):
+        # The page lookup is done only once (the page is not rendered from the cache):
+        self.client.get("/en/only-english/")
+        with mock.patch("cms.utils.page.get_page_from_path") as lookup_mock:
+            response = self.client.get("/en/only-english/")
+        lookup_mock.assert_not_called()
+        self.assertContains(response, "The english content")
+
+        # The slug doesn't match the language:
+        api.create_title("de", "Nur Englisch", self.page, slug="nur-englisch")
+        self.page.publish("de")
+        self.assert_same_redirect("/de/only-english/", "/de/nur-englisch/")
+
+        # Redirect of the page:
+        page = api.create_page(
+            title="Redirect", template="pylucid/bootstrap/fullwidth.html", language="en", slug="redirect",
+            redirect="/en/only-english/", published=True
+        )
+        self.assert_same_redirect("/en/redirect/", "/en/only-english/")
+
+        # No redirect to self:
+        Title.objects.filter(page__node=page.node).update(redirect="/en/redirect/")
+        cache.clear()
+        for response in self.get_with_and_without_resolver("/en/redirect/"):
+            self.assertEqual(response.status_code, 200)
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_local_cache(self):
+        warnings = check_shared_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ["pylucid.W001"])
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache"}})
+    def test_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
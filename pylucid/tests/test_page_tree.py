@@ -0,0 +1,187 @@
+# coding: utf-8
+
+"""
+    PyLucid bulk page tree tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from cms import api
+from cms.models import Page, TreeNode
+from cms.signals import urls_need_reloading
+
+# PyLucid
+from pylucid.page_resolver import get_publish_version
+from pylucid.page_tree import copy_subtree, move_subtree, publish_subtree
+from pylucid.search.index import get_search_index
+from pylucid.tests.test_utils.test_cases import CmsPageTestCase
+
+
+def create_page(title, parent=None, publish=True):
+    page = api.create_page(
+        title=title, template="pylucid/bootstrap/fullwidth.html", language="en",
+        slug=title.lower(), parent=parent
+    )
+    if publish:
+        page.publish("en")
+    return page.reload()
+
+
+@override_settings(CMS_PAGE_CACHE=False)
+@mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func())
+class PageTreeTest(CmsPageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page_a = create_page("A")
+        self.page_a1 = create_page("A1", parent=self.page_a)
+        self.page_a1a = create_page("A1a", parent=self.page_a1)
+        self.page_b = create_page("B")
+
+    def assert_paths(self, page, path):
+        page = page.reload()
+        self.assertEqual(page.get_path("en"), path)
+        self.assertEqual(page.publisher_public.get_path("en"), path)
+
+    def assert_valid_tree(self):
+        evil_chars, bad_steplen, orphans, wrong_depth, wrong_numchild = TreeNode.find_problems()
+        self.assertEqual((evil_chars, bad_steplen, orphans, wrong_depth, wrong_numchild), ([], [], [], [], []))
+
+    def test_move(self, on_commit_mock):
+        old_version = get_publish_version()
+        self.assertEqual(move_subtree(self.page_a1, self.page_b), 2)
+        self.assertGreater(get_publish_version(), old_version)
+
+        self.assert_valid_tree()
+        self.assertEqual(self.page_a1.reload().get_parent_page(), self.page_b)
+        self.assert_paths(self.page_a1, "b/a1")
+        self.assert_paths(self.page_a1a, "b/a1/a1a")
+
+        response = self.client.get("/en/b/a1/a1a/")
+        self.assertContains(response, "A1a")
+
+        # Back to the root:
+        move_subtree(self.page_a1.reload())
+        self.assert_valid_tree()
+        self.assertTrue(self.page_a1.reload().node.is_root())
+        self.assert_paths(self.page_a1a, "a1/a1a")
+
+    def test_move_updates_search_index(self, on_commit_mock):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with override_settings(PYLUCID_SEARCH_INDEX_PATH=str(Path(temp_dir, "index.sqlite3"))):
+                placeholder = self.page_a1a.placeholders.get(slot="content")
+                api.add_plugin(placeholder, "TextPlugin", "en", body="<p>The quick brown fox</p>")
+                self.page_a1a.publish("en")
+                search_index = get_search_index()
+                try:
+                    results = search_index.search("fox", language="en", site_id=1)
+                    self.assertEqual([result.url for result in results], ["/en/a/a1/a1a/"])
+
+                    move_subtree(self.page_a1, self.page_b)
+                    results = search_index.search("fox", language="en", site_id=1)
+                    self.assertEqual([result.url for result in results], ["/en/b/a1/a1a/"])
+                finally:
+                    search_index.close()
+
+    def test_move_reloads_apphooks(self, on_commit_mock):
+        receiver = mock.Mock()
+        urls_need_reloading.connect(receiver, weak=False, dispatch_uid="pylucid_test_page_tree")
+        try:
+            move_subtree(self.page_a1, self.page_b)
+            receiver.assert_not_called()
+
+            # An apphooked page in the moved subtree:
+            Page.objects.filter(node=self.page_a1a.node).update(application_urls="BlogApp")
+            move_subtree(self.page_a1.reload())
+            receiver.assert_called_once_with(signal=urls_need_reloading, sender=None)
+        finally:
+            urls_need_reloading.disconnect(dispatch_uid="pylucid_test_page_tree")
+
+    def test_move_errors(self, on_commit_mock):
+        with self.assertRaisesMessage(ValueError, "own subtree"):
+            move_subtree(self.page_a, self.page_a1a)
+
+        page_c = create_page("C", publish=False)
+        with self.assertRaisesMessage(ValueError, "not published in: en"):
+            move_subtree(self.page_a1, page_c)
+
+    def test_copy(self, on_commit_mock):
+        new_page = copy_subtree(self.page_a, self.page_b)
+        self.assert_valid_tree()
+        self.assertEqual(new_page.get_path("en"), "b/a")
+        self.assertEqual(
+            list(new_page.get_descendant_pages().values_list("title_set__path", flat=True)),
+            ["b/a/a1", "b/a/a1/a1a"]
+        )
+
+    def test_copy_contents(self, on_commit_mock):
+        placeholder = self.page_a1a.placeholders.get(slot="content")
+        api.add_plugin(placeholder, "TextPlugin", "en", body="<p>The quick brown fox</p>")
+
+        new_page = copy_subtree(self.page_a)
+        self.assert_valid_tree()
+        self.assertTrue(new_page.node.is_root())
+        self.assertEqual(new_page.get_path("en"), "a-copy-2")
+        self.assertFalse(new_page.is_published("en"))
+        new_page.publish("en")
+
+        new_page_a1a = Page.objects.get(publisher_is_draft=True, title_set__path="a-copy-2/a1/a1a")
+        self.assertEqual(
+            sorted(new_page_a1a.placeholders.values_list("slot", flat=True)),
+            sorted(self.page_a1a.placeholders.values_list("slot", flat=True)),
+        )
+        new_placeholder = new_page_a1a.placeholders.get(slot="content")
+        self.assertNotEqual(new_placeholder.pk, placeholder.pk)
+        plugin = new_placeholder.get_plugins("en").get()
+        self.assertEqual(plugin.get_bound_plugin().body, "<p>The quick brown fox</p>")
+
+        for copied_page in new_page.get_descendant_pages().order_by("node__path"):
+            copied_page.publish("en")
+        self.assertContains(self.client.get("/en/a-copy-2/a1/a1a/"), "The quick brown fox")
+
+    def test_copy_bulk_inserts(self, on_commit_mock):
+        def count_queries(page):
+            with CaptureQueriesContext(connection) as context:
+                copy_subtree(page, self.page_b)
+            return len(context.captured_queries)
+
+        # The target page has children after the first copy:
+        copy_subtree(self.page_a1a, self.page_b)
+
+        page_c = create_page("C", publish=False)
+        create_page("C1", parent=page_c, publish=False)
+        small_count = count_queries(page_c)
+
+        page_d = create_page("D", publish=False)
+        for number in range(5):
+            parent = create_page("D%i" % number, parent=page_d, publish=False)
+            create_page("D%ia" % number, parent=parent, publish=False)
+        self.assertEqual(count_queries(page_d), small_count)
+        self.assert_valid_tree()
+
+    def test_publish(self, on_commit_mock):
+        page_c = create_page("C", publish=False)
+        create_page("C1", parent=page_c, publish=False)
+        old_version = get_publish_version()
+
+        self.assertEqual(publish_subtree(page_c, ["en", "de"]), 2)
+        self.assertGreater(get_publish_version(), old_version)
+        self.assertContains(self.client.get("/en/c/c1/"), "C1")
+
+    def test_command(self, on_commit_mock):
+        stdout = io.StringIO()
+        call_command("pylucid_page_tree", "move", "a/a1", "--target", "b", stdout=stdout)
+        self.assertIn("Move 2 pages from 'a/a1'", stdout.getvalue())
+        self.assert_paths(self.page_a1a, "b/a1/a1a")
+        self.assertEqual(Page.objects.filter(publisher_is_draft=True, title_set__path="b/a1").count(), 1)
@@ -0,0 +1,118 @@
+# coding: utf-8
+
+"""
+    PyLucid parler translation prefetching tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import datetime
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from cms.models import Page
+from cms.utils.apphook_reload import reload_urlconf
+from djangocms_blog.cms_appconfig import BlogConfig
+from djangocms_blog.cms_apps import BlogApp
+from djangocms_blog.models import BlogCategory, Post
+from menus.menu_pool import menu_pool
+
+# PyLucid
+from pylucid.blog_menus import BlogCategoryMenu
+from pylucid.blog_views import optimize_posts
+from pylucid.parler_prefetch import prefetch_translations, with_translation_prefetch
+
+
+# parler caches every translation: With the database cache, that are queries, too.
+@override_settings(
+    CACHE_MIDDLEWARE_SECONDS=0,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "pylucid_test_cache"}},
+)
+class ParlerPrefetchTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        call_command("createcachetable")
+        reverse("pages-root")
+        BlogApp.setup()
+        reload_urlconf()
+        self.config = BlogConfig.objects.get(namespace="Blog")
+        self.config.app_data.config.menu_structure = "complete"
+        self.config.save()
+
+    def create_posts(self, count):
+        now = timezone.now()
+        for no in range(Post.objects.count(), count):
+            post = Post.objects.language("en").create(
+                app_config=self.config, title="Post %i" % no, slug="post-%i" % no,
+                publish=True, date_published=now - datetime.timedelta(days=no)
+            )
+            category = BlogCategory.objects.language("en").create(app_config=self.config, name="Category %i" % no)
+            post.categories.add(category)
+        cache.clear()
+
+    def count_queries(self, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return len(context.captured_queries)
+
+    def test_fallback(self):
+        self.create_posts(2)
+        post = Post.objects.get(translations__title="Post 1")
+        post.set_current_language("de")
+        post.title = "Beitrag 1"
+        post.save()
+        cache.clear()
+
+        with translation.override("de"):
+            posts = with_translation_prefetch(Post.objects.order_by("pk"))
+            with self.assertNumQueries(2):
+                titles = [post.title for post in posts]
+        self.assertEqual(titles, ["Post 0", "Beitrag 1"])
+
+    def test_related(self):
+        self.create_posts(2)
+        posts = list(Post.objects.order_by("pk").prefetch_related("categories"))
+        with self.assertNumQueries(2):
+            prefetch_translations(posts, ["de", "en"], related=["categories"])
+            names = [category.name for post in posts for category in post.categories.all()]
+        self.assertEqual(names, ["Category 0", "Category 1"])
+
+    def get_post_list(self):
+        with translation.override("de"):
+            return [
+                (post.title, post.get_absolute_url(), [category.name for category in post.categories.all()])
+                for post in optimize_posts(Post.objects.all())
+            ]
+
+    def get_menu_nodes(self):
+        menu = BlogCategoryMenu(renderer=None)
+        menu.instance = self.page
+        return menu.get_nodes(RequestFactory().get("/de/blog/"))
+
+    def test_constant_queries(self):
+        self.assertIs(menu_pool.menus["BlogCategoryMenu"], BlogCategoryMenu)
+        self.page = Page.objects.public().select_related("node__site").get(application_namespace="Blog")
+
+        self.create_posts(2)
+        self.assertEqual(len(self.get_menu_nodes()), 4)  # Fills the site and BlogConfig caches
+        cache.clear()
+        post_list_queries = self.count_queries(self.get_post_list)
+        cache.clear()
+        menu_queries = self.count_queries(self.get_menu_nodes)
+
+        self.create_posts(6)
+        self.assertEqual(self.count_queries(self.get_post_list), post_list_queries)
+        cache.clear()
+        self.assertEqual(self.count_queries(self.get_menu_nodes), menu_queries)
+        nodes = self.get_menu_nodes()
+        self.assertEqual(len(nodes), 12)
+        self.assertEqual(nodes[0].title, "Post 0")
+        self.assertEqual(nodes[0].parent_id, nodes[-6].id)
@@ -0,0 +1,90 @@
+# coding: utf-8
+
+"""
+    PyLucid placeholder cache tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.template import Template
+from django.test import RequestFactory, override_settings
+
+from cms import api
+from cms.templatetags.cms_tags import Placeholder
+from sekizai.context import SekizaiContext
+
+# PyLucid
+from pylucid.page_resolver import get_publish_version
+from pylucid.placeholder_cache import get_slot_version, render_cached
+from pylucid.tests.test_utils.test_cases import CmsPageTestCase
+
+
+@override_settings(CMS_PAGE_CACHE=False, CMS_PLACEHOLDER_CACHE=False)
+class PlaceholderCacheTest(CmsPageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = api.create_page(
+            title="Cached", template="pylucid/bootstrap/homepage.html", language="en", slug="cached"
+        )
+        api.add_plugin(self.page.placeholders.get(slot="content"), "TextPlugin", "en", body="The content")
+        self.page.publish("en")
+        self.public_page = self.page.get_public_object()
+
+    def test_cached(self):
+        response = self.client.get("/en/cached/")
+        self.assertContains(response, "The content")
+
+        with mock.patch.object(Placeholder, "render_tag") as render_mock:
+            response = self.client.get("/en/cached/")
+        render_mock.assert_not_called()
+        self.assertContains(response, "The content")
+
+    def test_plugin_changed(self):
+        self.client.get("/en/cached/")
+        publish_version = get_publish_version()
+        content_version = get_slot_version(self.public_page.pk, "content")
+        prefix_version = get_slot_version(self.public_page.pk, "prefix_content")
+
+        plugin = self.public_page.placeholders.get(slot="content").get_plugins("en")[0].get_bound_plugin()
+        plugin.body = "The new content"
+        with mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func()):
+            plugin.save()
+
+        self.assertEqual(get_publish_version(), publish_version)
+        self.assertGreater(get_slot_version(self.public_page.pk, "content"), content_version)
+        self.assertEqual(get_slot_version(self.public_page.pk, "prefix_content"), prefix_version)
+
+        response = self.client.get("/en/cached/")
+        self.assertContains(response, "The new content")
+
+    def test_not_cached_for_users(self):
+        self.client.force_login(get_user_model().objects.create_user(username="user"))
+        self.client.get("/en/cached/")
+        with mock.patch.object(Placeholder, "render_tag", return_value="Rendered") as render_mock:
+            self.client.get("/en/cached/")
+        render_mock.assert_called()
+
+    def test_sekizai_replay(self):
+        request = RequestFactory().get("/")
+        template = Template(
+            '{% load sekizai_tags %}{% addtoblock "js" %}<script src="/plugin.js"></script>{% endaddtoblock %}'
+            "The content"
+        )
+
+        context = SekizaiContext({"request": request})
+        content = render_cached(
+            context, self.public_page, "content", "en", lambda: template.render(context), lambda: None
+        )
+        self.assertEqual(content, "The content")
+
+        context = SekizaiContext({"request": request})
+        render_func = mock.Mock()
+        content = render_cached(context, self.public_page, "content", "en", render_func, lambda: None)
+        render_func.assert_not_called()
+        self.assertEqual(content, "The content")
+        self.assertEqual(list(context["SEKIZAI_CONTENT_HOLDER"]["js"]), ['<script src="/plugin.js"></script>'])
@@ -0,0 +1,198 @@
+# coding: utf-8
+
+"""
+    PyLucid batched plugin copy tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection, models
+from django.db.models.signals import post_save
+from django.test import override_settings
+from django.test.utils import isolate_apps
+
+from cms import api
+from cms.models import CMSPlugin
+from cms.plugin_base import CMSPluginBase
+from cms.plugin_pool import plugin_pool
+from djangocms_text_ckeditor.models import Text
+from djangocms_text_ckeditor.utils import plugin_to_tag
+
+# PyLucid
+from pylucid.page_tree import publish_pages, unpublish_pages
+from pylucid.plugin_copy import is_bulk_copyable
+from pylucid.tests.test_utils.test_cases import CmsPageTestCase
+
+
+def get_plugin_tree(page, language="en"):
+    plugins = CMSPlugin.objects.filter(
+        placeholder__page=page, language=language
+    ).order_by("path")
+    return [
+        (plugin.placeholder.slot, plugin.depth, plugin.position, plugin.numchild, plugin.plugin_type)
+        for plugin in plugins
+    ]
+
+
+def create_test_plugin_models():
+    """
+    Multi-level concrete inheritance: A row in BaseTestPluginModel and in InheritedTestPluginModel.
+    Registered only in an isolated app registry, not in the "pylucid" app.
+    """
+    class BaseTestPluginModel(CMSPlugin):
+        title = models.CharField(max_length=50)
+
+        class Meta:
+            app_label = "pylucid"
+
+    class InheritedTestPluginModel(BaseTestPluginModel):
+        text = models.CharField(max_length=50)
+
+        class Meta:
+            app_label = "pylucid"
+
+    return BaseTestPluginModel, InheritedTestPluginModel
+
+
+@override_settings(CMS_PAGE_CACHE=False, CMS_PLACEHOLDER_CACHE=False)
+@mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func())
+class PluginCopyTest(CmsPageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = api.create_page(
+            title="Bulk", template="pylucid/bootstrap/fullwidth.html", language="en", slug="bulk"
+        )
+        placeholder = self.page.placeholders.get(slot="content")
+        self.parent_text = api.add_plugin(placeholder, "TextPlugin", "en", body="<p>Parent text</p>")
+        self.child_text = api.add_plugin(
+            placeholder, "TextPlugin", "en", target=self.parent_text, body="<p>Child text</p>"
+        )
+        self.parent_text.body = "<p>Parent text</p>%s" % plugin_to_tag(self.child_text)
+        self.parent_text.save()
+        api.add_plugin(placeholder, "TextPlugin", "en", body="<p>Second text</p>")
+
+    def assert_valid_plugin_tree(self):
+        evil_chars, bad_steplen, orphans, wrong_depth, wrong_numchild = CMSPlugin.find_problems()
+        self.assertEqual((evil_chars, bad_steplen, orphans, wrong_depth, wrong_numchild), ([], [], [], [], []))
+
+    def test_publish(self, on_commit_mock):
+        published, plugins = publish_pages([self.page], ["en"])
+        self.assertEqual((published, plugins), (1, 3))
+        self.assert_valid_plugin_tree()
+
+        public_page = self.page.reload().publisher_public
+        self.assertEqual(get_plugin_tree(public_page), get_plugin_tree(self.page))
+
+        # The plugin tag in the parent text points to the copied child:
+        public_child = CMSPlugin.objects.get(placeholder__page=public_page, depth=2)
+        public_parent = public_child.parent.get_plugin_instance()[0]
+        self.assertIn('id="%i"' % public_child.pk, public_parent.body)
+        self.assertNotIn('id="%i"' % self.child_text.pk, public_parent.body)
+
+        response = self.client.get("/en/bulk/")
+        self.assertContains(response, "Parent text")
+        self.assertContains(response, "Child text")
+        self.assertContains(response, "Second text")
+
+        # Publish again: The old public plugins are replaced
+        self.assertEqual(publish_pages([self.page.reload()], ["en"]), (1, 3))
+        self.assert_valid_plugin_tree()
+        self.assertEqual(CMSPlugin.objects.filter(placeholder__page=public_page).count(), 3)
+
+    def test_post_save(self, on_commit_mock):
+        receiver = mock.Mock()
+        post_save.connect(receiver, sender=Text, weak=False, dispatch_uid="pylucid_test_plugin_copy")
+        try:
+            publish_pages([self.page], ["en"])
+        finally:
+            post_save.disconnect(sender=Text, dispatch_uid="pylucid_test_plugin_copy")
+
+        public_page = self.page.reload().publisher_public
+        public_plugins = CMSPlugin.objects.filter(placeholder__page=public_page)
+        created = [call[1]["instance"].pk for call in receiver.call_args_list if call[1]["created"]]
+        self.assertEqual(sorted(created), sorted(public_plugins.values_list("pk", flat=True)))
+
+    def test_unpublish(self, on_commit_mock):
+        publish_pages([self.page], ["en"])
+        self.assertEqual(self.client.get("/en/bulk/").status_code, 200)
+
+        self.assertEqual(unpublish_pages([self.page.reload()], ["en"]), 1)
+        self.assertEqual(self.client.get("/en/bulk/").status_code, 404)
+
+    def test_command(self, on_commit_mock):
+        stdout = io.StringIO()
+        call_command("pylucid_publish", "--page", "bulk", "--language", "en", "--progress", "1", stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn("Publish 1 pages in: en...", output)
+        self.assertIn("1/1 pages", output)
+        self.assertIn("Published 1 pages in", output)
+        self.assertIn("3 plugins copied", output)
+        self.assertTrue(self.page.reload().is_published("en"))
+
+
+@override_settings(CMS_PAGE_CACHE=False, CMS_PLACEHOLDER_CACHE=False)
+@mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func())
+class InheritedPluginCopyTest(CmsPageTestCase):
+    @classmethod
+    def setUpClass(cls):
+        with isolate_apps("pylucid") as test_apps:
+            # The parent model must be resolvable in the isolated registry:
+            test_apps.register_model("cms", CMSPlugin)
+            cls.base_model, cls.inherited_model = create_test_plugin_models()
+
+        cls.plugin = type("InheritedTestPlugin", (CMSPluginBase,), {
+            "model": cls.inherited_model,
+            "name": "Inherited test plugin",
+            "render_template": "pylucid/bootstrap/fullwidth.html",
+            "allow_children": True,
+        })
+        # Outside of the test transaction: The SQLite schema editor can't be used in atomic blocks
+        with connection.schema_editor() as schema_editor:
+            schema_editor.create_model(cls.base_model)
+            schema_editor.create_model(cls.inherited_model)
+        plugin_pool.register_plugin(cls.plugin)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        plugin_pool.unregister_plugin(cls.plugin)
+        with connection.schema_editor() as schema_editor:
+            schema_editor.delete_model(cls.inherited_model)
+            schema_editor.delete_model(cls.base_model)
+
+    def setUp(self):
+        super().setUp()
+        self.page = api.create_page(
+            title="Inherited", template="pylucid/bootstrap/fullwidth.html", language="en", slug="inherited"
+        )
+        placeholder = self.page.placeholders.get(slot="content")
+        inherited = api.add_plugin(placeholder, self.plugin, "en", title="The title", text="The text")
+        api.add_plugin(placeholder, "TextPlugin", "en", target=inherited, body="<p>Child text</p>")
+        api.add_plugin(placeholder, "TextPlugin", "en", body="<p>Second text</p>")
+
+    def test_is_bulk_copyable(self, on_commit_mock):
+        self.assertTrue(is_bulk_copyable(CMSPlugin))
+        self.assertTrue(is_bulk_copyable(Text))
+        self.assertTrue(is_bulk_copyable(self.base_model))
+        self.assertFalse(is_bulk_copyable(self.inherited_model))
+
+    def test_publish(self, on_commit_mock):
+        self.assertEqual(publish_pages([self.page], ["en"]), (1, 3))
+        evil_chars, bad_steplen, orphans, wrong_depth, wrong_numchild = CMSPlugin.find_problems()
+        self.assertEqual((evil_chars, bad_steplen, orphans, wrong_depth, wrong_numchild), ([], [], [], [], []))
+
+        public_page = self.page.reload().publisher_public
+        self.assertEqual(get_plugin_tree(public_page), get_plugin_tree(self.page))
+
+        public_plugin = self.inherited_model.objects.get(placeholder__page=public_page)
+        self.assertEqual((public_plugin.title, public_plugin.text), ("The title", "The text"))
+        self.assertEqual(
+            self.base_model.objects.filter(placeholder__page=public_page).get().pk, public_plugin.pk
+        )
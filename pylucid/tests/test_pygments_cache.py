@@ -0,0 +1,62 @@
+# coding: utf-8
+
+"""
+    PyLucid pygments cache tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from cms.plugin_pool import plugin_pool
+
+# PyLucid
+from pylucid import pygments_cache
+from pylucid.pygments_cache import highlight_code, preload_lexers
+
+
+class PygmentsCacheTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_highlight_code(self):
+        with mock.patch.object(pygments_cache, "highlight", wraps=pygments_cache.highlight) as highlight:
+            html1, css1 = highlight_code("print('Hello World!')", "python", "default", True)
+            html2, css2 = highlight_code("print('Hello World!')", "python", "default", True)
+
+        self.assertEqual(highlight.call_count, 1)
+        self.assertIn('<span class="nb">print</span>', html1)
+        self.assertEqual(html1, html2)
+        self.assertIn(".hll", css1)
+        self.assertEqual(css1, css2)
+
+    def test_cache_key(self):
+        with mock.patch.object(pygments_cache, "highlight", wraps=pygments_cache.highlight) as highlight:
+            highlight_code("print('Hello World!')", "python", "default", True)
+            highlight_code("print('Hello World!')", "python", "default", False)
+            highlight_code("print('Hello World!')", "python", "monokai", True)
+            highlight_code("print('Hello World!')", "pycon", "default", True)
+            highlight_code("print('Hello PyLucid!')", "python", "default", True)
+
+        self.assertEqual(highlight.call_count, 5)
+
+    def test_preload_lexers(self):
+        with self.assertLogs("pylucid.pygments_cache", level="DEBUG") as logs:
+            preload_lexers(["python", "doesnt-exists"])
+
+        self.assertIn("python", pygments_cache._LEXERS)
+        self.assertNotIn("doesnt-exists", pygments_cache._LEXERS)
+        self.assertIn("Pygments lexer 'python' preloaded.", logs.output[0])
+        self.assertIn("Can't preload pygments lexer 'doesnt-exists'", logs.output[1])
+
+    def test_plugin_registered(self):
+        from pylucid.cms_plugins import CMSPygmentsPlugin
+
+        plugin_pool.discover_plugins()
+        self.assertIs(plugin_pool.get_plugin("CMSPygmentsPlugin"), CMSPygmentsPlugin)
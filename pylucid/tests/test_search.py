@@ -0,0 +1,157 @@
+# coding: utf-8
+
+"""
+    PyLucid search tests
+    ~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from cms import api
+from cms.admin.pageadmin import PageAdmin
+from cms.models import Page
+from cms.operations import MOVE_PAGE
+from cms.signals import post_obj_operation
+
+# PyLucid
+from pylucid.search.documents import KIND_PAGE, get_page_jobs, render_job
+from pylucid.search.index import SearchIndex, get_search_index
+from pylucid.tests.test_utils.test_cases import CmsPageTestCase, TempDirTestCase
+
+
+def make_document(object_id, title, content, language="en", site_id=1):
+    return {
+        "kind": KIND_PAGE,
+        "object_id": object_id,
+        "language": language,
+        "site_id": site_id,
+        "url": "/%s/%i/" % (language, object_id),
+        "title": title,
+        "content": content,
+    }
+
+
+class SearchIndexTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.search_index = SearchIndex(str(Path(self.temp_dir.name, "index.sqlite3")))
+
+    def tearDown(self):
+        self.search_index.close()
+        self.temp_dir.cleanup()
+        super().tearDown()
+
+    def test_search(self):
+        self.search_index.update([
+            make_document(1, "Django", "PyLucid is a CMS based on Django."),
+            make_document(2, "PyLucid", "Welcome to the homepage."),
+            make_document(3, "PyLucid", "Willkommen", language="de"),
+            make_document(4, "PyLucid", "Other site", site_id=2),
+        ])
+        self.assertEqual(self.search_index.count(), 4)
+
+        results = self.search_index.search("pylucid", language="en", site_id=1)
+        # A match in the title is ranked higher:
+        self.assertEqual([result.object_id for result in results], [2, 1])
+        self.assertEqual(results[1].snippet_html(), "<strong>PyLucid</strong> is a CMS based on Django.")
+
+        # The last word is used as prefix:
+        results = self.search_index.search("based on Djan", language="en", site_id=1)
+        self.assertEqual([result.object_id for result in results], [1])
+
+        self.assertEqual(self.search_index.search("*", language="en", site_id=1), [])
+
+    def test_update_and_remove(self):
+        self.search_index.update([make_document(1, "Old", "old content")])
+        self.search_index.update([make_document(1, "New", "new content")])
+        self.assertEqual(self.search_index.count(), 1)
+        self.assertEqual(self.search_index.search("old", language="en", site_id=1), [])
+        self.assertEqual(len(self.search_index.search("new", language="en", site_id=1)), 1)
+
+        self.search_index.remove(KIND_PAGE, 1, language="de")
+        self.assertEqual(self.search_index.count(), 1)
+        self.search_index.remove(KIND_PAGE, 1)
+        self.assertEqual(self.search_index.count(), 0)
+        self.assertEqual(self.search_index.search("new", language="en", site_id=1), [])
+
+
+class SearchPagesTest(TempDirTestCase, CmsPageTestCase):
+    def get_temp_settings(self, temp_path):
+        return {"PYLUCID_SEARCH_INDEX_PATH": str(Path(temp_path, "index.sqlite3"))}
+
+    def tearDown(self):
+        get_search_index().close()
+        super().tearDown()
+
+    def create_page(self):
+        page = api.create_page(title="Search Test", template="pylucid/bootstrap/fullwidth.html", language="en")
+        placeholder = page.placeholders.get(slot="content")
+        api.add_plugin(placeholder, "TextPlugin", "en", body="<p>The quick brown fox</p>")
+        return page
+
+    def test_publish_updates_index(self):
+        page = self.create_page()
+
+        # The index will be updated after the transaction was committed:
+        with mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func()):
+            page.publish("en")
+
+        results = get_search_index().search("brown fox", language="en", site_id=1)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].title, "Search Test")
+        self.assertEqual(results[0].url, "/en/search-test/")
+
+        with mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func()):
+            page.unpublish("en")
+
+        self.assertEqual(get_search_index().search("brown fox", language="en", site_id=1), [])
+
+    def test_admin_move_updates_index(self):
+        with mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func()):
+            parent = api.create_page(title="Parent", template="pylucid/bootstrap/fullwidth.html", language="en")
+            parent.publish("en")
+            page = self.create_page()
+            page.publish("en")
+        self.assertEqual(get_search_index().search("fox", language="en", site_id=1)[0].url, "/en/search-test/")
+
+        # Same as the django CMS admin move view:
+        page = Page.objects.get(pk=page.pk)
+        page.move_page(parent.node, position="last-child")
+        with mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func()):
+            post_obj_operation.send(sender=PageAdmin, operation=MOVE_PAGE, request=None, token=None, obj=page)
+
+        results = get_search_index().search("fox", language="en", site_id=1)
+        self.assertEqual([result.url for result in results], ["/en/parent/search-test/"])
+
+    def test_render_job(self):
+        page = self.create_page()
+        self.assertEqual(get_page_jobs(), [])
+
+        page.publish("en")
+        jobs = get_page_jobs()
+        self.assertEqual(jobs, [(KIND_PAGE, page.publisher_public_id, "en")])
+
+        documents = render_job(jobs[0])
+        self.assertEqual(len(documents), 1)
+        self.assertEqual(documents[0]["object_id"], page.pk)
+        self.assertEqual(documents[0]["content"], "The quick brown fox")
+
+    def test_search_view(self):
+        page = self.create_page()
+        with mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func()):
+            page.publish("en")
+
+        response = self.client.get("/en/search/", {"q": "quick"})
+        self.assertContains(response, '<a href="/en/search-test/">Search Test</a>', html=True)
+        self.assertContains(response, "The <strong>quick</strong> brown fox")
+
+        response = self.client.get("/en/search/", {"q": "nothing"})
+        self.assertContains(response, "Nothing found.")
@@ -0,0 +1,60 @@
+# coding: utf-8
+
+"""
+    PyLucid settings import tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The base settings are imported on every manage.py call,
+    so heavy modules should be imported lazily.
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from django_cms_tools.plugin_anchor_menu import constants as plugin_anchor_menu_constants
+
+
+# Imported lazily, see: pylucid.base_settings
+# (The import time went down from ~120ms to ~40ms, but an absolute time
+# limit would fail on slow or busy machines.)
+HEAVY_MODULES = (
+    "debug_toolbar",
+    "pkg_resources",
+    "django_processinfo",
+    "django_tools.unittest_utils",
+    "django_cms_tools",
+)
+
+
+def run_python(*args):
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[2]))
+    return subprocess.check_output(
+        [sys.executable] + list(args), env=env, stderr=subprocess.STDOUT, universal_newlines=True
+    )
+
+
+class SettingsImportTest(SimpleTestCase):
+    def test_no_heavy_imports(self):
+        output = run_python(
+            "-c",
+            "import sys, pylucid.base_settings;"
+            "print(sorted(name for name in sys.modules"
+            " if any(name == module or name.startswith(module + '.') for module in %r)))" % (HEAVY_MODULES,)
+        )
+        self.assertEqual(output.strip().splitlines()[-1], "[]")
+
+    def test_lazy_settings(self):
+        self.assertEqual(settings.PROCESSINFO.MAX_PROCESSINFO_COUNT, 100)
+        self.assertIn(plugin_anchor_menu_constants.ANCHOR_PLUGIN_NAME, settings.CMS_PLACEHOLDER_CONF[None]["plugins"])
+        self.assertIn(
+            plugin_anchor_menu_constants.DROP_DOWN_ANCHOR_MENU_PLUGIN_NAME,
+            settings.CMS_PLACEHOLDER_CONF[None]["plugins"]
+        )
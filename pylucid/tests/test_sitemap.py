@@ -0,0 +1,82 @@
+# coding: utf-8
+
+"""
+    PyLucid sitemap tests
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from pathlib import Path
+
+from django.contrib.sites.models import Site
+
+from cms import api
+
+# PyLucid
+from pylucid.sitemap import generate_sitemap, get_sitemap_path
+from pylucid.tests.test_utils.test_cases import CmsPageTestCase, TempDirTestCase
+
+
+class SitemapTest(TempDirTestCase, CmsPageTestCase):
+    def get_temp_settings(self, temp_path):
+        return {"MEDIA_ROOT": str(temp_path), "PYLUCID_SITEMAP_CHUNK_SIZE": 4}
+
+    def setUp(self):
+        super().setUp()
+        self.site = Site.objects.get_current()
+        self.initial_urls = generate_sitemap(self.site).urls
+
+    def create_pages(self, count):
+        pages = []
+        for no in range(count):
+            page = api.create_page(
+                title="Page %i" % no, template="pylucid/bootstrap/fullwidth.html", language="en"
+            )
+            page.publish("en")
+            pages.append(page)
+        return pages
+
+    def test_incremental_update(self):
+        pages = self.create_pages(6)
+        # Not published -> not in sitemap:
+        api.create_page(title="Draft", template="pylucid/bootstrap/fullwidth.html", language="en")
+
+        stats = generate_sitemap(self.site)
+        self.assertEqual(stats.urls, self.initial_urls + 6)
+        self.assertGreater(stats.chunks, 1)
+
+        sitemap_path = get_sitemap_path(self.site.pk)
+        index = Path(sitemap_path, "sitemap.xml").read_text()
+        self.assertIn("<sitemapindex", index)
+        self.assertEqual(index.count("<sitemap>"), stats.chunks)
+        self.assertIn("<loc>https://example.com/media/sitemap/%i/sitemap-" % self.site.pk, index)
+
+        content = "".join(path.read_text() for path in sitemap_path.glob("sitemap-*.xml"))
+        self.assertEqual(content.count("<url>"), self.initial_urls + 6)
+        self.assertIn("<loc>https://example.com/en/page-5/</loc>", content)
+        self.assertNotIn("draft", content)
+
+        # Nothing changed -> nothing to write:
+        stats = generate_sitemap(self.site)
+        self.assertEqual(stats.written, 0)
+
+        # Only the chunk of the changed page must be written:
+        title = pages[5].get_title_obj("en")
+        title.slug = title.path = "new-slug"
+        title.save()
+        pages[5].publish("en")
+        stats = generate_sitemap(self.site)
+        self.assertEqual(stats.written, 1)
+        content = "".join(path.read_text() for path in sitemap_path.glob("sitemap-*.xml"))
+        self.assertIn("<loc>https://example.com/en/new-slug/</loc>", content)
+        self.assertNotIn("page-5", content)
+
+        # Removed chunks will be deleted:
+        for page in pages:
+            page.unpublish("en")
+        stats = generate_sitemap(self.site)
+        self.assertEqual(stats.urls, self.initial_urls)
+        self.assertGreater(stats.removed, 0)
+        self.assertEqual(len(list(sitemap_path.glob("sitemap-*.xml"))), stats.chunks)
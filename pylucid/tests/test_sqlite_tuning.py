@@ -0,0 +1,81 @@
+# coding: utf-8
+
+"""
+    PyLucid SQLite tuning tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TransactionTestCase
+
+# PyLucid
+from pylucid.sqlite_tuning import (
+    DEFAULT_PRAGMAS, compact_database, configure_connection, run_benchmark, setup_database
+)
+
+
+class SQLiteTuningTest(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.temp_dir.name, "test.sqlite3"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        super().tearDown()
+
+    def test_connection_pragmas(self):
+        settings_dict = dict(connection.settings_dict, NAME=self.path)
+        db = DatabaseWrapper(settings_dict, alias="pylucid_sqlite_tuning_test")
+        db.connection = db.get_new_connection(db.get_connection_params())
+        try:
+            configure_connection(sender=DatabaseWrapper, connection=db)
+            values = [
+                db.connection.execute("PRAGMA %s" % name).fetchone()[0]
+                for name in ("journal_mode", "synchronous", "mmap_size", "busy_timeout")
+            ]
+        finally:
+            db.connection.close()
+        # synchronous=1 is "NORMAL"
+        self.assertEqual(values, ["wal", 1, 256 * 1024 * 1024, 5000])
+
+    def test_benchmark(self):
+        setup_database(self.path, DEFAULT_PRAGMAS)
+        queries = [("SELECT count(*) FROM pylucid_benchmark WHERE value = ?", ["x"])]
+        result = run_benchmark(self.path, DEFAULT_PRAGMAS, queries, workers=2, writers=1, duration=0.2)
+        self.assertGreater(result.reads, 0)
+        self.assertGreater(result.writes, 0)
+
+
+class CompactDatabaseTest(TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.temp_dir.name, "test.sqlite3"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        super().tearDown()
+
+    def test_compact_database(self):
+        self.assertIsNone(compact_database(connection)) # The in-memory test database
+
+        settings_dict = dict(connection.settings_dict, NAME=self.path)
+        db = DatabaseWrapper(settings_dict, alias="pylucid_sqlite_tuning_test")
+        try:
+            with db.cursor() as cursor:
+                cursor.execute("CREATE TABLE pylucid_test (value TEXT)")
+                cursor.executemany("INSERT INTO pylucid_test VALUES (?)", [("x" * 1000,)] * 1000)
+                cursor.execute("DELETE FROM pylucid_test")
+            size_before, size_after = compact_database(db)
+        finally:
+            db.close()
+        self.assertGreater(size_before, 500 * 1000)
+        self.assertLess(size_after, size_before / 10)
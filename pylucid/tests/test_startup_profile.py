@@ -0,0 +1,53 @@
+# coding: utf-8
+
+"""
+    PyLucid startup profiler tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import io
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+# PyLucid
+from pylucid.startup_profile import iter_import_stacks
+
+
+class StartupProfileTest(SimpleTestCase):
+    def test_import_stacks(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:         5 |          5 |     c\n"
+            "import time:        10 |         15 |   b\n"
+            "import time:         0 |          0 |   d\n"
+            "import time:        20 |         35 | a\n"
+            "import time:         3 |          3 | e\n"
+        )
+        self.assertEqual(list(iter_import_stacks(output)), ["a;b;c 5", "a;b 10", "a 20", "e 3"])
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            phases_path = Path(temp_dir, "phases.txt")
+            imports_path = Path(temp_dir, "imports.txt")
+            stdout = io.StringIO()
+            call_command(
+                "pylucid_startup_profile",
+                collapsed=str(phases_path), imports_collapsed=str(imports_path),
+                stdout=stdout
+            )
+            output = stdout.getvalue()
+            phases = phases_path.read_text()
+            imports = imports_path.read_text()
+
+        for phase in ("startup > settings import", "startup > django.setup()", "startup > URLconf"):
+            self.assertIn(phase, output)
+        self.assertIn("startup > django.setup() > models > cms\n", output)
+        self.assertIn("startup;cms plugin pool ", phases)
+        self.assertIn("startup;menu pool ", phases)
+        self.assertIn(";pylucid.base_settings ", imports)
@@ -0,0 +1,120 @@
+# coding: utf-8
+
+"""
+    PyLucid taggit autosuggest tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import io
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from taggit.models import Tag, TaggedItem
+
+# PyLucid
+from pylucid import tag_suggest
+from pylucid.benchmark import Timings
+from pylucid.management.commands.pylucid_tag_suggest_benchmark import get_queries, get_synthetic_tags
+from pylucid.tag_suggest import TagIndex
+
+
+class TagIndexTest(SimpleTestCase):
+    def test_long_prefix_and_limit(self):
+        index = TagIndex([("django-cms", 3), ("django", 9), ("Django-Blog", 3), ("djangocms", 1)], top_count=2)
+        self.assertEqual(index.suggest("djang"), ["django", "Django-Blog", "django-cms", "djangocms"])
+        self.assertEqual(index.suggest("django-"), ["Django-Blog", "django-cms"])
+        self.assertEqual(index.suggest("dj", limit=3), ["django", "Django-Blog", "django-cms"])
+
+    def test_micro_benchmark(self):
+        tags = get_synthetic_tags(20000)
+        index = TagIndex(tags)
+        queries = get_queries(index.names, 500)
+
+        # Compare with a linear scan, like the origin "icontains" query:
+        def scan(query):
+            matches = [(name, count) for name, count in tags if name.startswith(query)]
+            matches.sort(key=lambda item: -item[1])
+            return [name for name, count in matches[:20]]
+
+        index_timings = Timings("prefix index")
+        scan_timings = Timings("linear scan")
+        for query in queries:
+            self.assertEqual(
+                index_timings.measure(index.suggest, query, 20),
+                scan_timings.measure(scan, query)
+            )
+
+        # Microseconds per lookup, not milliseconds:
+        self.assertLess(index_timings.median, 0.001, index_timings)
+        self.assertLess(index_timings.total * 10, scan_timings.total, (index_timings, scan_timings))
+
+
+@mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func())
+class TagSuggestViewTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.tag_user(["PyLucid", "Python", "pygments"])
+        self.tag_user(["PyLucid", "django"])
+        self.url = reverse("taggit_autosuggest-list")
+        self.client.force_login(get_user_model().objects.create_user(username="editor", is_staff=True))
+
+    def tag_user(self, names):
+        user = get_user_model().objects.create(username="user%i" % get_user_model().objects.count())
+        for name in names:
+            tag, created = Tag.objects.get_or_create(name=name, defaults={"slug": name.lower()})
+            TaggedItem.objects.create(tag=tag, content_object=user)
+
+    def get_names(self, query, **kwargs):
+        response = self.client.get(self.url, {"q": query, **kwargs})
+        self.assertEqual(response["Content-Type"], "application/json")
+        data = json.loads(response.content.decode("utf-8"))
+        for item in data:
+            self.assertEqual(item["name"], item["value"])
+        return [item["name"] for item in data]
+
+    def test_list_tags(self, on_commit):
+        self.assertEqual(self.get_names("py"), ["PyLucid", "pygments", "Python"])
+        self.assertEqual(self.get_names("py", limit="1"), ["PyLucid"])
+        self.assertEqual(self.get_names("py", limit="foo"), ["PyLucid", "pygments", "Python"])
+        self.assertEqual(self.get_names("x"), [])
+
+    def test_only_for_staff(self, on_commit):
+        self.client.logout()
+        response = self.client.get(self.url, {"q": "py"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/admin/login/", response["Location"])
+
+        self.client.force_login(get_user_model().objects.create_user(username="visitor"))
+        response = self.client.get(self.url, {"q": "py"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_refresh_on_change(self, on_commit):
+        self.assertEqual(self.get_names("py"), ["PyLucid", "pygments", "Python"])
+        with mock.patch.object(tag_suggest, "build_index") as build_index:
+            self.get_names("py")
+            self.assertFalse(build_index.called)
+
+        self.tag_user(["Python"])
+        self.assertEqual(self.get_names("py"), ["PyLucid", "Python", "pygments"])
+
+        Tag.objects.get(name="PyLucid").delete()
+        self.assertEqual(self.get_names("py"), ["Python", "pygments"])
+
+
+class BenchmarkCommandTest(SimpleTestCase):
+    def test_synthetic(self):
+        stdout = io.StringIO()
+        call_command("pylucid_tag_suggest_benchmark", "--synthetic", "1000", "--repeat", "1", stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn("1000 tags, 500 queries", output)
+        self.assertIn("prefix index: 500 x", output)
@@ -0,0 +1,134 @@
+# coding: utf-8
+
+"""
+    PyLucid thumbnails tests
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import io
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.signals import post_save
+from django.template import Context, Template
+from django.test import override_settings
+
+from easy_thumbnails.alias import aliases
+from filer.models import Image, ThumbnailOption
+from PIL import Image as PILImage
+
+# PyLucid
+from pylucid import image_variants as image_variants_module
+from pylucid.image_variants import collect_image_variants, get_image_variants
+from pylucid.tests.test_utils.test_cases import TempDirTestCase
+from pylucid.thumbnails import (
+    generate_in_background, generate_thumbnails, get_image_model, get_thumbnail_options, image_saved
+)
+
+
+THUMBNAIL_ALIASES = {
+    "": {
+        "small": {"size": (50, 50), "crop": True},
+    },
+}
+
+
+@override_settings(
+    THUMBNAIL_ALIASES=THUMBNAIL_ALIASES,
+    PYLUCID_THUMBNAIL_OPTIONS=({"size": "20x10"},),
+    PYLUCID_IMAGE_WIDTHS=(50, 100, 300),
+    PYLUCID_IMAGE_FORMATS=("webp", "foobar"),
+)
+class ThumbnailsTest(TempDirTestCase):
+    def get_temp_settings(self, temp_path):
+        return {"MEDIA_ROOT": str(temp_path)}
+
+    def setUp(self):
+        super().setUp()
+        aliases.populate_from_settings()
+        # Connected in PyLucidConfig.ready() with settings.PYLUCID_THUMBNAIL_PREGENERATE:
+        post_save.connect(image_saved, sender=get_image_model(), dispatch_uid="pylucid_thumbnails")
+
+        # Generate in the test thread: The pool threads would not see the test transaction
+        patcher = mock.patch("pylucid.thumbnails.get_executor")
+        self.executor = patcher.start()
+        self.executor.return_value.submit.side_effect = lambda func, image_id: generate_thumbnails(image_id)
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        post_save.disconnect(sender=get_image_model(), dispatch_uid="pylucid_thumbnails")
+        aliases.populate_from_settings()
+        super().tearDown()
+
+    def create_image(self):
+        data = io.BytesIO()
+        PILImage.new("RGB", (200, 100), color="red").save(data, format="PNG")
+        upload = SimpleUploadedFile("pylucid_test.png", data.getvalue(), content_type="image/png")
+        return Image.objects.create(original_filename="pylucid_test.png", file=upload)
+
+    def test_get_thumbnail_options(self):
+        ThumbnailOption.objects.create(name="foo", width=30, height=40, crop=True, upscale=False)
+        image = Image(subject_location="")
+        options = get_thumbnail_options(image)
+        self.assertIn({"size": (50, 50), "crop": True}, options)
+        self.assertIn({"size": (20, 10)}, options)
+        self.assertIn({"size": (30, 40), "crop": True, "upscale": False, "subject_location": ""}, options)
+
+    def test_generate_on_upload(self):
+        with mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func()):
+            image = self.create_image()
+
+        self.assertTrue(image.file.path.startswith(str(self.temp_path)))
+        self.executor.return_value.submit.assert_called_once_with(generate_in_background, image.pk)
+
+        thumbnailer = image.easy_thumbnails_thumbnailer
+        for options in get_thumbnail_options(image):
+            self.assertIsNotNone(thumbnailer.get_existing_thumbnail(options), options)
+
+        # All thumbnails exists:
+        self.assertEqual(generate_thumbnails(image.pk), 0)
+
+    def test_image_variants(self):
+        with mock.patch("django.db.transaction.on_commit", side_effect=lambda func: func()):
+            image = self.create_image()
+
+        image_variants, complete = collect_image_variants(image, max_width=100)
+        self.assertTrue(complete)
+        self.assertRegex(image_variants.srcset, r"^\S+\.jpg \d+w, \S+\.jpg \d+w$")
+        self.assertIn("pylucid_test.png__50x0_q85_subsampling-2.jpg 50w", image_variants.srcset)
+        self.assertEqual(image_variants.sizes, "(max-width: 100px) 100vw, 100px")
+
+        self.assertEqual(len(image_variants.sources), 1)
+        source = image_variants.sources[0]
+        self.assertEqual(source.mime_type, "image/webp")
+        self.assertIn("pylucid_test.png__100x0_q85_subsampling-2.webp 100w", source.srcset)
+
+        # The 300px variant is bigger than the image -> not created:
+        self.assertEqual(
+            collect_image_variants(image)[0].srcset, collect_image_variants(image, max_width=150)[0].srcset
+        )
+
+        html = Template(
+            "{% load pylucid_images %}{% image_variants image max_width=100 as variants %}"
+            "{% for source in variants.sources %}{{ source.mime_type }}: {{ source.srcset }}{% endfor %}"
+        ).render(Context({"image": image}))
+        self.assertEqual(html, "image/webp: %s" % source.srcset)
+
+    def test_cache_not_complete_variants(self):
+        cache.clear()
+        image = self.create_image()  # Without the on_commit thumbnail generation
+        self.assertEqual(collect_image_variants(image)[1], False)
+
+        image_variants = get_image_variants(image)
+        with mock.patch.object(image_variants_module, "collect_image_variants") as collect_mock:
+            self.assertEqual(get_image_variants(image), image_variants)
+        collect_mock.assert_not_called()
+
+        with mock.patch.object(image_variants_module, "cache") as cache_mock:
+            cache_mock.get.return_value = None
+            get_image_variants(image)
+        cache_mock.set.assert_called_once_with(mock.ANY, image_variants, 60)
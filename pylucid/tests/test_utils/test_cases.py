@@ -12,9 +12,13 @@
 import os
 import pprint
 import subprocess
+import tempfile
 from pathlib import Path
 from unittest import TestCase
 
+from django import test
+from django.core.cache import cache
+from django.urls import reverse
 from django.utils.version import get_main_version
 
 from pylucid_installer.pylucid_installer import create_instance, get_python3_shebang
@@ -198,3 +202,39 @@ class PageInstanceTestCase(BaseTestCase):
         # self.subprocess_getstatusoutput(["cat %s" % os.path.join(self.project_path, "settings.py")], **kwargs)
         # self.subprocess_getstatusoutput(["cat %s" % os.path.join(self.temp_path, "manage.py")], **kwargs)
         # self.subprocess_getstatusoutput(['python -c "import sys,pprint;pprint.pprint(sys.path)"'], **kwargs)
+
+
+class TempDirTestCase(test.TestCase):
+    """
+    Every test gets a new temporary directory in self.temp_path and the
+    settings of get_temp_settings() (e.g.: MEDIA_ROOT in the temp dir).
+    """
+    def get_temp_settings(self, temp_path):
+        return {}
+
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.settings_override = test.override_settings(**self.get_temp_settings(self.temp_path))
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.temp_dir.cleanup()
+        super().tearDown()
+
+
+class CmsPageTestCase(test.TestCase):
+    """
+    Clean cache and loaded apphooks before the pages of the test are created.
+    """
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # Load the apphooks first: djangocms-blog will create the home and blog pages on this:
+        reverse("pages-root")
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
@@ -0,0 +1,37 @@
+# coding: utf-8
+
+"""
+    PyLucid warm-up tests
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from django.test import TestCase, override_settings
+
+# PyLucid
+from pylucid.warmup import get_template_names, warm_up
+
+
+class WarmUpTest(TestCase):
+    def test_deactivated(self):
+        with override_settings(PYLUCID_WARMUP=False):
+            self.assertEqual(warm_up(), [])
+
+    @override_settings(PYLUCID_WARMUP=True)
+    def test_warm_up(self):
+        with self.assertLogs("pylucid.warmup", level="INFO") as logs:
+            results = warm_up()
+
+        self.assertEqual(
+            [name for name, count, duration in results],
+            ["plugin pool", "menu pool", "toolbar pool", "URL resolver", "templates"]
+        )
+        for name, count, duration in results:
+            self.assertGreater(count, 0, name)
+        self.assertIn("Warm-up done in", logs.output[-1])
+
+        template_names = get_template_names()
+        self.assertIn("pylucid/bootstrap/fullwidth.html", template_names)
+        self.assertIn("cms/plugins/text.html", template_names)
@@ -0,0 +1,233 @@
+# coding: utf-8
+
+"""
+    PyLucid thumbnails
+    ~~~~~~~~~~~~~~~~~~
+
+    Generate all thumbnails of a filer image before the first page request
+    needs them, so the page request will find existing thumbnails and
+    doesn't have to wait for PIL.
+
+    The thumbnail options must be exactly the same as the
+    {% thumbnail %} template tag calls use, otherwise easy_thumbnails
+    will use a other thumbnail name. Options are collected from:
+
+        * settings.THUMBNAIL_ALIASES
+        * settings.PYLUCID_THUMBNAIL_OPTIONS
+        * filer.ThumbnailOption entries
+        * cmsplugin_filer_image plugins that use the image
+        * djangocms-blog posts that use the image as main image
+
+    The responsive variants (see: pylucid.image_variants) are generated, too.
+
+    Generate the thumbnails of all existing images with:
+        $ ./manage.py pylucid_thumbnails
+
+    e.g. from cron or after a bulk upload. With settings.PYLUCID_THUMBNAIL_PREGENERATE
+    (on by default) the thumbnails are generated directly after the upload
+    by a pool of settings.PYLUCID_THUMBNAIL_WORKERS threads, not in the
+    upload request. The pool uses threads, because forking the worker
+    processes of a web server is unsafe, Pillow releases the GIL while
+    scaling and encoding the images.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django import db
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.templatetags.thumbnail import RE_SIZE
+from filer import settings as filer_settings
+from filer.models import ThumbnailOption
+from filer.utils.loader import load_model
+
+# PyLucid
+from pylucid.image_variants import generate_variants
+
+
+log = logging.getLogger(__name__)
+
+
+def get_image_model():
+    return load_model(filer_settings.FILER_IMAGE_MODEL)
+
+
+def template_options(size, **options):
+    """
+    Build the options like the {% thumbnail %} template tag.
+
+    >>> template_options("120x80", crop=True)
+    {'crop': True, 'size': (120, 80)}
+    >>> template_options([120, 80])
+    {'size': (120, 80)}
+    """
+    if isinstance(size, str):
+        m = RE_SIZE.match(size)
+        if m:
+            size = (int(m.group(1)), int(m.group(2)))
+    else:
+        size = tuple(size)
+    return dict(options, size=size)
+
+
+def get_alias_options(image):
+    """
+    e.g.: {% thumbnail image "alias_name" %}
+    """
+    target = "%s.file" % image._meta.label
+    return [dict(options) for options in aliases.all(target=target).values()]
+
+
+def get_thumbnail_option_options(image):
+    """
+    filer.ThumbnailOption e.g. used in djangocms-blog for main_image_thumbnail/main_image_full
+    """
+    return [
+        template_options(
+            (option.width, option.height),
+            crop=option.crop, upscale=option.upscale, subject_location=image.subject_location
+        )
+        for option in ThumbnailOption.objects.all()
+    ]
+
+
+def get_filer_plugin_options(image):
+    """
+    Same as cmsplugin_filer_image/plugins/image/default.html
+    Note: The placeholder width for "use_autoscale" is unknown here.
+    """
+    if not apps.is_installed("cmsplugin_filer_image"):
+        return []
+
+    from cmsplugin_filer_image.models import FilerImage
+
+    options_list = []
+    for instance in FilerImage.objects.filter(image=image, use_original_image=False):
+        plugin = instance.get_plugin_class_instance()
+        options = plugin._get_thumbnail_options({}, instance)
+        options_list.append(template_options(
+            options["size"],
+            crop=options["crop"], upscale=options["upscale"], subject_location=options["subject_location"]
+        ))
+    return options_list
+
+
+def get_blog_options(image):
+    """
+    Same as djangocms_blog/post_detail.html and djangocms_blog/includes/blog_item.html
+    """
+    if not apps.is_installed("djangocms_blog"):
+        return []
+
+    from djangocms_blog.models import Post
+
+    options_list = []
+    for post in Post.objects.filter(main_image=image).select_related("main_image_thumbnail", "main_image_full"):
+        for options in (post.thumbnail_options(), post.full_image_options()):
+            options_list.append(template_options(
+                options["size"],
+                crop=options["crop"], upscale=options["upscale"], subject_location=image.subject_location
+            ))
+    return options_list
+
+
+def get_thumbnail_options(image):
+    """
+    Returns a list of all thumbnail options used for the given image (without duplicates)
+    """
+    options_list = get_alias_options(image)
+    options_list += [template_options(**options) for options in settings.PYLUCID_THUMBNAIL_OPTIONS]
+    options_list += get_thumbnail_option_options(image)
+    options_list += get_filer_plugin_options(image)
+    options_list += get_blog_options(image)
+
+    unique = {}
+    for options in options_list:
+        unique.setdefault(repr(sorted(options.items())), options)
+    return list(unique.values())
+
+
+def generate_thumbnails(image_id):
+    """
+    Generate all missing thumbnails and responsive variants of the given filer image.
+    Returns the number of generated files.
+    """
+    image = get_image_model().objects.filter(pk=image_id).first()
+    if image is None or not image.file:
+        return 0
+
+    thumbnailer = image.easy_thumbnails_thumbnailer
+    generated = 0
+    for options in get_thumbnail_options(image):
+        if thumbnailer.get_existing_thumbnail(options) is None:
+            thumbnailer.get_thumbnail(options)
+            generated += 1
+
+    # The responsive srcset variants:
+    generated += generate_variants(image)
+
+    log.debug("%i thumbnails generated for %r", generated, image.file.name)
+    return generated
+
+
+def init_worker():
+    # The forked worker must not use the database connections of the parent process:
+    db.connections.close_all()
+
+
+def get_pool(workers):
+    """
+    Worker pool for the management command. Never use it in a web server process.
+    """
+    # Don't share the database connections with the forked processes:
+    db.connections.close_all()
+    context = multiprocessing.get_context("fork")
+    return context.Pool(workers, initializer=init_worker)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    The thread pool of this process for the generation after upload.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PYLUCID_THUMBNAIL_WORKERS, thread_name_prefix="pylucid_thumbnails"
+            )
+    return _executor
+
+
+def generate_in_background(image_id):
+    """
+    Called in a thread of the pool.
+    """
+    try:
+        generate_thumbnails(image_id)
+    except Exception as err:
+        log.exception("Thumbnail generation error: %s", err)
+    finally:
+        # Only the database connections of this thread:
+        db.connections.close_all()
+
+
+def image_saved(sender, instance, **kwargs):
+    """
+    post_save signal handler for filer images.
+    Connected in pylucid.apps.PyLucidConfig.ready()
+    """
+    image_id = instance.pk
+    transaction.on_commit(lambda: get_executor().submit(generate_in_background, image_id))
@@ -0,0 +1,122 @@
+# coding: utf-8
+
+"""
+    PyLucid warm-up
+    ~~~~~~~~~~~~~~~
+
+    Do the work of the first request before the worker takes traffic:
+    plugin/menu/toolbar discovery, building the URL resolver and compiling
+    all CMS_TEMPLATES and plugin templates into the cached template loader.
+
+    Called from the wsgi.py if settings.PYLUCID_WARMUP is set.
+    With a pre-fork server that loads the application in the master
+    process (e.g.: gunicorn --preload, uWSGI without lazy-apps) all
+    workers share the warmed-up memory copy-on-write.
+
+    :copyleft: 2009-2019 by the PyLucid team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+import logging
+import time
+
+from django import db
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.urls import get_resolver
+from django.utils import translation
+
+# PyLucid
+from pylucid.utils import human_duration
+
+
+log = logging.getLogger(__name__)
+
+
+def discover_plugins():
+    from cms.plugin_pool import plugin_pool
+    return len(plugin_pool.get_all_plugins())
+
+
+def discover_menus():
+    from menus.menu_pool import menu_pool
+    menu_pool.discover_menus()
+    return len(menu_pool.menus)
+
+
+def discover_toolbars():
+    from cms.toolbar_pool import toolbar_pool
+    toolbar_pool.discover_toolbars()
+    return len(toolbar_pool.toolbars)
+
+
+def build_url_resolver():
+    """
+    The reverse dict is build per language.
+    Note: This will load the apphooks from the database.
+    """
+    resolver = get_resolver()
+    for language_code, language_name in settings.LANGUAGES:
+        with translation.override(language_code):
+            resolver.reverse_dict
+    return len(resolver.url_patterns)
+
+
+def get_template_names():
+    from cms.plugin_pool import plugin_pool
+
+    template_names = [template_name for template_name, title in settings.CMS_TEMPLATES]
+    for plugin in plugin_pool.get_all_plugins():
+        if isinstance(plugin.render_template, str):
+            template_names.append(plugin.render_template)
+    return sorted(set(template_names))
+
+
+def load_templates():
+    count = 0
+    for template_name in get_template_names():
+        try:
+            get_template(template_name)
+        except TemplateDoesNotExist:
+            log.warning("Warm-up: Template %r doesn't exist", template_name)
+        else:
+            count += 1
+    return count
+
+
+WARM_UP_STEPS = (
+    ("plugin pool", discover_plugins),
+    ("menu pool", discover_menus),
+    ("toolbar pool", discover_toolbars),
+    ("URL resolver", build_url_resolver),
+    ("templates", load_templates),
+)
+
+
+def warm_up(force=False):
+    """
+    Execute all warm-up steps if settings.PYLUCID_WARMUP is set.
+    Returns a list of (step name, count, duration)
+    """
+    if not (force or settings.PYLUCID_WARMUP):
+        return []
+
+    results = []
+    start_time = time.monotonic()
+    for name, func in WARM_UP_STEPS:
+        step_start = time.monotonic()
+        try:
+            count = func()
+        except Exception as err:
+            log.exception("Warm-up %s failed: %s", name, err)
+            count = None
+        duration = time.monotonic() - step_start
+        log.info("Warm-up %s: %s items in %s", name, count, human_duration(duration))
+        results.append((name, count, duration))
+
+    # Don't share the database connections with the forked workers:
+    db.connections.close_all()
+
+    log.info("Warm-up done in %s", human_duration(time.monotonic() - start_time))
+    return results
@@ -38,6 +38,9 @@ TEMPLATES[0]["DIRS"] = [str(Path(PROJECT_DIR, "templates/"))]
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = "CHANGE ME!!!"
 
+# SQLite FTS5 full-text search index, see: pylucid.search
+PYLUCID_SEARCH_INDEX_PATH = str(Path(PROJECT_DIR, "search_index.sqlite3"))
+
 
 ROOT_URLCONF = "example_project.urls"
 
@@ -68,6 +71,8 @@ DATABASES = {
         "PASSWORD": "",
         "NAME": str(Path(PROJECT_DIR, "example_project.db")),
         "ATOMIC_REQUESTS": True,
+        # Reuse the connections, see also: PYLUCID_SQLITE_PRAGMAS
+        "CONN_MAX_AGE": 600,
     },
 }
 
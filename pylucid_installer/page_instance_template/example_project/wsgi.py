@@ -9,7 +9,14 @@ https://docs.djangoproject.com/en/1.8/howto/deployment/wsgi/
 """
 
 import os
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "example_project.settings")
 
 from django.core.wsgi import get_wsgi_application
+
+from pylucid.warmup import warm_up
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "example_project.settings")
+
 application = get_wsgi_application()
+
+# Activated via settings.PYLUCID_WARMUP
+warm_up()
@@ -35,6 +35,9 @@ TEMPLATES[0]["OPTIONS"]['loaders']= [
 STATIC_ROOT = str(Path(BASE_DIR, 'static'))
 MEDIA_ROOT = str(Path(BASE_DIR, 'media'))
 
+PYLUCID_SEARCH_INDEX_PATH = str(Path(BASE_DIR, '..', 'test_project_search_index.sqlite3').resolve())
+PYLUCID_MEDIA_SCAN_CACHE_PATH = str(Path(BASE_DIR, '..', 'test_project_media_scan_cache.json').resolve())
+
 
 DATABASES = {
     'default': {
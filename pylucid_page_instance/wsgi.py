@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from pylucid.warmup import warm_up
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pylucid_page_instance.settings")
 
 application = get_wsgi_application()
+
+# Activated via settings.PYLUCID_WARMUP
+warm_up()